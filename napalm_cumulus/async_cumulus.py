@@ -0,0 +1,270 @@
+# Copyright 2016 Dravetech AB. All rights reserved.
+#
+# The contents of this file are licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with the
+# License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Asyncio driver for Cumulus.
+
+Mirrors the getters of :class:`napalm_cumulus.cumulus.CumulusDriver` as coroutines, so a
+single event loop can poll thousands of switches. Every command runs on its own SSH exec
+channel, and the independent commands of a getter run concurrently.
+
+Requires asyncssh (``pip install napalm-cumulus[async]``)::
+
+    async with AsyncCumulusDriver("leaf01", "cumulus", "CumulusLinux!") as device:
+        facts = await device.get_facts()
+"""
+import asyncio
+
+import napalm.base.constants as C
+from napalm.base.exceptions import (
+    CommandTimeoutException,
+    ConnectionException,
+    ModuleImportError,
+)
+
+from napalm_cumulus.utils import fastjson, parsers
+from napalm_cumulus.utils.cache import CommandCache
+from napalm_cumulus.utils.transport import command_error, sudo_command
+
+try:
+    import asyncssh
+except ImportError:  # pragma: no cover
+    asyncssh = None
+
+
+class AsyncCumulusDriver(object):
+    """Asyncio Napalm driver for Cumulus."""
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        """Constructor."""
+        self.connection = None
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+
+        if optional_args is None:
+            optional_args = {}
+
+        self.port = optional_args.get("port", 22)
+        self.sudo_pwd = optional_args.get("sudo_pwd", self.password)
+        self.key_file = optional_args.get("key_file", None)
+        self.ssh_strict = optional_args.get("ssh_strict", False)
+        self.bgp_advertised_routes_fallback = optional_args.get(
+            "bgp_advertised_routes_fallback", False
+        )
+        # Most sshd configurations refuse more than 10 sessions per connection.
+        self.max_sessions = optional_args.get("max_sessions", 8)
+        self._sessions = None
+        self._vtysh_running = None
+
+        if optional_args.get("command_cache", False):
+            cache_size = optional_args.get("command_cache_size", 64)
+        else:
+            cache_size = 0
+        self.command_cache = CommandCache(
+            ttl=optional_args.get("command_cache_ttl", 30), maxsize=cache_size
+        )
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    async def open(self):
+        if asyncssh is None:
+            raise ModuleImportError(
+                "AsyncCumulusDriver requires asyncssh: pip install napalm-cumulus[async]"
+            )
+        connect_args = {
+            "port": self.port,
+            "username": self.username,
+            "password": self.password,
+        }
+        if not self.ssh_strict:
+            connect_args["known_hosts"] = None
+        if self.key_file:
+            connect_args["client_keys"] = [self.key_file]
+        try:
+            self.connection = await asyncio.wait_for(
+                asyncssh.connect(self.hostname, **connect_args), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError, asyncssh.Error):
+            raise ConnectionException("Cannot connect to {}".format(self.hostname))
+        self._sessions = asyncio.Semaphore(self.max_sessions)
+        self._vtysh_running = None
+
+    async def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            await self.connection.wait_closed()
+            self.connection = None
+
+    async def is_alive(self):
+        return {"is_alive": self.connection is not None and not self.connection.is_closed()}
+
+    async def _send_command(self, command, use_cache=False, check_status=True):
+        """
+        Run `command` on its own exec channel, returning its output.
+
+        Raises CommandErrorException when the command exits with a nonzero status, unless
+        `check_status` is false.
+        """
+        if use_cache:
+            response = self.command_cache.get(command)
+            if response is not None:
+                return response
+
+        remote_command, stdin = sudo_command(command, self.sudo_pwd)
+        async with self._sessions:
+            try:
+                result = await asyncio.wait_for(
+                    self.connection.run(remote_command, input=stdin, stderr=asyncssh.STDOUT),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                raise CommandTimeoutException(
+                    "Command '{}' timed out on {}".format(command, self.hostname)
+                )
+        response = result.stdout.rstrip("\n")
+        if result.exit_status != 0 and check_status:
+            raise command_error(command, result.exit_status, response)
+
+        if use_cache:
+            self.command_cache.set(command, response)
+        return response
+
+    async def _send_commands(self, commands, use_cache=False, check_status=True):
+        """Run independent commands concurrently, returning their outputs in order."""
+        return await asyncio.gather(
+            *[
+                self._send_command(command, use_cache=use_cache, check_status=check_status)
+                for command in commands
+            ]
+        )
+
+    async def _send_json_command(self, command):
+        return fastjson.loads(await self._send_command(command, use_cache=True))
+
+    async def get_facts(self):
+        system, interfaces = await self._send_commands(
+            ["net show system json", "net show interface all json"], use_cache=True
+        )
+        return parsers.parse_facts(fastjson.loads(system), fastjson.loads(interfaces))
+
+    async def get_arp_table(self, vrf=""):
+        output = await self._send_command(parsers.neighbors_command(4, vrf))
+        return parsers.parse_arp_table(output)
+
+    async def get_ipv6_neighbors_table(self):
+        output = await self._send_command(parsers.neighbors_command(6))
+        return parsers.parse_ipv6_neighbors_table(output)
+
+    async def get_interfaces_counters(self):
+        output = await self._send_command(parsers.INTERFACES_COUNTERS_COMMAND)
+        return parsers.parse_interfaces_counters(output)
+
+    async def get_mac_address_table(self):
+        fdb, vlans = await self._send_commands(
+            [parsers.MAC_ADDRESS_TABLE_COMMAND, parsers.BRIDGE_VLANS_COMMAND]
+        )
+        return parsers.parse_mac_address_table(fdb, vlans)
+
+    async def get_ntp_stats(self):
+        return parsers.parse_ntp_stats(await self._send_command("ntpq -np"))
+
+    async def ping(
+        self,
+        destination,
+        source=C.PING_SOURCE,
+        ttl=C.PING_TTL,
+        timeout=C.PING_TIMEOUT,
+        size=C.PING_SIZE,
+        count=C.PING_COUNT,
+        vrf=C.PING_VRF,
+    ):
+        command = parsers.ping_command(destination, source, ttl, timeout, size, count)
+        # ping exits with a nonzero status when replies are missing.
+        return parsers.parse_ping(await self._send_command(command, check_status=False))
+
+    async def get_lldp_neighbors(self):
+        intf_output = await self._send_json_command("net show interface all json")
+        return parsers.parse_lldp_neighbors(intf_output)
+
+    async def get_interfaces(self):
+        date_command = "date '+{}'".format(parsers.DATE_FORMAT)
+        if self._vtysh_running is None:
+            # vtysh exits with a nonzero status when no routing daemon runs.
+            daemon_check = await self._send_command(
+                "sudo vtysh -c 'show version'", check_status=False
+            )
+            self._vtysh_running = parsers.vtysh_daemons_running(daemon_check)
+        commands = [self._send_command(date_command)]
+        if self._vtysh_running:
+            commands.append(self._send_command("sudo vtysh -c 'show interface'"))
+        output, outputs = await asyncio.gather(
+            self._send_json_command("net show interface all json"), asyncio.gather(*commands)
+        )
+        show_int_output = outputs[1] if self._vtysh_running else None
+        return parsers.parse_interfaces(output, parsers.parse_date(outputs[0]), show_int_output)
+
+    async def get_interfaces_ip(self):
+        output_json = await self._send_json_command("net show interface all json")
+        return parsers.parse_interfaces_ip(output_json)
+
+    async def get_config(self, retrieve="all", full=False, sanitized=False):
+        configuration = {"startup": "", "running": "", "candidate": ""}
+        if retrieve in ("running", "all"):
+            configuration["running"] = await self._send_command("net show configuration")
+        if retrieve in ("candidate", "all"):
+            configuration["candidate"] = await self._send_command("net pending json")
+        return configuration
+
+    async def get_bgp_neighbors(self):
+        dev_bgp_summary, dev_bgp_neighbors = await asyncio.gather(
+            self._send_json_command(parsers.BGP_SUMMARY_COMMAND),
+            self._send_json_command(parsers.BGP_NEIGHBORS_COMMAND),
+        )
+        advertised_routes = {}
+        if self.bgp_advertised_routes_fallback:
+            missing = parsers.bgp_peers_missing_sent_prefixes(dev_bgp_summary, dev_bgp_neighbors)
+            outputs = await self._send_commands(
+                [parsers.bgp_advertised_routes_command(*key) for key in missing]
+            )
+            for key, output in zip(missing, outputs):
+                advertised_routes[key] = parsers.parse_bgp_advertised_routes_count(output)
+        return parsers.parse_bgp_neighbors(
+            dev_bgp_summary, dev_bgp_neighbors, advertised_routes
+        )
+
+    async def get_route_to(self, destination="", protocol="", longer=False):
+        outputs = await self._send_commands(parsers.route_to_commands(destination, longer))
+        return parsers.parse_route_to_outputs(outputs, protocol)
+
+    async def get_snmp_information(self):
+        output = await self._send_command("net show configuration snmp-server")
+        return parsers.parse_snmp_information(output)
+
+    async def get_environment(self):
+        smonctl_output, memory_data = await self._send_commands(["sudo smonctl --json", "free"])
+        return parsers.parse_environment(fastjson.loads(smonctl_output), memory_data)
+
+    async def cli(self, commands):
+        if type(commands) is not list:
+            raise TypeError("Please enter a valid list of commands!")
+        # Like the sync driver, return the output of failing commands as is.
+        outputs = await self._send_commands(commands, check_status=False)
+        return dict(zip(commands, outputs))
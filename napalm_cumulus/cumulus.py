@@ -18,28 +18,60 @@ Napalm driver for Cumulus.
 Read https://napalm.readthedocs.io for more information.
 """
 import re
-import json
-import ipaddress
-from datetime import datetime
-from collections import defaultdict
+import time
+import uuid
+import shlex
+import socket
 
+import netmiko
+import paramiko
 from netmiko import ConnectHandler
 from netmiko.ssh_exception import NetMikoTimeoutException
 import napalm.base.constants as C
-from napalm.base.utils import string_parsers
 from napalm.base.base import NetworkDriver
 from napalm.base.exceptions import (
     CommandErrorException,
+    CommitError,
     ConnectionException,
     MergeConfigException,
+    ReplaceConfigException,
+)
+
+from napalm_cumulus.utils import batch, config_cache, delta, fastjson, parsers, replace
+from napalm_cumulus.utils.archive import ArchiveDevice, RecordingDevice, SessionRecorder
+from napalm_cumulus.utils.cache import CommandCache
+from napalm_cumulus.utils.instrumentation import Instrumentation
+from napalm_cumulus.utils.pool import default_pool
+from napalm_cumulus.utils.counters import CounterPoller
+from napalm_cumulus.utils.mac_table import MacAddressTable
+from napalm_cumulus.utils.route_table import RouteTable
+from napalm_cumulus.utils.transport import (
+    ExecChannelConnection,
+    check_exit_status,
+    command_error,
+    exec_commands,
 )
 
 
 class CumulusDriver(NetworkDriver):
     """Napalm driver for Cumulus."""
 
+    # Public methods beyond napalm's NetworkDriver API, see "Driver extensions" in the
+    # README.
+    DRIVER_EXTENSIONS = (
+        "iter_arp_table",
+        "get_interfaces_delta",
+        "get_bgp_neighbors_delta",
+        "get_route_table",
+        "iter_mac_address_table",
+        "get_mac_address_table_compact",
+        "poll_interfaces_counters",
+    )
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         """Constructor."""
+        # With the NVUE backend, the SSH session is only opened once a getter needs it.
+        self._lazy_device = False
         self.device = None
         self.hostname = hostname
         self.username = username
@@ -47,6 +79,10 @@ class CumulusDriver(NetworkDriver):
         self.timeout = timeout
         self.loaded = False
         self.changed = False
+        # Replace candidate staged on the switch, with the running files read to diff it
+        # against, and files replaced by the last commit, see load_replace_candidate().
+        self._replace_candidate = None
+        self._replaced_files = None
 
         if optional_args is None:
             optional_args = {}
@@ -72,31 +108,242 @@ class CumulusDriver(NetworkDriver):
             k: optional_args.get(k, v) for k, v in netmiko_argument_map.items()
         }
         self.port = optional_args.get("port", 22)
+        # "per_command" elevates the shell around every sudo command, "persistent" elevates
+        # it once per connection and "sudo_noninteractive" runs 'sudo -n' without elevating,
+        # which requires NOPASSWD sudo rules on the switch.
+        self.privilege_mode = optional_args.get("privilege_mode", "per_command")
+        if self.privilege_mode not in ("per_command", "persistent", "sudo_noninteractive"):
+            raise ValueError("Unsupported privilege mode: {}".format(self.privilege_mode))
+        self._privileged = False
+        self._vtysh_running = None
+        self.privilege_stats = {"privileged_commands": 0, "elevations": 0}
+        # "ssh" drives netmiko's interactive shell, "exec" runs every command on its own
+        # exec channel of a persistent connection, "replay" serves the outputs recorded in
+        # the session archive "replay_archive".
+        self.transport = optional_args.get("transport", "ssh")
+        if self.transport not in ("ssh", "exec", "replay"):
+            raise ValueError("Unsupported transport: {}".format(self.transport))
+        self.replay_archive = optional_args.get("replay_archive", None)
+        if self.transport == "replay" and not self.replay_archive:
+            raise ValueError("The replay transport needs a replay_archive")
+        # "nclu" runs commands over SSH for every getter, "nvue" serves get_facts,
+        # get_interfaces, get_interfaces_ip, get_lldp_neighbors and get_bgp_neighbors from
+        # the NVUE REST API of Cumulus Linux 5.x.
+        self.backend = optional_args.get("backend", "nclu")
+        if self.backend not in ("nclu", "nvue"):
+            raise ValueError("Unsupported backend: {}".format(self.backend))
+        self.nvue_optional_args = {
+            "port": optional_args.get("nvue_port", 8765),
+            "verify": optional_args.get("nvue_verify", True),
+            "scheme": optional_args.get("nvue_scheme", "https"),
+            "max_connections": optional_args.get("nvue_max_connections", 8),
+        }
+        self.nvue = None
+        # Every command run and its output are written to the session archive at this path.
+        self.record_archive = optional_args.get("record_archive", None)
+        self._recorder = None
         self.sudo_pwd = optional_args.get("sudo_pwd", self.password)
+        # Connections are borrowed from and handed back to a pool when "connection_pool" is
+        # True, for the process-wide pool, or a ConnectionPool instance.
+        self.connection_pool = optional_args.get("connection_pool", None)
+        if self.connection_pool is True:
+            self.connection_pool = default_pool()
+        elif self.connection_pool is False:
+            self.connection_pool = None
+        # Independent commands of a getter run concurrently on up to "max_channels" SSH
+        # channels of the session when set above 1, the default, which runs them one after
+        # the other through the connection.
+        self.max_channels = optional_args.get("max_channels", 1)
+        self.bulk_merge = optional_args.get("bulk_merge", False)
+        self.bgp_advertised_routes_fallback = optional_args.get(
+            "bgp_advertised_routes_fallback", False
+        )
+
+        # Command output cache shared by all getters of this session, disabled by default.
+        if optional_args.get("command_cache", False):
+            cache_size = optional_args.get("command_cache_size", 64)
+        else:
+            cache_size = 0
+        self.command_cache = CommandCache(
+            ttl=optional_args.get("command_cache_ttl", 30), maxsize=cache_size
+        )
+        # Full route table fetched once and answering get_route_to() locally, if enabled.
+        self.route_table_cache = optional_args.get("route_table_cache", False)
+        self.route_table_ttl = optional_args.get("route_table_ttl", 60)
+        self._route_table = None
+        self._route_table_time = None
+        # Running configurations kept on disk, fetched again only when their files changed:
+        # a directory, or a ConfigCache instance shared with other drivers.
+        self.config_cache = optional_args.get("config_cache", None)
+        if isinstance(self.config_cache, str):
+            self.config_cache = config_cache.ConfigCache(
+                self.config_cache,
+                max_bytes=optional_args.get("config_cache_max_bytes", 64 * 1024 * 1024),
+            )
+        # Last results of the getters polled through their *_delta variant.
+        self._delta_trackers = {}
+
+        # Timing and payload instrumentation, disabled by default: True for a recorder of
+        # this driver only, or an Instrumentation instance shared with other drivers.
+        self.instrumentation = optional_args.get("instrumentation", None)
+        if self.instrumentation is True:
+            self.instrumentation = Instrumentation()
+        elif self.instrumentation is False:
+            self.instrumentation = None
+        if self.instrumentation is not None:
+            for name in dir(type(self)):
+                if name.startswith("get_") or name in ("cli", "ping"):
+                    method = getattr(self, name)
+                    setattr(
+                        self, name, self.instrumentation.wrap_getter(self.hostname, name, method)
+                    )
 
     def open(self):
-        try:
-            self.device = ConnectHandler(
-                device_type="linux",
-                host=self.hostname,
-                username=self.username,
-                password=self.password,
-                **self.netmiko_optional_args
+        if self.backend == "nvue":
+            from napalm_cumulus.utils.nvue import NvueClient
+
+            self.nvue = NvueClient(
+                self.hostname,
+                self.username,
+                self.password,
+                timeout=self.timeout,
+                **self.nvue_optional_args
+            )
+        self._privileged = False
+        self._vtysh_running = None
+        if self.backend == "nvue":
+            self._lazy_device = True
+            return
+        self._open_device()
+
+    @property
+    def device(self):
+        """The SSH session, or the replayed one, opened on first use with the NVUE backend."""
+        if self._device is None and self._lazy_device:
+            self._open_device()
+        return self._device
+
+    @device.setter
+    def device(self, device):
+        self._device = device
+
+    def _open_device(self):
+        if self.connection_pool is None:
+            device = self._connect()
+        else:
+            device = self.connection_pool.acquire(
+                self._pool_key(), self._connect, self._connection_alive, timeout=self.timeout
             )
-        except NetMikoTimeoutException:
-            raise ConnectionException("Cannot connect to {}".format(self.hostname))
+        if self.record_archive:
+            self._recorder = SessionRecorder(self.record_archive, self.hostname)
+            device = RecordingDevice(device, self._recorder)
+        # Set last, so a failed connection is attempted again on next use.
+        self.device = device
+        self._lazy_device = False
+
+    def _connect(self):
+        if self.transport == "replay":
+            return ArchiveDevice(self.replay_archive)
+        if self.transport == "exec":
+            try:
+                if self.privilege_mode == "sudo_noninteractive":
+                    sudo_pwd = None
+                else:
+                    sudo_pwd = self.sudo_pwd
+                device = ExecChannelConnection(
+                    self.hostname,
+                    self.username,
+                    self.password,
+                    sudo_pwd=sudo_pwd,
+                    timeout=self.timeout,
+                    **self.netmiko_optional_args
+                )
+            except (socket.error, paramiko.SSHException):
+                raise ConnectionException("Cannot connect to {}".format(self.hostname))
+        else:
+            try:
+                device = ConnectHandler(
+                    device_type="linux",
+                    host=self.hostname,
+                    username=self.username,
+                    password=self.password,
+                    **self.netmiko_optional_args
+                )
+            except NetMikoTimeoutException:
+                raise ConnectionException("Cannot connect to {}".format(self.hostname))
+
+        if self.connection_pool is not None and self.connection_pool.keepalive:
+            self._ssh_transport(device).set_keepalive(self.connection_pool.keepalive)
+        return device
+
+    def _pool_key(self):
+        """Identify the connections this driver can borrow from the connection pool."""
+        return (
+            self.transport,
+            self.privilege_mode,
+            self.hostname,
+            self.username,
+            self.password,
+            self.sudo_pwd,
+            tuple(sorted(self.netmiko_optional_args.items())),
+        )
 
     def close(self):
-        self.device.disconnect()
+        if self.nvue is not None:
+            self.nvue.close()
+            self.nvue = None
+        self._lazy_device = False
+        if self._device is None:
+            # The NVUE backend never needed the SSH session.
+            return
+        if self._recorder is not None:
+            self.device = self.device.device
+            self._recorder.close()
+            self._recorder = None
+        if self.connection_pool is None:
+            self.device.disconnect()
+            return
+
+        device, self.device = self.device, None
+        if self.loaded:
+            # Don't hand a session that loaded a candidate over to another driver.
+            self.connection_pool.discard(device)
+            return
+        if self._privileged:
+            self._privileged = False
+            try:
+                device.exit_enable_mode()
+            except Exception:
+                self.connection_pool.discard(device)
+                return
+        self.connection_pool.release(self._pool_key(), device)
 
     def is_alive(self):
-        return {"is_alive": self.device.remote_conn.transport.is_active()}
+        if self.nvue is not None and not self.nvue.is_alive():
+            return {"is_alive": False}
+        if self._device is None:
+            return {"is_alive": self._lazy_device}
+        return {"is_alive": self._connection_alive(self.device)}
+
+    def _connection_alive(self, device):
+        if self.transport == "replay":
+            return True
+        return self._ssh_transport(device).is_active()
+
+    def _ssh_transport(self, device=None):
+        """Return the paramiko Transport carrying the session, whichever transport is used."""
+        if device is None:
+            device = self.device
+        if self.transport == "exec":
+            return device.transport
+        return device.remote_conn.transport
 
     def load_merge_candidate(self, filename=None, config=None):
         if not filename and not config:
             raise MergeConfigException("filename or config param must be provided.")
 
         self.loaded = True
+        self.command_cache.invalidate()
 
         if filename is not None:
             with open(filename, "r") as f:
@@ -107,151 +354,541 @@ class CumulusDriver(NetworkDriver):
         if not isinstance(candidate, list):
             candidate = [candidate]
 
+        if self.bulk_merge:
+            self._load_merge_candidate_bulk(candidate)
+            return
+
         candidate = [line for line in candidate if line]
         for command in candidate:
-            output = self._send_command(command)
-            if "error" in output or "not found" in output:
+            output = self._send_command(command, check_status=False)
+            if any(text in output for text in self._MERGE_ERRORS):
                 raise MergeConfigException(
                     "Command '{0}' cannot be applied.".format(command)
                 )
 
+    # Output of an NCLU command that couldn't be applied, whatever its exit status.
+    _MERGE_ERRORS = ("error", "not found")
+    # Time allowed for each line of a bulk merge, as every NCLU command starts a process.
+    _MERGE_SECONDS_PER_LINE = 2
+
+    def _load_merge_candidate_bulk(self, candidate):
+        """
+        Apply the candidate as a single script instead of one prompt round-trip per line.
+
+        The script is copied to the switch over SFTP and stops at the first command that
+        fails or prints an error, which is reported with its line number in the candidate.
+        """
+        commands = [
+            (number, line.strip()) for number, line in enumerate(candidate, 1) if line.strip()
+        ]
+        if not commands:
+            return
+
+        marker = batch.new_marker()
+        script = batch.build_batch_script(
+            [command for _, command in commands],
+            marker,
+            separator="\n",
+            abort_on_error=True,
+            abort_on_output=self._MERGE_ERRORS,
+        )
+        path = "/tmp/napalm-merge-{}.sh".format(uuid.uuid4().hex)
+        self._upload(script + "\n", path)
+        output = self._send_command(
+            "sh {0}; rm -f {0}".format(path),
+            read_timeout=max(self.timeout, self._MERGE_SECONDS_PER_LINE * len(commands)),
+        )
+
+        results = batch.parse_batch_results(output, marker)
+        for index, (number, command) in enumerate(commands):
+            result = results.get(index)
+            if result is None:
+                raise MergeConfigException(
+                    "Command '{0}' on line {1} was not applied.".format(command, number)
+                )
+            if result["status"] != 0 or any(
+                text in result["output"] for text in self._MERGE_ERRORS
+            ):
+                raise MergeConfigException(
+                    "Command '{0}' on line {1} cannot be applied.".format(command, number)
+                )
+
+    def load_replace_candidate(self, filename=None, config=None):
+        """
+        Stage a full replacement of configuration files, see replace.parse_config_files.
+
+        The files are copied to the switch in a single SFTP transfer and validated there.
+        Only the files in replace.CONFIG_FILES can be replaced; the others are left as is.
+        """
+        if not filename and not config:
+            raise ReplaceConfigException("filename or config param must be provided.")
+
+        if filename is not None:
+            with open(filename, "r") as f:
+                config = f.read()
+        files = replace.parse_config_files(config)
+        if not files:
+            raise ReplaceConfigException("The candidate holds no configuration file.")
+        unsupported = [path for path in files if path not in replace.CONFIG_FILES]
+        if unsupported:
+            raise ReplaceConfigException(
+                "Cannot replace {}, only {} can be replaced.".format(
+                    ", ".join(unsupported), ", ".join(replace.CONFIG_FILES)
+                )
+            )
+
+        self.discard_config()
+        staging = "/tmp/napalm-replace-{}".format(uuid.uuid4().hex)
+        archive = staging + ".tar.gz"
+        self._upload(replace.pack(files), archive)
+
+        # Unpack, validate, and read the running files in one round-trip. The running files
+        # are read again for every candidate, as they may have changed in the meantime.
+        unpack = "mkdir -p {0} && tar -xzf {1} -C {0}; rm -f {1}".format(
+            shlex.quote(staging), shlex.quote(archive)
+        )
+        checks = [replace.check_command(path, staging) for path in files]
+        reads = [replace.read_command(path) for path in files]
+        results = self._send_commands_batch([unpack] + checks + reads)
+
+        errors = []
+        running = {}
+        if results[unpack]["status"] != 0:
+            errors.append("Cannot unpack the candidate: {}".format(results[unpack]["output"]))
+        else:
+            for path, check in zip(files, checks):
+                if results[check]["status"] != 0:
+                    errors.append("{} is invalid: {}".format(path, results[check]["output"]))
+        for path, read in zip(files, reads):
+            if results[read]["status"] == 0:
+                running[path] = results[read]["output"].strip("\n") + "\n"
+            elif results[read]["status"] == replace.MISSING_STATUS:
+                # A new file, diffed against nothing.
+                running[path] = ""
+            else:
+                errors.append("Cannot read {}: {}".format(path, results[read]["output"]))
+        if errors:
+            self._send_command("rm -rf {}".format(shlex.quote(staging)))
+            raise ReplaceConfigException("\n".join(errors))
+
+        self._replace_candidate = {"staging": staging, "files": files, "running": running}
+        self.loaded = True
+        self.command_cache.invalidate()
+
+    def _upload(self, content, path):
+        """Write `content` to `path` on the switch over SFTP, in a single transfer."""
+        sftp = paramiko.SFTPClient.from_transport(self._ssh_transport())
+        try:
+            with sftp.open(path, "w") as remote_file:
+                remote_file.write(content)
+        finally:
+            sftp.close()
+
     def discard_config(self):
         if self.loaded:
-            self._send_command("net abort")
+            if self._replace_candidate is not None:
+                staging = self._replace_candidate["staging"]
+                self._send_command("rm -rf {}".format(shlex.quote(staging)))
+                self._replace_candidate = None
+            else:
+                self._send_command("net abort")
             self.loaded = False
+            self.command_cache.invalidate()
 
     def compare_config(self):
         if self.loaded:
+            if self._replace_candidate is not None:
+                # Diffed against the running files read when loading the candidate.
+                return replace.diff(
+                    self._replace_candidate["running"], self._replace_candidate["files"]
+                )
             diff = self._send_command("net pending")
             return re.sub(r"\x1b\[\d+m", "", diff)
         return ""
 
     def commit_config(self, message=""):
         if self.loaded:
-            self._send_command("net commit")
+            if self._replace_candidate is not None:
+                self._commit_replace()
+            else:
+                self._send_command("net commit")
+                self._replaced_files = None
             self.changed = True
             self.loaded = False
+            self.command_cache.invalidate()
+            self._route_table = None
+
+    def _commit_replace(self):
+        """Swap the staged files in and apply them, restoring the running ones on failure."""
+        files = self._replace_candidate["files"]
+        marker = batch.new_marker()
+        script = replace.commit_script(list(files), self._replace_candidate["staging"], marker)
+        output = self._send_command(
+            "sudo sh -c {}".format(shlex.quote(script)), check_status=False
+        )
+        self._replace_candidate = None
+        if "{} ok".format(marker) not in output:
+            self.loaded = False
+            if "{} restored".format(marker) in output:
+                raise CommitError("Cannot apply the candidate, running files restored: " + output)
+            raise CommitError("Cannot apply the candidate: " + output)
+        self._replaced_files = list(files)
 
     def rollback(self):
         if self.changed:
-            self._send_command("net rollback last")
+            if self._replaced_files:
+                marker = batch.new_marker()
+                script = replace.rollback_script(self._replaced_files, marker)
+                output = self._send_command(
+                    "sudo sh -c {}".format(shlex.quote(script)), check_status=False
+                )
+                self._replaced_files = None
+                if "{} ok".format(marker) not in output:
+                    raise CommitError("Cannot roll back the replaced files: " + output)
+            else:
+                self._send_command("net rollback last")
             self.changed = False
+            self.command_cache.invalidate()
+            self._route_table = None
+
+    def _send_command(
+        self, command, use_cache=False, decode=True, check_status=True, read_timeout=None
+    ):
+        """
+        Run `command`, returning its output.
 
-    def _send_command(self, command):
-        if command.startswith("sudo"):
+        With the "exec" transport, raises CommandErrorException when the command exits with
+        a nonzero status, unless `check_status` is false for callers inspecting the output
+        of failed commands themselves. `read_timeout` extends the time netmiko waits for
+        the prompt to come back, in seconds; exec channels are read until EOF.
+        """
+        if use_cache:
+            response = self.command_cache.get(command)
+            if response is not None:
+                if self.instrumentation is not None:
+                    self.instrumentation.record_command(
+                        self.hostname, command, 0.0, response, cached=True
+                    )
+                return response
+        if self.instrumentation is not None:
+            start = time.perf_counter()
+        privileged = command.startswith("sudo")
+        if privileged:
+            self._enter_privileged()
+        sent = self._privileged_command(command) if privileged else command
+        status = 0
+        if self.transport == "exec":
+            # Exec channels report the exit status, and hand over the raw bytes when not
+            # decoding, which JSON decoders take as they are.
+            response, status = self.device.run(sent, decode=decode)
+        elif read_timeout is not None:
+            response = self.device.send_command(sent, **self._read_timeout_args(read_timeout))
+        else:
+            response = self.device.send_command(sent)
+        if privileged:
+            self._exit_privileged()
+        if self.instrumentation is not None:
+            self.instrumentation.record_command(
+                self.hostname, command, time.perf_counter() - start, response
+            )
+        if status != 0 and check_status:
+            raise command_error(command, status, response)
+        if use_cache:
+            self.command_cache.set(command, response)
+        return response
+
+    def _channel_transport(self):
+        """Return the SSH transport to open concurrent channels on, or None if there's none."""
+        if self.max_channels < 2 or self.transport == "replay" or self._recorder is not None:
+            # Concurrent channels would bypass the replayed or recorded session.
+            return None
+        try:
+            transport = self._ssh_transport()
+        except AttributeError:
+            # Not a paramiko session, e.g. a telnet connection.
+            return None
+        if transport is None or not transport.is_active():
+            return None
+        return transport
+
+    def _send_commands(self, commands, use_cache=False, decode=True):
+        """
+        Run independent read-only commands, returning their outputs in order.
+
+        The commands missing from the command cache run concurrently, each on its own exec
+        channel of the session's SSH transport, at most `max_channels` at a time, so they
+        take about as long as the slowest one. Without a transport to open channels on,
+        they run one after the other.
+        """
+        transport = self._channel_transport()
+        if transport is None or len(commands) < 2:
+            return [self._send_command(c, use_cache=use_cache, decode=decode) for c in commands]
+
+        outputs = {}
+        if use_cache:
+            for command in commands:
+                response = self.command_cache.get(command)
+                if response is not None:
+                    outputs[command] = response
+                    if self.instrumentation is not None:
+                        self.instrumentation.record_command(
+                            self.hostname, command, 0.0, response, cached=True
+                        )
+        pending = [c for c in dict.fromkeys(commands) if c not in outputs]
+        if pending:
+            privileged = [c for c in pending if c.startswith("sudo")]
+            self.privilege_stats["privileged_commands"] += len(privileged)
+            if privileged and self.instrumentation is not None:
+                self.instrumentation.record_privileged(self.hostname, len(privileged), 0)
+            sudo_pwd = None if self.privilege_mode == "sudo_noninteractive" else self.sudo_pwd
+            start = time.perf_counter()
+            runs = exec_commands(
+                transport,
+                [self._privileged_command(c) if c in privileged else c for c in pending],
+                self.max_channels,
+                sudo_pwd=sudo_pwd,
+                timeout=self.timeout,
+                decode=decode,
+            )
+            seconds = time.perf_counter() - start
+            for command, (output, status, _) in zip(pending, runs):
+                if status != 0:
+                    raise command_error(command, status, output)
+                outputs[command] = output.rstrip("\n" if decode else b"\n")
+                if use_cache:
+                    self.command_cache.set(command, outputs[command])
+            if self.instrumentation is not None:
+                self.instrumentation.record_concurrent_commands(
+                    self.hostname,
+                    [
+                        (command, run_seconds, output)
+                        for command, (output, _, run_seconds) in zip(pending, runs)
+                    ],
+                    seconds,
+                )
+        return [outputs[command] for command in commands]
+
+    @staticmethod
+    def _read_timeout_args(seconds):
+        """Return the send_command() arguments waiting `seconds` for the prompt."""
+        if int(netmiko.__version__.split(".")[0]) >= 4:
+            return {"read_timeout": seconds}
+        # Older releases wait 500 loops of 0.2s times the delay factor.
+        return {"delay_factor": seconds / 100.0}
+
+    def _privileged_command(self, command):
+        if self.privilege_mode == "sudo_noninteractive":
+            return "sudo -n " + command[len("sudo"):].lstrip()
+        return command
+
+    def _enter_privileged(self):
+        """Get ready to run a privileged command, elevating the shell only when needed."""
+        self.privilege_stats["privileged_commands"] += 1
+        elevate = not (
+            self._privileged
+            or self.transport == "exec"
+            or self.privilege_mode == "sudo_noninteractive"
+        )
+        if elevate:
             try:
                 self.device.enable()
             except ValueError:
                 raise CommandErrorException("Unable to sudo")
-        response = self.device.send_command(command)
-        if command.startswith("sudo"):
+            self._privileged = True
+            self.privilege_stats["elevations"] += 1
+        if self.instrumentation is not None:
+            self.instrumentation.record_privileged(self.hostname, 1, int(elevate))
+
+    def _exit_privileged(self):
+        if self._privileged and self.privilege_mode == "per_command":
             self.device.exit_enable_mode()
-        return response
+            self._privileged = False
 
-    def get_facts(self):
-        facts = {}
-
-        # Get "net show system" output.
-        system = json.loads(self._send_command("net show system json"))
-
-        facts = {
-            "uptime": string_parsers.convert_uptime_string_seconds(system["uptime"]),
-            "vendor": system["eeprom"]["tlv"]["Vendor Name"]["value"],
-            "model": system["eeprom"]["tlv"]["Product Name"]["value"],
-            "hostname": system["hostname"],
-            "os_version": system["os-version"],
-            "serial_number": system["eeprom"]["tlv"]["Serial Number"]["value"],
-        }
-        facts["fqdn"] = facts["hostname"]
+    @property
+    def privilege_round_trips_saved(self):
+        """
+        Number of enable()/exit_enable_mode() round-trips avoided so far.
 
-        # Get "net show interface all json" output.
-        interfaces = self._send_command("net show interface all json")
-        # Handling bad send_command_timing return output.
+        In the default "per_command" privilege mode every privileged command, or batch of
+        commands, pays for elevating the shell and dropping back. With instrumentation
+        enabled, the round-trips saved are also totalled per getter.
+        """
+        stats = self.privilege_stats
+        return 2 * (stats["privileged_commands"] - stats["elevations"])
+
+    def _iter_command(self, command):
+        """
+        Yield the output of an unprivileged command in chunks, as the transport reads it.
+
+        With the "exec" transport, raises CommandErrorException once the output is read if
+        the command exited with a nonzero status.
+        """
+        if self.transport != "exec":
+            return iter([self._send_command(command)])
+        chunks = check_exit_status(command, self.device.iter_command(command))
+        if self.instrumentation is not None:
+            chunks = self.instrumentation.iter_chunks(self.hostname, command, chunks)
+        return chunks
+
+    def _iter_parsed(self, command, parse, *args):
+        """
+        Yield the entries `parse` reads from the streamed output of `command`.
+
+        A failing command prints an error rather than what `parse` expects, so on a
+        ValueError the rest of the output is read for the exit status, and a nonzero one
+        raises CommandErrorException instead.
+        """
+        chunks = self._iter_command(command)
         try:
-            interfaces = json.loads(interfaces)
+            yield from parse(chunks, *args)
         except ValueError:
-            interfaces = json.loads(
-                self.device.send_command("net show interface all json")
-            )
+            for _ in chunks:
+                pass
+            raise
 
-        facts["interface_list"] = string_parsers.sorted_nicely(interfaces.keys())
-        return facts
+    def _send_commands_batch(self, commands):
+        """
+        Run `commands` in a single remote shell invocation.
 
-    def get_arp_table(self, vrf=""):
+        Each command's output is framed by unique sentinel lines, so one prompt round-trip
+        serves the whole batch. Returns an OrderedDict mapping every command to a dict with
+        its ``output`` and exit ``status``.
+        """
+        marker = batch.new_marker()
+        script = batch.build_batch_script(
+            [
+                self._privileged_command(c) if c.startswith("sudo") else c
+                for c in commands
+            ],
+            marker,
+        )
+        if self.instrumentation is not None:
+            start = time.perf_counter()
+        privileged = any(command.startswith("sudo") for command in commands)
+        if privileged:
+            self._enter_privileged()
+            if self.transport == "exec":
+                # Elevate the whole script once, as enable() does for the interactive shell.
+                script = self._privileged_command("sudo sh -c {}".format(shlex.quote(script)))
+            output = self.device.send_command(script)
+            self._exit_privileged()
+        else:
+            output = self.device.send_command(script)
+        if self.instrumentation is not None:
+            # Batches are recorded as a whole, under their commands joined with "; ".
+            self.instrumentation.record_command(
+                self.hostname, "; ".join(commands), time.perf_counter() - start, output
+            )
 
+        results = batch.parse_batch_output(output, commands, marker)
+        missing = [command for command in commands if command not in results]
+        if missing:
+            raise CommandErrorException(
+                "No output received for command(s): {}".format(", ".join(missing))
+            )
+        return results
+
+    def _send_json_command(self, command):
+        """Send a read-only command returning JSON, served from the command cache if enabled."""
+        output = self._send_command(command, use_cache=True, decode=False)
+        if self.transport == "exec":
+            # Exec channels are read until EOF, so the output is never truncated.
+            return fastjson.loads(output)
+        # Handling bad send_command_timing return output.
+        try:
+            return fastjson.loads(output)
+        except ValueError:
+            if self.instrumentation is not None:
+                self.instrumentation.record_retry(self.hostname, command)
+            self.command_cache.invalidate(command)
+            return fastjson.loads(self._send_command(command, use_cache=True))
+
+    def _send_json_commands(self, commands):
+        """Send independent read-only commands returning JSON, concurrently when possible."""
+        if len(commands) < 2 or self._channel_transport() is None:
+            return [self._send_json_command(command) for command in commands]
+        # Exec channels are read until EOF, so the outputs are never truncated.
+        return [
+            fastjson.loads(output)
+            for output in self._send_commands(commands, use_cache=True, decode=False)
+        ]
+
+    def _nvue_get(self, api_path):
+        return self._nvue_get_many([api_path])[0]
+
+    def _nvue_get_many(self, api_paths):
         """
-        TODO replace with ip neighbor command since arp is being deprecated
-        'show arp' output example:
-        Address                  HWtype  HWaddress           Flags Mask            Iface
-        10.129.2.254             ether   00:50:56:97:af:b1   C                     eth0
-        192.168.1.134                    (incomplete)                              eth1
-        192.168.1.1              ether   00:50:56:ba:26:7f   C                     eth1
-        10.129.2.97              ether   00:50:56:9f:64:09   C                     eth0
-        192.168.1.3              ether   00:50:56:86:7b:06   C                     eth1
-        """
-        if vrf:
-            raise NotImplementedError
-        output = self._send_command("arp -n")
-        output = output.split("\n")
-        output = output[1:]
-        arp_table = list()
-
-        for line in output:
-            line = line.split()
-            if "incomplete" in line[1]:
-                macaddr = "00:00:00:00:00:00"
-            else:
-                macaddr = line[2]
+        Fetch NVUE resources concurrently, returning their decoded JSON in order.
 
-            arp_table.append(
-                {"interface": line[-1], "mac": macaddr, "ip": line[0], "age": 0.0}
+        With instrumentation enabled, every request is recorded as a "GET <resource>"
+        command, and the getter is charged the wall time of the requests.
+        """
+        if self.instrumentation is None:
+            return self.nvue.get_many(api_paths)
+        runs = []
+        start = time.perf_counter()
+        results = self.nvue.get_many(
+            api_paths,
+            on_response=lambda api_path, seconds, body: runs.append(
+                ("GET " + api_path, seconds, body)
+            ),
+        )
+        self.instrumentation.record_concurrent_commands(
+            self.hostname, runs, time.perf_counter() - start
+        )
+        return results
+
+    def get_facts(self):
+        if self.backend == "nvue":
+            system, hardware, interfaces = self._nvue_get_many(
+                ["/system", "/platform/hardware", "/interface"]
             )
-        return arp_table
+            return parsers.parse_nvue_facts(system, hardware, interfaces)
+        # Get "net show system" and "net show interface all json" outputs.
+        system, interfaces = self._send_json_commands(
+            ["net show system json", "net show interface all json"]
+        )
+        return parsers.parse_facts(system, interfaces)
 
-    def get_ntp_stats(self):
+    def get_arp_table(self, vrf=""):
+        return list(self.iter_arp_table(vrf))
+
+    def iter_arp_table(self, vrf=""):
         """
-        'ntpq -np' output example
-             remote           refid      st t when poll reach   delay   offset  jitter
-        ==============================================================================
-         116.91.118.97   133.243.238.244  2 u   51   64  377    5.436  987971. 1694.82
-         219.117.210.137 .GPS.            1 u   17   64  377   17.586  988068. 1652.00
-         133.130.120.204 133.243.238.164  2 u   46   64  377    7.717  987996. 1669.77
+        Yield the entries of get_arp_table() one at a time.
+
+        With the "exec" transport entries are parsed while the output is still being read,
+        so memory use stays flat however large the table is.
         """
+        return self._iter_parsed(parsers.neighbors_command(4, vrf), parsers.iter_neighbors)
 
-        output = self._send_command("ntpq -np")
-        output = output.split("\n")[2:]
-        ntp_stats = list()
+    def get_ipv6_neighbors_table(self):
+        return parsers.parse_ipv6_neighbors_table(
+            self._send_command(parsers.neighbors_command(6))
+        )
 
-        for ntp_info in output:
-            if len(ntp_info) > 0:
-                remote, refid, st, t, when, hostpoll, reachability, delay, offset, jitter = (
-                    ntp_info.split()
-                )
+    def get_mac_address_table(self):
+        return list(self.iter_mac_address_table())
 
-                # 'remote' contains '*' if the machine synchronized with NTP server
-                synchronized = "*" in remote
-
-                match = re.search(r"(\d+\.\d+\.\d+\.\d+)", remote)
-                ip = match.group(1)
-
-                when = when if when != "-" else 0
-
-                ntp_stats.append(
-                    {
-                        "remote": ip,
-                        "referenceid": refid,
-                        "synchronized": bool(synchronized),
-                        "stratum": int(st),
-                        "type": t,
-                        "when": when,
-                        "hostpoll": int(hostpoll),
-                        "reachability": int(reachability),
-                        "delay": float(delay),
-                        "offset": float(offset),
-                        "jitter": float(jitter),
-                    }
-                )
-        return ntp_stats
+    def iter_mac_address_table(self):
+        """
+        Yield the entries of get_mac_address_table() one at a time.
+
+        With the "exec" transport entries are parsed while the output is still being read.
+        """
+        pvids = parsers.parse_bridge_vlans(
+            self._send_command(parsers.BRIDGE_VLANS_COMMAND, use_cache=True)
+        )
+        return self._iter_parsed(
+            parsers.MAC_ADDRESS_TABLE_COMMAND, parsers.iter_mac_address_table, pvids
+        )
+
+    def get_mac_address_table_compact(self):
+        """Return the MAC address table as a MacAddressTable, packed into arrays."""
+        return MacAddressTable(self.iter_mac_address_table())
+
+    def get_ntp_stats(self):
+        return parsers.parse_ntp_stats(self._send_command("ntpq -np"))
 
     def ping(
         self,
@@ -263,227 +900,111 @@ class CumulusDriver(NetworkDriver):
         count=C.PING_COUNT,
         vrf=C.PING_VRF,
     ):
-
-        deadline = timeout * count
-
-        command = "ping %s " % destination
-        command += "-t %d " % int(ttl)
-        command += "-w %d " % int(deadline)
-        command += "-s %d " % int(size)
-        command += "-c %d " % int(count)
-        if source != "":
-            command += "interface %s " % source
-
-        ping_result = dict()
-        output_ping = self._send_command(command)
-
-        if "Unknown host" in output_ping:
-            err = "Unknown host"
-        else:
-            err = ""
-
-        if err != "":
-            ping_result["error"] = err
-        else:
-            # 'packet_info' example:
-            # ['5', 'packets', 'transmitted,' '5', 'received,' '0%', 'packet',
-            # 'loss,', 'time', '3997ms']
-            packet_info = output_ping.split("\n")
-
-            if "transmitted" in packet_info[-2]:
-                packet_info = packet_info[-2]
-            else:
-                packet_info = packet_info[-3]
-
-            packet_info = [x.strip() for x in packet_info.split()]
-
-            sent = int(packet_info[0])
-            received = int(packet_info[3])
-            lost = sent - received
-
-            # 'rtt_info' example:
-            # ["0.307/0.396/0.480/0.061"]
-            rtt_info = output_ping.split("\n")
-
-            if len(rtt_info[-1]) > 0:
-                rtt_info = rtt_info[-1]
-            else:
-                rtt_info = rtt_info[-2]
-
-            match = re.search(r"([\d\.]+)/([\d\.]+)/([\d\.]+)/([\d\.]+)", rtt_info)
-
-            if match is not None:
-                rtt_min = float(match.group(1))
-                rtt_avg = float(match.group(2))
-                rtt_max = float(match.group(3))
-                rtt_stddev = float(match.group(4))
-            else:
-                rtt_min = None
-                rtt_avg = None
-                rtt_max = None
-                rtt_stddev = None
-
-            ping_responses = list()
-            response_info = output_ping.split("\n")
-
-            for res in response_info:
-                match_res = re.search(r"from\s([\d\.]+).*time=([\d\.]+)", res)
-                if match_res is not None:
-                    ping_responses.append(
-                        {
-                            "ip_address": match_res.group(1),
-                            "rtt": float(match_res.group(2)),
-                        }
-                    )
-
-            ping_result["success"] = dict()
-
-            ping_result["success"] = {
-                "probes_sent": sent,
-                "packet_loss": lost,
-                "rtt_min": rtt_min,
-                "rtt_max": rtt_max,
-                "rtt_avg": rtt_avg,
-                "rtt_stddev": rtt_stddev,
-                "results": ping_responses,
-            }
-
-            return ping_result
-
-    def _get_interface_neighbors(self, neighbors_list):
-        neighbors = []
-        for neighbor in neighbors_list:
-            temp = {}
-            temp["hostname"] = neighbor["adj_hostname"]
-            temp["port"] = neighbor["adj_port"]
-            neighbors.append(temp)
-        return neighbors
+        command = parsers.ping_command(destination, source, ttl, timeout, size, count)
+        # ping exits with a nonzero status when replies are missing.
+        return parsers.parse_ping(self._send_command(command, check_status=False))
 
     def get_lldp_neighbors(self):
         """Cumulus get_lldp_neighbors."""
-        lldp = {}
-        command = "net show interface all json"
-
-        try:
-            intf_output = json.loads(self._send_command(command))
-        except ValueError:
-            intf_output = json.loads(self.device.send_command(command))
-
-        for interface in intf_output:
-            if intf_output[interface]["iface_obj"]["lldp"] is not None:
-                lldp[interface] = self._get_interface_neighbors(
-                    intf_output[interface]["iface_obj"]["lldp"]
-                )
-        return lldp
+        if self.backend == "nvue":
+            # One request per port with a link up, sent concurrently.
+            interfaces = parsers.nvue_lldp_interfaces(self._nvue_get("/interface"))
+            lldp = self._nvue_get_many(
+                [parsers.nvue_path("interface", interface, "lldp") for interface in interfaces]
+            )
+            return parsers.parse_nvue_lldp_neighbors(dict(zip(interfaces, lldp)))
+        intf_output = self._send_json_command("net show interface all json")
+        return parsers.parse_lldp_neighbors(intf_output)
 
     def get_interfaces(self):
-        def _convert_speed(speed):
-            if speed.endswith("M") and speed.strip("M").isdigit():
-                return int(speed.strip("M"))
-            elif speed.endswith("G") and speed.strip("G").isdigit():
-                return int(speed.strip("G")) * 1000
-            return -1
-
-        interfaces = {}
+        if self.backend == "nvue":
+            return parsers.parse_nvue_interfaces(self._nvue_get("/interface"))
         # Get 'net show interface all json' output.
-        output = self._send_command("net show interface all json")
-        # Handling bad send_command_timing return output.
-        try:
-            output_json = json.loads(output)
-        except ValueError:
-            output_json = json.loads(
-                self.device.send_command("net show interface all json")
+        output_json = self._send_json_command("net show interface all json")
+        # Determine the current time on the system, to be used when determining the last
+        # flap, and collect the router daemon output in the same round-trip. Whether a
+        # routing daemon runs is only checked once per session.
+        date_command = "date '+{}'".format(parsers.DATE_FORMAT)
+        version_command = "sudo vtysh -c 'show version'"
+        show_int_command = "sudo vtysh -c 'show interface'"
+        if self._vtysh_running is None:
+            commands = [date_command, version_command, show_int_command]
+        elif self._vtysh_running:
+            commands = [date_command, show_int_command]
+        else:
+            commands = [date_command]
+        results = self._send_commands_batch(commands)
+
+        if self._vtysh_running is None:
+            self._vtysh_running = parsers.vtysh_daemons_running(
+                results[version_command]["output"]
             )
-        # Determine the current time on the system, to be used when determining the last flap
-        date_format = "%Y/%m/%d %H:%M:%S"
-        current_time = self._send_command("date '+{}'".format(date_format))
-        current_time = datetime.strptime(current_time.strip(), date_format)
-        for interface, iface_data in output_json.items():
-            interfaces[interface] = {
-                "description": iface_data["iface_obj"]["description"],
-                "is_enabled": False if iface_data["linkstate"] == "ADMDN" else True,
-                "is_up": True if iface_data["linkstate"] == "UP" else False,
-                "mac_address": iface_data["iface_obj"]["mac"],
-                "mtu": iface_data["iface_obj"]["mtu"],
-                "speed": _convert_speed(iface_data["speed"]),
-            }
-
-        # Calculate last interface flap time. Dependent on router daemon
-        # Send command to determine if router daemon is running. Not dependent on quagga or frr
-        daemon_check = self._send_command("sudo vtysh -c 'show version'")
-        if "Exiting: failed to connect to any daemons." in daemon_check:
-            for interface in interfaces.keys():
-                interfaces[interface]["last_flapped"] = -1.0
-            return interfaces
-
-        show_int_output = self._send_command("sudo vtysh -c 'show interface'")
-        split_int_output = list(
-            filter(None, re.split("(?!Interface Type)Interface", show_int_output))
+        show_int_output = None
+        if self._vtysh_running:
+            show_int_output = results[show_int_command]["output"]
+        return parsers.parse_interfaces(
+            output_json, parsers.parse_date(results[date_command]["output"]), show_int_output
         )
-        for block in split_int_output:
-            lines = block.splitlines()
-            last_down = None
-            last_up = None
-            iface = None
-            for l in lines:
-                if "is up" in l or "is down" in l:
-                    iface = l.split()[0].lower()
-                # Grab the last two elements and make them a string
-                elif "Link ups: " in l:
-                    last_up = " ".join(l.split()[-2:])
-                elif "Link downs: " in l:
-                    last_down = " ".join(l.split()[-2:])
-                    break
-            # If we don't have the interface already move on
-            if not interfaces.get(iface):
-                continue
-            # If we are unable to find either the up or the down message return -1
-            if not (last_down or last_up):
-                interfaces[iface]["last_flapped"] = -1.0
-            # If both interfaces have never flapped return -1
-            elif all(["never" in i for i in [last_up, last_down]]):
-                interfaces[iface]["last_flapped"] = -1.0
-            else:
-                # Convert to datetime while not choking on the never
-                last_down = (
-                    datetime(1970, 1, 1)
-                    if "never" in last_down
-                    else datetime.strptime(last_down, "%Y/%m/%d %H:%M:%S.%f")
-                )
-                last_up = (
-                    datetime(1970, 1, 1)
-                    if "never" in last_up
-                    else datetime.strptime(last_up, "%Y/%m/%d %H:%M:%S.%f")
-                )
-                # figure out which is the most recent
-                most_recent = last_up if last_up > last_down else last_down
-                last_flap = current_time - most_recent
-                interfaces[iface]["last_flapped"] = float(last_flap.seconds)
-        return interfaces
+
+    def get_interfaces_delta(self, ignore=("last_flapped",)):
+        """
+        Return the changes in get_interfaces() since the previous call, see DeltaTracker.
+
+        The complete output is only fetched when the digest of 'ip -o link show' changed,
+        which covers the link state, MTU, MAC address and description of every interface.
+        Changes of the `ignore` keys alone aren't reported.
+        """
+        tracker = self._delta_tracker("get_interfaces", delta.interface_items, ignore)
+        fingerprint = self._send_command(parsers.INTERFACES_FINGERPRINT_COMMAND)
+        if tracker.fingerprint is not None and fingerprint == tracker.fingerprint:
+            return tracker.unchanged()
+        return tracker.update(self.get_interfaces(), fingerprint)
+
+    def _delta_tracker(self, getter, split, ignore):
+        tracker = self._delta_trackers.get(getter)
+        if tracker is None:
+            tracker = self._delta_trackers[getter] = delta.DeltaTracker(split)
+        tracker.ignore = frozenset(ignore)
+        return tracker
+
+    def get_interfaces_counters(self):
+        return parsers.parse_interfaces_counters(
+            self._send_command(parsers.INTERFACES_COUNTERS_COMMAND)
+        )
+
+    def poll_interfaces_counters(self, interval=5, history=720):
+        """
+        Poll the interface counters every `interval` seconds, returning a CounterPoller.
+
+        Iterating the poller yields the per-second rates of every counter over the last
+        interval; its `history` keeps the last `history` samples. With the "exec"
+        transport a single command samples the counters on the device, at device time, on
+        a channel kept open until the poller is closed. `interval` must be shorter than
+        the driver timeout.
+        """
+        return CounterPoller(self._iter_counter_samples(interval), history)
+
+    def _iter_counter_samples(self, interval):
+        if self.transport == "exec":
+            chunks = self._iter_command(parsers.interfaces_counters_poll_command(interval))
+            timestamp = None
+            for line in parsers.iter_lines(chunks):
+                if line.startswith("["):
+                    yield timestamp, parsers.parse_interfaces_counters(line)
+                elif line:
+                    timestamp = float(line)
+            return
+        while True:
+            start = time.monotonic()
+            yield start, self.get_interfaces_counters()
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
 
     def get_interfaces_ip(self):
-        interfaces_ip = defaultdict(lambda: defaultdict(lambda: defaultdict()))
+        if self.backend == "nvue":
+            return parsers.parse_nvue_interfaces_ip(self._nvue_get("/interface"))
         # Get net show interface all json output.
-        output = self._send_command("net show interface all json")
-        # Handling bad send_command_timing return output.
-        try:
-            output_json = json.loads(output)
-        except ValueError:
-            output_json = json.loads(
-                self.device.send_command("net show interface all json")
-            )
-        for interface in output_json:
-            if not output_json[interface]["iface_obj"]["ip_address"]["allentries"]:
-                continue
-            for ip_address in output_json[interface]["iface_obj"]["ip_address"][
-                "allentries"
-            ]:
-                ip_ver = ipaddress.ip_interface(ip_address).version
-                ip_ver = "ipv{}".format(ip_ver)
-                ip, prefix = ip_address.split("/")
-                interfaces_ip[interface][ip_ver][ip] = {"prefix_length": int(prefix)}
-
-        return interfaces_ip
+        output_json = self._send_json_command("net show interface all json")
+        return parsers.parse_interfaces_ip(output_json)
 
     def get_config(self, retrieve="all", full=False, sanitized=False):
         # Initialise the configuration dictionary
@@ -491,9 +1012,7 @@ class CumulusDriver(NetworkDriver):
 
         if retrieve in ("running", "all"):
             # Get net show configuration output.
-            output = self._send_command("net show configuration")
-
-            configuration["running"] = output
+            configuration["running"] = self._get_running_config()
 
         if retrieve in ("candidate", "all"):
             # Get net pending output.
@@ -503,201 +1022,137 @@ class CumulusDriver(NetworkDriver):
 
         return configuration
 
-    def get_bgp_neighbors(self):
-        vrf = "global"
-        bgp_neighbors = {vrf: {}}
-        bgp_neighbor = {}
-        supported_afis = ["ipv4 unicast", "ipv6 unicast"]
-        bgp_summary_output = self._send_command("net show bgp summary json")
-        dev_bgp_summary = json.loads(bgp_summary_output)
-        bgp_neighbors_output = self._send_command("net show bgp neighbor json")
-        dev_bgp_neighbors = json.loads(bgp_neighbors_output)
-        for afi in dev_bgp_summary:
-            if not (afi.lower() in supported_afis) or not dev_bgp_summary[afi]:
-                continue
-            bgp_neighbors[vrf]["router_id"] = dev_bgp_summary[afi]["routerId"]
-            bgp_neighbors[vrf].setdefault("peers", {})
-            for peer in dev_bgp_summary[afi]["peers"]:
-                bgp_neighbor = {}
-                bgp_neighbor["local_as"] = dev_bgp_neighbors[peer]["localAs"]
-                bgp_neighbor["remote_as"] = dev_bgp_neighbors[peer]["remoteAs"]
-                bgp_neighbor["remote_id"] = dev_bgp_neighbors[peer]["remoteRouterId"]
-                uptime = dev_bgp_neighbors[peer].get("bgpTimerUpMsec", "")
-                bgp_neighbor["description"] = dev_bgp_neighbors[peer].get("nbrDesc", "")
-                if dev_bgp_neighbors[peer]["bgpState"] == "Established":
-                    is_up = True
-                else:
-                    is_up = False
-                    uptime = -1
-                if dev_bgp_neighbors[peer].get("adminShutDown", False):
-                    is_enabled = False
-                else:
-                    is_enabled = True
-                bgp_neighbor["is_up"] = is_up
-                bgp_neighbor["is_enabled"] = is_enabled
-                bgp_neighbor["uptime"] = int(uptime / 1000)
-                bgp_neighbor.setdefault("address_family", {})
-                for af, af_details in dev_bgp_neighbors[peer][
-                    "addressFamilyInfo"
-                ].items():
-                    af = af.lower()
-                    if not (af in supported_afis):
-                        continue
-                    route_info = {}
-                    bgp_peer_advertised_routes = self._send_command(
-                        "net show bgp {} neighbor {} "
-                        "advertised-routes json".format(af, peer)
-                    )
-                    dev_bgp_peer_advertised_routes = json.loads(
-                        bgp_peer_advertised_routes.replace("n\n", "")
-                    )
-                    peer_advertised_routes = dev_bgp_peer_advertised_routes[
-                        "totalPrefixCounter"
-                    ]
-                    if not is_enabled:
-                        dev_bgp_summary[af]["peers"][peer]["prefixReceivedCount"] = -1
-                        peer_advertised_routes = -1
-                        af_details["acceptedPrefixCounter"] = -1
-                    route_info["received_prefixes"] = dev_bgp_summary[af]["peers"][
-                        peer
-                    ]["prefixReceivedCount"]
-                    route_info["sent_prefixes"] = int(peer_advertised_routes)
-                    route_info["accepted_prefixes"] = af_details[
-                        "acceptedPrefixCounter"
-                    ]
-                    bgp_neighbor["address_family"][af.split()[0]] = route_info
-                bgp_neighbors[vrf]["peers"][peer] = bgp_neighbor
-
-        return bgp_neighbors
+    def _get_running_config(self):
+        """
+        Return the output of "net show configuration".
 
-    def get_snmp_information(self):
-        snmp_config_output = self._send_command("net show configuration snmp-server")
-        contact = system_name = location = ""
-        snmp_information = {}
-        snmp_values = {}
-        community_list = []
-        snmp_values.setdefault("community", {})
-        for parse_snmp_value in snmp_config_output.splitlines():
-            if (
-                "readonly-community" in parse_snmp_value
-                or "readonly-community-v6" in parse_snmp_value
-            ):
-                community_value = parse_snmp_value.strip().split()[1]
-                acl = parse_snmp_value.lstrip().split()[3]
-                if acl == "any":
-                    acl = "N/A"
-                if community_value in community_list:
-                    """
-                    Unlike other routers that use ACL for
-                    snmp access-control, Cumulus directly defines
-                    authorized hosts as part of SNMP config.
-                    E.g:
-                    snmp-server
-                       listening-address all
-                       readonly-community private_multi_host access 10.10.10.1
-                       system-contact NOC
-                       system-location LAB
-                       system-name cumulus-rtr-1
-                    This creates a problem as NAPALM snmp object
-                    shows access-list name as key of community string.
-                    To best present the authorized-host info in the SNMP object,
-                    we show comma separate string of them as key of SNMP community.
-                    """
-                    acl = snmp_values["community"][community_value]["acl"] + "," + acl
-                    snmp_values["community"][community_value] = {
-                        "acl": acl,
-                        "mode": "ro",
-                    }
-                else:
-                    community_list.append(community_value)
-                    snmp_values["community"][community_value] = {
-                        "acl": acl,
-                        "mode": "ro",
-                    }
-            system_contact_parse = re.search(
-                r".*system-contact.(\D.*)", parse_snmp_value.strip()
-            )
-            if system_contact_parse:
-                contact = system_contact_parse.groups()[0]
-            system_location_parse = re.search(
-                r".*system-location.(\D.*)", parse_snmp_value.strip()
+        With a config cache, the output is only fetched when the md5 fingerprint of the
+        files it's rendered from changed, and is then sent gzipped. It runs in a batch to get
+        its exit status on every transport: a failing command raises CommandErrorException
+        and never reaches the cache.
+        """
+        if self.config_cache is None:
+            return self._send_command("net show configuration")
+        fingerprint = config_cache.parse_fingerprint(
+            self._send_command(config_cache.fingerprint_command())
+        )
+        if fingerprint is not None:
+            running = self.config_cache.get(self.hostname, fingerprint)
+            if running is not None:
+                return running
+        command = config_cache.compressed_command("net show configuration")
+        result = self._send_commands_batch([command])[command]
+        running = None
+        if result["status"] == 0:
+            running = config_cache.decompress(result["output"])
+        if running is None:
+            # gzip or base64 may be missing, which fails the pipeline as well.
+            command = "net show configuration"
+            result = self._send_commands_batch([command])[command]
+            if result["status"] != 0:
+                raise command_error(command, result["status"], result["output"])
+            running = result["output"]
+        running = running.rstrip("\n")
+        # Taken before the output, a fingerprint can only be older than the configuration
+        # cached with it, which is then fetched again on the next call.
+        if fingerprint is not None:
+            self.config_cache.set(self.hostname, fingerprint, running)
+        return running
+
+    def get_bgp_neighbors(self):
+        if self.backend == "nvue":
+            # The neighbors of every VRF running BGP are fetched concurrently.
+            vrfs = self._nvue_get("/vrf")
+            names = parsers.nvue_bgp_vrfs(vrfs)
+            neighbors = self._nvue_get_many(
+                [parsers.nvue_path("vrf", vrf, "router", "bgp", "neighbor") for vrf in names]
             )
-            if system_location_parse:
-                location = system_location_parse.groups()[0]
-            system_name_parse = re.search(
-                r".*system-name.(\D.*)", parse_snmp_value.strip()
+            return parsers.parse_nvue_bgp_neighbors(vrfs, dict(zip(names, neighbors)))
+        # The "vrf all" outputs cover every VRF, whatever their number, in two commands.
+        dev_bgp_summary, dev_bgp_neighbors = self._send_json_commands(
+            [parsers.BGP_SUMMARY_COMMAND, parsers.BGP_NEIGHBORS_COMMAND]
+        )
+        return self._get_bgp_neighbors(dev_bgp_summary, dev_bgp_neighbors)
+
+    def _get_bgp_neighbors(self, dev_bgp_summary, dev_bgp_neighbors):
+        advertised_routes = {}
+        if self.bgp_advertised_routes_fallback:
+            # Each advertised-routes table is transferred whole, only for the peers whose
+            # sent prefix count FRR doesn't report.
+            missing = parsers.bgp_peers_missing_sent_prefixes(dev_bgp_summary, dev_bgp_neighbors)
+            outputs = self._send_commands(
+                [parsers.bgp_advertised_routes_command(*key) for key in missing]
             )
-            if system_name_parse:
-                system_name = system_name_parse.groups()[0]
-        snmp_information = snmp_values
-        snmp_information["contact"] = contact
-        snmp_information["chassis_id"] = system_name
-        snmp_information["location"] = location
+            for key, output in zip(missing, outputs):
+                advertised_routes[key] = parsers.parse_bgp_advertised_routes_count(output)
+        return parsers.parse_bgp_neighbors(
+            dev_bgp_summary, dev_bgp_neighbors, advertised_routes
+        )
+
+    def get_bgp_neighbors_delta(self, ignore=("uptime",)):
+        """
+        Return the changes in get_bgp_neighbors() since the previous call, see DeltaTracker.
 
-        return snmp_information
+        The neighbor details are only fetched when the state, prefix counts or AS of a peer
+        changed in the BGP summary. Changes of the `ignore` keys alone aren't reported.
+        """
+        tracker = self._delta_tracker("get_bgp_neighbors", delta.bgp_neighbor_items, ignore)
+        dev_bgp_summary = self._send_json_command(parsers.BGP_SUMMARY_COMMAND)
+        fingerprint = parsers.bgp_summary_fingerprint(dev_bgp_summary)
+        if tracker.fingerprint is not None and fingerprint == tracker.fingerprint:
+            return tracker.unchanged()
+        dev_bgp_neighbors = self._send_json_command(parsers.BGP_NEIGHBORS_COMMAND)
+        return tracker.update(
+            self._get_bgp_neighbors(dev_bgp_summary, dev_bgp_neighbors), fingerprint
+        )
+
+    def get_route_to(self, destination="", protocol="", longer=False):
+        if self.route_table_cache:
+            return self.get_route_table().lookup(destination, protocol, longer)
+        return self._fetch_routes(destination, protocol, longer)
+
+    def _fetch_routes(self, destination="", protocol="", longer=False):
+        commands = parsers.route_to_commands(destination, longer)
+        results = self._send_commands_batch(commands)
+        return parsers.parse_route_to_outputs(
+            [results[command]["output"] for command in commands], protocol
+        )
+
+    def get_route_table(self):
+        """
+        Return the RouteTable of every VRF, fetched at most every `route_table_ttl` seconds.
+
+        get_route_to() answers from it when the "route_table_cache" optional argument is
+        set. It is dropped on commit and rollback.
+        """
+        now = time.monotonic()
+        expired = (
+            self._route_table is not None
+            and self.route_table_ttl is not None
+            and now - self._route_table_time > self.route_table_ttl
+        )
+        if self._route_table is None or expired:
+            self._route_table = RouteTable(self._fetch_routes())
+            self._route_table_time = now
+        return self._route_table
+
+    def get_snmp_information(self):
+        snmp_config_output = self._send_command("net show configuration snmp-server")
+        return parsers.parse_snmp_information(snmp_config_output)
 
     def cli(self, commands):
         cli_output = {}
         if type(commands) is not list:
             raise TypeError("Please enter a valid list of commands!")
+        if not commands:
+            return cli_output
 
-        for command in commands:
-            output = self.device.send_command(command)
-            cli_output[command] = output
+        for command, result in self._send_commands_batch(commands).items():
+            cli_output[command] = result["output"]
         return cli_output
 
     def get_environment(self):
-        def _psu(psu_data):
-            return {
-                psu_data["name"].lower(): {
-                    "status": True if psu_data["state"] == "OK" else False,
-                    "output": float(psu_data.get("input", "-1.0")),
-                    # Capacity data isn't available yet
-                    "capacity": -1.0,
-                }
-            }
-
-        def _fan(fan_data):
-            return {
-                fan_data["name"]: {
-                    "status": True if fan_data["state"] == "OK" else False
-                }
-            }
-
-        def _temp(temp_data):
-            return {
-                temp_data["name"]: {
-                    "temperature": float(temp_data["input"]),
-                    "is_critical": temp_data["input"] > temp_data["crit"],
-                    # 90% of the critical threshold
-                    "is_alert": temp_data["input"] > (temp_data["crit"] * 0.9),
-                }
-            }
-
-        def _memory(memory_data):
-            memory_data = [i for i in memory_data.splitlines() if i.startswith("Mem:")]
-            if not memory_data:
-                return {"available_ram": -1, "used_ram": -1}
-            memory_data = memory_data[0].split()
-            total = memory_data[1]
-            free = memory_data[3]
-            return {
-                "available_ram": int(total) if total.isdigit() else -1,
-                "used_ram": int(free) if free.isdigit() else -1,
-            }
-
-        smonctl_output = self._send_command("sudo smonctl --json")
-        smonctl_output = json.loads(smonctl_output)
-        env_data = {"fans": {}, "temperature": {}, "power": {}, "cpu": {}, "memory": {}}
-        for data in smonctl_output:
-            if "power" == data["type"]:
-                env_data["power"].update(_psu(data))
-            elif "fan" == data["type"]:
-                env_data["fans"].update(_fan(data))
-            elif "temp" == data["type"]:
-                env_data["temperature"].update(_temp(data))
-
-        memory_data = self._send_command("free")
-        env_data["memory"].update(_memory(memory_data))
-
-        return env_data
+        results = self._send_commands_batch(["sudo smonctl --json", "free"])
+        return parsers.parse_environment(
+            fastjson.loads(results["sudo smonctl --json"]["output"]), results["free"]["output"]
+        )
@@ -0,0 +1,176 @@
+# Copyright 2016 Dravetech AB. All rights reserved.
+#
+# The contents of this file are licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with the
+# License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Run getters against many Cumulus switches in parallel.
+
+Example::
+
+    inventory = [
+        {"hostname": "leaf01", "username": "cumulus", "password": "CumulusLinux!"},
+        {"hostname": "leaf02", "username": "cumulus", "password": "CumulusLinux!"},
+    ]
+    collector = FleetCollector(inventory, ["get_facts", "get_interfaces"], max_workers=64)
+    results = collector.collect()
+    results["leaf01"].results["get_facts"]["os_version"]  # e.g. "3.7.5"
+    results["leaf02"].exception  # None, or why leaf02 couldn't be polled
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from napalm.base.exceptions import CommandTimeoutException
+
+from napalm_cumulus.cumulus import CumulusDriver
+
+DeviceResult = namedtuple(
+    "DeviceResult", ["hostname", "results", "errors", "exception", "elapsed"]
+)
+DeviceResult.__doc__ = """
+Outcome of polling one device.
+
+`results` maps each getter that succeeded to its return value and `errors` maps each
+getter that raised to its exception. `exception` is set when the device couldn't be polled
+at all (invalid inventory entry, connection failure or timeout), in which case both dicts
+may be incomplete.
+"""
+
+
+class FleetCollector(object):
+    """
+    Poll an inventory of devices on a bounded pool of worker threads.
+
+    :param inventory: list of dicts with ``hostname``, ``username`` and ``password`` keys,
+        plus optional ``timeout`` and ``optional_args`` passed on to the driver.
+    :param getters: list of getter names, or ``(name, kwargs)`` tuples for getters taking
+        arguments, e.g. ``("get_arp_table", {"vrf": "mgmt"})``.
+    :param max_workers: maximum number of devices polled at the same time.
+    :param timeout: seconds a device may take from the moment its worker picks it up,
+        including ``open()``. Used as the driver timeout unless the inventory sets one.
+    :param driver: driver class to instantiate, taking the arguments of
+        :class:`CumulusDriver`.
+    """
+
+    def __init__(self, inventory, getters, max_workers=32, timeout=120, driver=CumulusDriver):
+        self.inventory = inventory
+        self.getters = [
+            (getter, {}) if isinstance(getter, str) else getter for getter in getters
+        ]
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.driver = driver
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def run(self, poll_interval=0.5):
+        """
+        Poll every device, yielding a :class:`DeviceResult` as each one completes.
+
+        Raises ValueError, before polling any device, if an inventory entry has no hostname.
+        """
+        missing = [
+            index
+            for index, device in enumerate(self.inventory)
+            if not isinstance(device, dict) or not device.get("hostname")
+        ]
+        if missing:
+            raise ValueError(
+                "Inventory entries without a hostname: {}".format(
+                    ", ".join(str(index) for index in missing)
+                )
+            )
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        timed_out = False
+        pending = {}
+        try:
+            for index, device in enumerate(self.inventory):
+                future = executor.submit(self._poll_device, index, device)
+                pending[future] = index
+
+            while pending:
+                done, _ = wait(list(pending), timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)
+                    yield future.result()
+
+                # Workers can't be interrupted, so a device over its deadline is reported
+                # right away and whatever its worker returns later is discarded.
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    with self._lock:
+                        started = self._started.get(index)
+                    if started is not None and now - started > self.timeout:
+                        hostname = self.inventory[index]["hostname"]
+                        pending.pop(future)
+                        future.cancel()
+                        timed_out = True
+                        yield DeviceResult(
+                            hostname,
+                            {},
+                            {},
+                            CommandTimeoutException(
+                                "{} did not complete within {}s".format(hostname, self.timeout)
+                            ),
+                            now - started,
+                        )
+        finally:
+            # Pending devices are left behind when the caller stops iterating early.
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=not timed_out and not pending)
+
+    def collect(self):
+        """Poll every device and return a dict of :class:`DeviceResult` keyed by hostname."""
+        return {result.hostname: result for result in self.run()}
+
+    def _poll_device(self, index, device):
+        hostname = device["hostname"]
+        start = time.monotonic()
+        with self._lock:
+            self._started[index] = start
+
+        results = {}
+        errors = {}
+        try:
+            driver = self.driver(
+                hostname,
+                device["username"],
+                device["password"],
+                timeout=device.get("timeout", self.timeout),
+                optional_args=device.get("optional_args"),
+            )
+            driver.open()
+        except Exception as e:
+            return DeviceResult(hostname, results, errors, e, time.monotonic() - start)
+
+        exception = None
+        try:
+            for getter, kwargs in self.getters:
+                if time.monotonic() - start > self.timeout:
+                    exception = CommandTimeoutException(
+                        "{} did not complete within {}s".format(hostname, self.timeout)
+                    )
+                    break
+                try:
+                    results[getter] = getattr(driver, getter)(**kwargs)
+                except Exception as e:
+                    errors[getter] = e
+        finally:
+            try:
+                driver.close()
+            except Exception:
+                pass
+        return DeviceResult(hostname, results, errors, exception, time.monotonic() - start)
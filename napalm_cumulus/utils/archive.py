@@ -0,0 +1,221 @@
+"""
+Session archives: every command a driver ran, with its output, in one file per device.
+
+An archive is a zip file with one deflated member per output and an ``index.json`` member
+mapping every command to its outputs and exit statuses, in the order they were received.
+Replaying reads the zip through a memory map, so only the index and the outputs asked for
+are ever read and decompressed.
+"""
+import json
+import mmap
+import os
+import shlex
+import time
+import zipfile
+
+from napalm_cumulus.utils import batch
+
+_INDEX = "index.json"
+_VERSION = 1
+
+
+class SessionRecorder(object):
+    """Write the commands run on `host`, with their outputs, to the archive at `path`."""
+
+    def __init__(self, path, host):
+        self.path = path
+        self.host = host
+        self._commands = {}
+        self._count = 0
+        self._tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", zipfile.ZIP_DEFLATED)
+
+    def record(self, command, output, status=0):
+        """Add a run of `command`."""
+        member = "outputs/{:06d}".format(self._count)
+        self._count += 1
+        self._zip.writestr(member, output)
+        self._commands.setdefault(command, []).append([member, status])
+
+    def close(self):
+        """Write the index and move the archive in place, replacing any previous one."""
+        if self._zip is None:
+            return
+        index = {
+            "version": _VERSION,
+            "host": self.host,
+            "recorded": time.time(),
+            "commands": self._commands,
+        }
+        self._zip.writestr(_INDEX, json.dumps(index))
+        self._zip.close()
+        self._zip = None
+        os.replace(self._tmp_path, self.path)
+
+
+def _unwrap(command):
+    # Scripts run at once with privileges, as the exec transport does, are unwrapped.
+    if command.startswith("sudo sh -c ") or command.startswith("sudo -n sh -c "):
+        return shlex.split(command)[-1]
+    # Recorded as the default privilege mode runs them, so any driver can replay them.
+    if command.startswith("sudo -n "):
+        return "sudo " + command[len("sudo -n "):]
+    return command
+
+
+class RecordingDevice(object):
+    """
+    Connection wrapper recording every command run through `device` with `recorder`.
+
+    The commands of a batch script are recorded one by one, so they can be replayed
+    whatever the markers of the script replaying them.
+    """
+
+    def __init__(self, device, recorder):
+        self.device = device
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.device, name)
+
+    def _record(self, command, output, status=0):
+        if isinstance(output, bytes):
+            output = output.decode("utf-8", "replace")
+        command = _unwrap(command)
+        script = batch.split_batch_script(command)
+        if script is None:
+            self.recorder.record(command, output, status)
+            return
+        marker, commands = script
+        for command, result in batch.parse_batch_output(output, commands, marker).items():
+            self.recorder.record(command, result["output"], result["status"])
+
+    def send_command(self, command, *args, **kwargs):
+        output = self.device.send_command(command, *args, **kwargs)
+        self._record(command, output)
+        return output
+
+    def send_command_timing(self, command, *args, **kwargs):
+        output = self.device.send_command_timing(command, *args, **kwargs)
+        self._record(command, output)
+        return output
+
+    def run(self, command, decode=True):
+        output, status = self.device.run(command, decode=decode)
+        self._record(command, output, status)
+        return output, status
+
+    def iter_command(self, command):
+        chunks = []
+        status = 0
+        reader = self.device.iter_command(command)
+        try:
+            while True:
+                try:
+                    chunk = next(reader)
+                except StopIteration as stop:
+                    status = stop.value
+                    return status
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            self._record(command, "".join(chunks), status)
+
+
+class _MappedFile(object):
+    """Seekable read-only file over a memory map, which zipfile can read from."""
+
+    def __init__(self, mapped):
+        self._mmap = mapped
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._mmap.seek(offset, whence)
+        return self._mmap.tell()
+
+    def tell(self):
+        return self._mmap.tell()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return self._mmap.read()
+        return self._mmap.read(size)
+
+
+class ArchiveReader(object):
+    """Random access to the outputs of an archive, through a read-only memory map."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._zip = zipfile.ZipFile(_MappedFile(self._mmap))
+        index = json.loads(self._zip.read(_INDEX).decode("utf-8"))
+        if index.get("version") != _VERSION:
+            raise ValueError("Unsupported archive version: {}".format(index.get("version")))
+        self.host = index["host"]
+        self.recorded = index["recorded"]
+        self.commands = index["commands"]
+
+    def __contains__(self, command):
+        return command in self.commands
+
+    def read(self, command, occurrence=0):
+        """
+        Return the output and exit status of a run of `command`.
+
+        Runs are numbered from 0 in the order they were recorded; past the last run, the
+        last one is returned.
+        """
+        runs = self.commands[command]
+        member, status = runs[min(occurrence, len(runs) - 1)]
+        return self._zip.read(member).decode("utf-8"), status
+
+    def close(self):
+        self._zip.close()
+        self._mmap.close()
+
+
+class ArchiveDevice(object):
+    """
+    Connection serving the recorded outputs of an archive, each run in recorded order.
+
+    Batch scripts are answered command by command, with the output and exit status
+    recorded for each. Commands are looked up the way they were recorded, so a driver
+    running them with ``sudo -n`` or wrapped in ``sudo sh -c`` replays the same outputs.
+    """
+
+    def __init__(self, path):
+        self.archive = ArchiveReader(path)
+        self._runs = {}
+
+    def send_command(self, command, *args, **kwargs):
+        command = _unwrap(command)
+        script = batch.split_batch_script(command)
+        if script is not None:
+            marker, commands = script
+            return batch.format_batch_output(marker, [self._read_result(c) for c in commands])
+        return self._read_result(command)[0]
+
+    def send_command_timing(self, command, *args, **kwargs):
+        return self.send_command(command)
+
+    def _read_result(self, command):
+        command = _unwrap(command)
+        if command not in self.archive:
+            raise IOError("No output recorded for command: {}".format(command))
+        occurrence = self._runs.get(command, 0)
+        self._runs[command] = occurrence + 1
+        return self.archive.read(command, occurrence)
+
+    # The replayed session is already privileged, as recorded.
+    def enable(self):
+        pass
+
+    def exit_enable_mode(self):
+        pass
+
+    def disconnect(self):
+        self.archive.close()
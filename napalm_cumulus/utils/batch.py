@@ -0,0 +1,136 @@
+"""Helpers to run several commands in a single remote shell invocation."""
+import re
+import shlex
+import uuid
+from collections import OrderedDict
+
+_BEGIN = "printf '%s %d begin\\n' {marker} {index}"
+_END = "printf '%s %d end %d\\n' {marker} {index} $?"
+
+# The markers are printed through printf arguments, so the echoed command line never
+# contains the "<marker> <index> begin" text that delimits the output.
+_SCRIPT_RE = re.compile(
+    r"printf '%s %d begin\\n' (?P<marker>\S+) (?P<index>\d+); (?P<command>.*?); "
+    r"printf '%s %d end %d\\n' (?P=marker) (?P=index) \$\?",
+    re.S,
+)
+# Every command runs in its own shell, as when sent on its own: a comment, a trailing "&",
+# an unbalanced quote or a heredoc in one command can't break the rest of the script.
+_QUOTED = "bash -c {}"
+_QUOTED_PREFIX = _QUOTED.format("")
+_LEADING_NEWLINE_RE = re.compile(r"^\r?\n")
+_TRAILING_NEWLINE_RE = re.compile(r"\r?\n$")
+
+
+def new_marker():
+    """Return a sentinel unlikely to ever appear in command output."""
+    return "NAPALM_BATCH_{}".format(uuid.uuid4().hex)
+
+
+def build_batch_script(
+    commands, marker, separator="; ", abort_on_error=False, abort_on_output=()
+):
+    """
+    Build a shell script running `commands` in order, each wrapped in sentinel lines.
+
+    With `abort_on_error` the script exits at the first command returning a non-zero
+    status, or printing any of the `abort_on_output` strings. Only use it for scripts run
+    in their own shell (e.g. ``sh script.sh``), as it would otherwise close the interactive
+    session.
+    """
+    parts = []
+    for index, command in enumerate(commands):
+        command = _QUOTED.format(shlex.quote(command))
+        if abort_on_error and abort_on_output:
+            # The output is captured to be matched, then printed as the command would.
+            patterns = "|".join("*{}*".format(shlex.quote(text)) for text in abort_on_output)
+            lines = [
+                _BEGIN.format(marker=marker, index=index),
+                "out=$({} 2>&1)".format(command),
+                "rc=$?",
+                'if [ -n "$out" ]; then printf \'%s\\n\' "$out"; fi',
+                _END.format(marker=marker, index=index).replace("$?", "$rc"),
+                '[ "$rc" -eq 0 ] || exit "$rc"',
+                'case "$out" in {}) exit 1;; esac'.format(patterns),
+            ]
+        elif abort_on_error:
+            lines = [
+                _BEGIN.format(marker=marker, index=index),
+                command,
+                "rc=$?",
+                _END.format(marker=marker, index=index).replace("$?", "$rc"),
+                '[ "$rc" -eq 0 ] || exit "$rc"',
+            ]
+        else:
+            lines = [
+                _BEGIN.format(marker=marker, index=index),
+                command,
+                _END.format(marker=marker, index=index),
+            ]
+        parts.append("; ".join(lines))
+    return separator.join(parts)
+
+
+def parse_batch_output(output, commands, marker):
+    """
+    Split the output of a batch script back into per-command results.
+
+    Returns an OrderedDict mapping each command to a dict with its ``output`` and exit
+    ``status``. Commands whose sentinels are missing (e.g. the script was cut short) are
+    left out of the result.
+    """
+    results = OrderedDict()
+    for index, result in parse_batch_results(output, marker).items():
+        results[commands[index]] = result
+    return results
+
+
+def parse_batch_results(output, marker):
+    """Like `parse_batch_output`, but keyed by the position of each command in the batch."""
+    # The end sentinel isn't anchored to the start of a line, as output lacking a final
+    # newline runs straight into it.
+    pattern = re.compile(
+        r"(?:^{0} (\d+) begin|{0} (\d+) end (\d+))\r?$".format(re.escape(marker)), re.M
+    )
+    results = OrderedDict()
+    current = start = None
+    for match in pattern.finditer(output):
+        if match.group(1) is not None:
+            current, start = int(match.group(1)), match.end()
+        elif int(match.group(2)) == current:
+            text = output[start:match.start()]
+            text = _TRAILING_NEWLINE_RE.sub("", _LEADING_NEWLINE_RE.sub("", text))
+            results[current] = {"output": text, "status": int(match.group(3))}
+            current = None
+    return results
+
+
+def split_batch_script(script):
+    """
+    Return the marker and the commands of a script built by `build_batch_script`.
+
+    Returns None if `script` isn't a batch script. Used by test doubles that have to
+    answer batches one command at a time.
+    """
+    commands = []
+    marker = None
+    for match in _SCRIPT_RE.finditer(script):
+        marker = match.group("marker")
+        command = match.group("command")
+        if command.startswith(_QUOTED_PREFIX):
+            command = shlex.split(command)[2]
+        commands.append(command)
+    if marker is None:
+        return None
+    return marker, commands
+
+
+def format_batch_output(marker, results):
+    """Render `(output, status)` pairs as a batch script run on the device would."""
+    lines = []
+    for index, (output, status) in enumerate(results):
+        lines.append("{} {} begin".format(marker, index))
+        if output:
+            lines.append(output)
+        lines.append("{} {} end {}".format(marker, index, status))
+    return "\n".join(lines)
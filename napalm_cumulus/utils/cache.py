@@ -0,0 +1,54 @@
+"""Per-session command output cache."""
+import time
+from collections import OrderedDict
+
+
+class CommandCache(object):
+    """
+    LRU cache of command outputs with a time-to-live.
+
+    A cache built with ``maxsize=0`` is disabled: lookups always miss and nothing is stored,
+    so callers don't need to check whether caching was enabled.
+    """
+
+    def __init__(self, ttl=30, maxsize=64):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def get(self, command):
+        """Return the cached output for `command`, or None if missing or expired."""
+        entry = self._entries.get(command)
+        if entry is None:
+            return None
+        stored_at, output = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[command]
+            return None
+        self._entries.move_to_end(command)
+        return output
+
+    def set(self, command, output):
+        if not self.enabled:
+            return
+        self._entries[command] = (time.monotonic(), output)
+        self._entries.move_to_end(command)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, command=None):
+        """Drop `command` from the cache, or everything if no command is given."""
+        if command is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(command, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, command):
+        return self.get(command) is not None
@@ -0,0 +1,157 @@
+"""Running configurations cached on disk per host, keyed by a fingerprint of their files."""
+import base64
+import binascii
+import gzip
+import hashlib
+import os
+import re
+import shlex
+import zlib
+
+# The files "net show configuration" is rendered from. Globs are expanded on the device.
+FINGERPRINT_FILES = (
+    "/etc/hostname",
+    "/etc/hosts",
+    "/etc/timezone",
+    "/etc/resolv.conf",
+    "/etc/ntp.conf",
+    "/etc/network/interfaces",
+    "/etc/network/interfaces.d/*",
+    "/etc/frr/daemons",
+    "/etc/frr/frr.conf",
+    "/etc/cumulus/ports.conf",
+    "/etc/cumulus/switchd.conf",
+    "/etc/cumulus/datapath/traffic.conf",
+    "/etc/cumulus/acl/policy.d/*",
+    "/etc/default/isc-dhcp-relay*",
+    "/etc/hostapd.conf",
+    "/etc/lldpd.d/*",
+    "/etc/ptp4l.conf",
+    "/etc/snmp/snmpd.conf",
+    "/etc/rsyslog.d/*",
+)
+
+_FINGERPRINT_RE = re.compile(r"^([0-9a-f]{32})\b", re.M)
+
+
+def fingerprint_command(files=FINGERPRINT_FILES):
+    """
+    Build the command printing the md5 of the contents and names of `files`.
+
+    Missing files are left out, so creating or deleting one changes the fingerprint.
+    """
+    return "sudo sh -c {}".format(
+        shlex.quote("md5sum {} 2>/dev/null | md5sum".format(" ".join(files)))
+    )
+
+
+def parse_fingerprint(output):
+    """Return the fingerprint printed by `fingerprint_command`, or None."""
+    match = _FINGERPRINT_RE.search(output)
+    return match.group(1) if match else None
+
+
+def compressed_command(command):
+    """
+    Build the command sending the output of `command` gzipped, in base64 on one line.
+
+    Its exit status is the one of `command` when that fails, so an error message is never
+    taken for the output. It sets bash's pipefail option, so run it in a shell of its own,
+    e.g. in a batch.
+    """
+    return "set -o pipefail; {} | gzip -c | base64 -w 0".format(command)
+
+
+def decompress(output):
+    """
+    Decode the output of `compressed_command`.
+
+    Returns None if the output isn't gzipped base64, e.g. gzip or base64 is missing on the
+    device.
+    """
+    try:
+        data = base64.b64decode("".join(output.split()), validate=True)
+        if not data:
+            return None
+        return gzip.decompress(data).decode("utf-8")
+    except (binascii.Error, OSError, EOFError, zlib.error, UnicodeDecodeError):
+        return None
+
+
+class ConfigCache(object):
+    """
+    Last running configuration of every host, one gzipped file per host in `directory`.
+
+    Each file holds the fingerprint the configuration was fetched with. Once the files take
+    more than `max_bytes`, the least recently used ones are deleted. Files are written
+    under a temporary name and renamed, so processes polling different hosts can share
+    the directory.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, host):
+        return os.path.join(
+            self.directory, hashlib.sha1(host.encode("utf-8")).hexdigest() + ".gz"
+        )
+
+    def get(self, host, fingerprint):
+        """Return the configuration of `host` cached with `fingerprint`, or None."""
+        path = self._path(host)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+                if f.readline().rstrip("\n") != fingerprint:
+                    return None
+                config = f.read()
+            os.utime(path)
+        except (OSError, EOFError, zlib.error):
+            return None
+        return config
+
+    def set(self, host, fingerprint, config):
+        """Store the configuration of `host` fetched with `fingerprint`."""
+        path = self._path(host)
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+            f.write(fingerprint + "\n")
+            f.write(config)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def invalidate(self, host=None):
+        """Drop the configuration of `host`, or of every host."""
+        if host is not None:
+            paths = [self._path(host)]
+        else:
+            paths = [e.path for e in os.scandir(self.directory) if e.name.endswith(".gz")]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".gz"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def __len__(self):
+        return sum(1 for e in os.scandir(self.directory) if e.name.endswith(".gz"))
@@ -0,0 +1,131 @@
+"""History and rates of interface counters polled at a fixed interval."""
+from array import array
+
+# The counters of get_interfaces_counters(), in the order they are stored.
+COUNTERS = (
+    "tx_errors",
+    "rx_errors",
+    "tx_discards",
+    "rx_discards",
+    "tx_octets",
+    "rx_octets",
+    "tx_unicast_packets",
+    "rx_unicast_packets",
+    "tx_multicast_packets",
+    "rx_multicast_packets",
+    "tx_broadcast_packets",
+    "rx_broadcast_packets",
+)
+_WIDTH = len(COUNTERS)
+
+
+class CounterHistory(object):
+    """
+    The last `size` samples of the counters of every interface, in ring buffers.
+
+    Each interface takes one array of 64-bit integers, 96 bytes per sample, allocated
+    when it first appears. Counters an interface doesn't report, or samples taken while
+    it was missing, are stored as -1, and so are the rates computed from them. Rates are
+    also -1 over an interval in which a counter went down, e.g. when it was cleared.
+    """
+
+    def __init__(self, size=720):
+        if size < 2:
+            raise ValueError("A counter history needs at least 2 samples")
+        self.size = size
+        self._times = array("d", [0.0]) * size
+        self._values = {}
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    def interfaces(self):
+        """Return the names of the interfaces sampled so far."""
+        return list(self._values)
+
+    def append(self, timestamp, counters):
+        """Add a sample taken at `timestamp`, in seconds, of get_interfaces_counters()."""
+        slot = self._count % self.size
+        base = slot * _WIDTH
+        self._times[slot] = timestamp
+        for interface, values in counters.items():
+            series = self._values.get(interface)
+            if series is None:
+                series = self._values[interface] = array("q", [-1]) * (self.size * _WIDTH)
+            series[base:base + _WIDTH] = array("q", [values[name] for name in COUNTERS])
+        for interface, series in self._values.items():
+            if interface not in counters:
+                series[base:base + _WIDTH] = array("q", [-1]) * _WIDTH
+        self._count += 1
+
+    def _rates(self, series, slot, previous):
+        elapsed = self._times[slot] - self._times[previous]
+        rates = {}
+        for i, name in enumerate(COUNTERS):
+            value = series[slot * _WIDTH + i]
+            previous_value = series[previous * _WIDTH + i]
+            if elapsed <= 0 or value < 0 or previous_value < 0 or value < previous_value:
+                rates[name] = -1.0
+            else:
+                rates[name] = (value - previous_value) / elapsed
+        return rates
+
+    def rates(self, interface, samples=None):
+        """
+        Return the per-second rates of `interface` over the intervals of the history.
+
+        Returns a list of (timestamp, rates) tuples, oldest first, for the last `samples`
+        intervals, or all of them.
+        """
+        series = self._values[interface]
+        intervals = len(self) - 1
+        if samples is not None:
+            intervals = min(intervals, samples)
+        result = []
+        for offset in range(intervals, 0, -1):
+            slot = (self._count - offset) % self.size
+            previous = (self._count - offset - 1) % self.size
+            result.append((self._times[slot], self._rates(series, slot, previous)))
+        return result
+
+    def latest_rates(self):
+        """Return the rates of every interface over the last interval, keyed by interface."""
+        if len(self) < 2:
+            return {}
+        slot = (self._count - 1) % self.size
+        previous = (self._count - 2) % self.size
+        return {
+            interface: self._rates(series, slot, previous)
+            for interface, series in self._values.items()
+        }
+
+
+class CounterPoller(object):
+    """
+    Iterator over the rates of interface counters, one dict per sample.
+
+    `samples` yields (timestamp, counters) tuples. Every sample is stored in the
+    CounterHistory `history`, and the rates of the last interval are returned; the first
+    iteration waits for two samples.
+    """
+
+    def __init__(self, samples, history=720):
+        self._samples = samples
+        self.history = CounterHistory(history)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            timestamp, counters = next(self._samples)
+            self.history.append(timestamp, counters)
+            if len(self.history) >= 2:
+                return self.history.latest_rates()
+
+    def close(self):
+        """Stop polling, closing the channel of the sampling command if it's still open."""
+        close = getattr(self._samples, "close", None)
+        if close is not None:
+            close()
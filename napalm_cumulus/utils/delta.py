@@ -0,0 +1,91 @@
+"""Changes between successive results of a getter."""
+
+
+def interface_items(interfaces):
+    """Split a get_interfaces() result into one item per interface."""
+    return {(name,): data for name, data in interfaces.items()}
+
+
+def bgp_neighbor_items(bgp_neighbors):
+    """Split a get_bgp_neighbors() result into one item per VRF router id and per peer."""
+    items = {}
+    for vrf, vrf_data in bgp_neighbors.items():
+        items[(vrf, "router_id")] = vrf_data.get("router_id")
+        for peer, peer_data in vrf_data.get("peers", {}).items():
+            items[(vrf, "peers", peer)] = peer_data
+    return items
+
+
+def _nest(items):
+    nested = {}
+    for path, value in items.items():
+        node = nested
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return nested
+
+
+def _without(value, ignore):
+    if not ignore or not isinstance(value, dict):
+        return value
+    return {k: v for k, v in value.items() if k not in ignore}
+
+
+class DeltaTracker(object):
+    """
+    Keep the last result of a getter to report what changed in the next one.
+
+    `split` turns a result into a dict of items keyed by their path in the result, e.g.
+    ``("global", "peers", "10.0.0.1")``. Items are compared as a whole, without the keys
+    listed in `ignore`, which is meant for values changing on every poll such as uptimes.
+    Deltas nest the items back into the layout of the result.
+    """
+
+    def __init__(self, split, ignore=()):
+        self.split = split
+        self.ignore = frozenset(ignore)
+        self.sequence = 0
+        # Cheap indicator of the device state the last result was built from.
+        self.fingerprint = None
+        self._items = None
+
+    def update(self, result, fingerprint=None):
+        """
+        Store `result` and return the delta from the previous one.
+
+        A delta is a dict with the ``sequence`` number of the poll, ``full`` set on the first
+        poll, in which every item is ``added``, and the ``added``, ``removed`` and
+        ``changed`` items. Removed items hold their last known value.
+        """
+        items = self.split(result)
+        previous = self._items
+        self._items = items
+        self.fingerprint = fingerprint
+        self.sequence += 1
+        if previous is None:
+            return self._delta(items, {}, {}, full=True)
+
+        added = {path: value for path, value in items.items() if path not in previous}
+        removed = {path: value for path, value in previous.items() if path not in items}
+        changed = {
+            path: value
+            for path, value in items.items()
+            if path in previous
+            and _without(value, self.ignore) != _without(previous[path], self.ignore)
+        }
+        return self._delta(added, removed, changed)
+
+    def unchanged(self):
+        """Return an empty delta, for a poll whose fingerprint matched the previous one."""
+        self.sequence += 1
+        return self._delta({}, {}, {})
+
+    def _delta(self, added, removed, changed, full=False):
+        return {
+            "sequence": self.sequence,
+            "full": full,
+            "added": _nest(added),
+            "removed": _nest(removed),
+            "changed": _nest(changed),
+        }
@@ -0,0 +1,46 @@
+"""
+JSON decoding of command output.
+
+Uses orjson when it is installed (``pip install napalm-cumulus[fast]``), the standard
+library otherwise. Both take the UTF-8 bytes read from a transport as well as text, and
+raise ValueError on invalid documents.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_BACKENDS = {"json": json.loads}
+if orjson is not None:
+    _BACKENDS["orjson"] = orjson.loads
+
+_loads = _BACKENDS.get("orjson", json.loads)
+_backend = "orjson" if orjson is not None else "json"
+
+
+def loads(data):
+    """Decode the JSON document in `data`, a str or UTF-8 bytes."""
+    return _loads(data)
+
+
+def backend():
+    """Return the name of the backend in use."""
+    return _backend
+
+
+def set_backend(name, decoder=None):
+    """
+    Select the backend decoding JSON from now on.
+
+    `name` is "json", "orjson", or the name of a custom `decoder`, a function taking a str
+    or bytes and raising ValueError on invalid documents.
+    """
+    global _loads, _backend
+    if decoder is None:
+        if name not in _BACKENDS:
+            raise ValueError("Unavailable JSON backend: {}".format(name))
+        decoder = _BACKENDS[name]
+    _loads = decoder
+    _backend = name
@@ -0,0 +1,250 @@
+"""Timing and payload instrumentation of the commands and getters of a driver."""
+import json
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+_COMMAND_METRICS = [
+    ("runs", "counter", "Number of times a command was run."),
+    ("seconds", "counter", "Wall time spent waiting for command output, in seconds."),
+    ("received_bytes", "counter", "Bytes of command output received."),
+    ("retries", "counter", "Number of times a command was run again after a bad output."),
+    ("cache_hits", "counter", "Number of times a command was served from the command cache."),
+]
+_GETTER_METRICS = [
+    ("calls", "counter", "Number of getter calls."),
+    ("seconds", "counter", "Wall time spent in getters, in seconds."),
+    ("command_seconds", "counter", "Part of the getter time spent running commands."),
+    ("parse_seconds", "counter", "Part of the getter time spent parsing, in seconds."),
+    ("privileged_commands", "counter", "Number of privileged commands, or batches, run."),
+    ("elevations", "counter", "Number of times the shell was elevated with enable()."),
+    (
+        "privilege_round_trips_saved",
+        "counter",
+        "Number of enable()/exit_enable_mode() round-trips avoided.",
+    ),
+]
+
+
+class Instrumentation(object):
+    """
+    Record what a driver spends its time on, per command and per getter.
+
+    Every command run, privileged command and getter call is reported to the callbacks as
+    a dict, and added to totals kept per host and command, or per host and getter, which
+    ``to_json`` and ``to_prometheus`` export. The parse time of a getter is its wall time
+    minus the time its commands took. One instance can be shared by many drivers and
+    threads.
+    """
+
+    def __init__(self, callbacks=None):
+        self.callbacks = list(callbacks or [])
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._commands = defaultdict(lambda: {m: 0 for m, _, _ in _COMMAND_METRICS})
+        self._getters = defaultdict(lambda: {m: 0 for m, _, _ in _GETTER_METRICS})
+
+    def add_callback(self, callback):
+        """Call `callback(event)` for every event recorded from now on."""
+        self.callbacks.append(callback)
+
+    def reset(self):
+        with self._lock:
+            self._commands.clear()
+            self._getters.clear()
+
+    def record_command(self, host, command, seconds, output, cached=False):
+        """Record a command run that took `seconds` and returned `output`, text or bytes."""
+        if cached:
+            received_bytes = 0
+        elif isinstance(output, bytes):
+            received_bytes = len(output)
+        else:
+            received_bytes = len(output.encode("utf-8"))
+        self._add_command(host, command, seconds, received_bytes, cached)
+
+    def record_concurrent_commands(self, host, runs, seconds):
+        """
+        Record commands run concurrently, `runs` holding (command, seconds, output) tuples.
+
+        Getters are charged `seconds`, the wall time of the runs, instead of their sum.
+        """
+        for command, command_seconds, output in runs:
+            if not isinstance(output, bytes):
+                output = output.encode("utf-8")
+            received_bytes = len(output)
+            self._add_command(
+                host, command, command_seconds, received_bytes, False, getter_seconds=0.0
+            )
+        for calls in getattr(self._local, "getters", []):
+            calls[0] += seconds
+
+    def _add_command(self, host, command, seconds, received_bytes, cached, getter_seconds=None):
+        with self._lock:
+            totals = self._commands[(host, command)]
+            totals["runs"] += 1
+            if cached:
+                totals["cache_hits"] += 1
+            else:
+                totals["seconds"] += seconds
+                totals["received_bytes"] += received_bytes
+        for calls in getattr(self._local, "getters", []):
+            calls[0] += seconds if getter_seconds is None else getter_seconds
+        self._notify(
+            {
+                "type": "command",
+                "host": host,
+                "command": command,
+                "seconds": seconds,
+                "received_bytes": received_bytes,
+                "cached": cached,
+            }
+        )
+
+    def record_retry(self, host, command):
+        """Record that `command` has to run again because its output couldn't be used."""
+        with self._lock:
+            self._commands[(host, command)]["retries"] += 1
+        self._notify({"type": "retry", "host": host, "command": command})
+
+    def record_privileged(self, host, commands, elevations):
+        """
+        Record `commands` privileged commands, or batches, run with `elevations` elevations.
+
+        Every privileged command that didn't elevate the shell saved the round-trips of
+        enable() and exit_enable_mode().
+        """
+        for calls in getattr(self._local, "getters", []):
+            calls[1] += commands
+            calls[2] += elevations
+        self._notify(
+            {
+                "type": "privilege",
+                "host": host,
+                "privileged_commands": commands,
+                "elevations": elevations,
+                "round_trips_saved": 2 * (commands - elevations),
+            }
+        )
+
+    def record_getter(
+        self, host, getter, seconds, command_seconds, privileged_commands=0, elevations=0
+    ):
+        """
+        Record a getter call, `command_seconds` of its `seconds` spent on commands.
+
+        `privileged_commands` of its commands were privileged, elevating the shell
+        `elevations` times.
+        """
+        parse_seconds = max(seconds - command_seconds, 0.0)
+        round_trips_saved = 2 * (privileged_commands - elevations)
+        with self._lock:
+            totals = self._getters[(host, getter)]
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["command_seconds"] += command_seconds
+            totals["parse_seconds"] += parse_seconds
+            totals["privileged_commands"] += privileged_commands
+            totals["elevations"] += elevations
+            totals["privilege_round_trips_saved"] += round_trips_saved
+        self._notify(
+            {
+                "type": "getter",
+                "host": host,
+                "getter": getter,
+                "seconds": seconds,
+                "command_seconds": command_seconds,
+                "parse_seconds": parse_seconds,
+                "privileged_commands": privileged_commands,
+                "elevations": elevations,
+                "privilege_round_trips_saved": round_trips_saved,
+            }
+        )
+
+    def iter_chunks(self, host, command, chunks):
+        """Yield the output `chunks` of `command`, recording the run once they're all read."""
+        seconds = 0.0
+        received_bytes = 0
+        chunks = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            finally:
+                seconds += time.perf_counter() - start
+            received_bytes += len(chunk.encode("utf-8"))
+            yield chunk
+        self._add_command(host, command, seconds, received_bytes, False)
+
+    def wrap_getter(self, host, name, method):
+        """Return the getter `method` with its calls recorded."""
+
+        @wraps(method)
+        def _timed(*args, **kwargs):
+            # Getters can call other getters, each one gets the command time of its calls,
+            # and the number of privileged commands and elevations among them.
+            stack = self._local.__dict__.setdefault("getters", [])
+            calls = [0.0, 0, 0]
+            stack.append(calls)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                stack.remove(calls)
+                self.record_getter(host, name, seconds, calls[0], calls[1], calls[2])
+
+        return _timed
+
+    def to_dict(self):
+        """Return the totals as ``{"commands": [...], "getters": [...]}``."""
+        with self._lock:
+            return {
+                "commands": [
+                    dict(totals, host=host, command=command)
+                    for (host, command), totals in sorted(self._commands.items())
+                ],
+                "getters": [
+                    dict(totals, host=host, getter=getter)
+                    for (host, getter), totals in sorted(self._getters.items())
+                ],
+            }
+
+    def to_json(self, **kwargs):
+        """Return the totals as a JSON document, `kwargs` are passed to ``json.dumps``."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix="napalm_cumulus"):
+        """Return the totals in the Prometheus text exposition format."""
+        totals = self.to_dict()
+        lines = []
+        for kind, label, metrics in (
+            ("command", "command", _COMMAND_METRICS),
+            ("getter", "getter", _GETTER_METRICS),
+        ):
+            for metric, metric_type, description in metrics:
+                name = "{}_{}_{}_total".format(prefix, kind, metric)
+                lines.append("# HELP {} {}".format(name, description))
+                lines.append("# TYPE {} {}".format(name, metric_type))
+                for entry in totals[kind + "s"]:
+                    lines.append(
+                        '{}{{host="{}",{}="{}"}} {}'.format(
+                            name,
+                            _escape_label(entry["host"]),
+                            label,
+                            _escape_label(entry[label]),
+                            entry[metric],
+                        )
+                    )
+        return "\n".join(lines) + "\n"
+
+    def _notify(self, event):
+        for callback in self.callbacks:
+            callback(event)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
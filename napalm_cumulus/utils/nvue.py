@@ -0,0 +1,156 @@
+"""Client of the NVUE REST API, over a pool of keep-alive HTTPS connections."""
+import base64
+import http.client
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from napalm.base.exceptions import CommandErrorException, ConnectionException
+
+from napalm_cumulus.utils import fastjson
+
+API_ROOT = "/nvue_v1"
+
+
+class NvueClient(object):
+    """
+    NVUE REST API client, safe to use from several threads.
+
+    Requests reuse idle connections, keeping at most `max_connections` open, and
+    `get_many` sends up to `max_connections` requests at once. `verify` False accepts the
+    self-signed certificate switches ship with; `scheme` "http" talks to a plain HTTP
+    endpoint, e.g. behind a TLS-terminating proxy.
+    """
+
+    def __init__(
+        self,
+        host,
+        username,
+        password,
+        port=8765,
+        timeout=60,
+        max_connections=8,
+        verify=True,
+        scheme="https",
+    ):
+        if scheme not in ("https", "http"):
+            raise ValueError("Unsupported NVUE scheme: {}".format(scheme))
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.scheme = scheme
+        self._context = None
+        if scheme == "https":
+            self._context = ssl.create_default_context()
+            if not verify:
+                self._context.check_hostname = False
+                self._context.verify_mode = ssl.CERT_NONE
+        credentials = "{}:{}".format(username, password).encode("utf-8")
+        self._headers = {
+            "Authorization": "Basic " + base64.b64encode(credentials).decode("ascii"),
+            "Accept": "application/json",
+        }
+        self._idle = []
+        self._lock = threading.Lock()
+        self._executor = None
+        self.stats = {"requests": 0, "connections": 0}
+
+    def _new_connection(self):
+        with self._lock:
+            self.stats["connections"] += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self._context
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_connections:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _request(self, connection, url):
+        connection.request("GET", url, headers=self._headers)
+        response = connection.getresponse()
+        return response, response.read()
+
+    def get(self, api_path, rev="operational", on_response=None):
+        """
+        Return the decoded JSON at `api_path`, e.g. "/system", in revision `rev`.
+
+        `on_response(api_path, seconds, body)` is called once the response is read, with
+        the time the request took and the raw body.
+        """
+        url = "{}{}?{}".format(API_ROOT, api_path, urlencode({"rev": rev}))
+        start = time.perf_counter()
+        connection, reused = self._acquire()
+        try:
+            response, body = self._request(connection, url)
+        except (http.client.HTTPException, OSError) as e:
+            connection.close()
+            if not reused or isinstance(e, socket.timeout):
+                raise ConnectionException("Cannot reach NVUE on {}: {}".format(self.host, e))
+            # The server closed an idle kept-alive connection, retry on a new one.
+            connection = self._new_connection()
+            try:
+                response, body = self._request(connection, url)
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                raise ConnectionException("Cannot reach NVUE on {}: {}".format(self.host, e))
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.stats["requests"] += 1
+        if on_response is not None:
+            on_response(api_path, seconds, body)
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        if response.status != 200:
+            raise CommandErrorException(
+                "GET {} returned {} {}".format(url, response.status, response.reason)
+            )
+        return fastjson.loads(body)
+
+    def is_alive(self):
+        """Return whether the API answers an authenticated GET of its small /system resource."""
+        try:
+            self.get("/system")
+        except (ConnectionException, CommandErrorException):
+            return False
+        return True
+
+    def get_many(self, api_paths, rev="operational", on_response=None):
+        """
+        Return the decoded JSON at each of `api_paths`, fetched concurrently, in order.
+
+        `on_response` is passed to `get` and may be called from several threads.
+        """
+        if len(api_paths) < 2 or self.max_connections < 2:
+            return [self.get(p, rev, on_response) for p in api_paths]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_connections)
+        return list(self._executor.map(lambda p: self.get(p, rev, on_response), api_paths))
+
+    def close(self):
+        """Close the idle connections and stop the request threads."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            executor, self._executor = self._executor, None
+        for connection in idle:
+            connection.close()
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,1118 @@
+"""
+Parsers turning Cumulus command output into napalm getter results.
+
+They don't do any I/O, so the sync and asyncio drivers share them: each getter fetches the
+command output its own way and hands it to the matching parser.
+"""
+import re
+import json
+import ipaddress
+from datetime import datetime
+from collections import defaultdict
+from urllib.parse import quote
+
+from napalm.base.utils import string_parsers
+
+from napalm_cumulus.utils import fastjson
+
+SUPPORTED_BGP_AFIS = ["ipv4 unicast", "ipv6 unicast"]
+DATE_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+
+def parse_facts(system, interfaces):
+    """Parse 'net show system json' and 'net show interface all json'."""
+    facts = {
+        "uptime": string_parsers.convert_uptime_string_seconds(system["uptime"]),
+        "vendor": system["eeprom"]["tlv"]["Vendor Name"]["value"],
+        "model": system["eeprom"]["tlv"]["Product Name"]["value"],
+        "hostname": system["hostname"],
+        "os_version": system["os-version"],
+        "serial_number": system["eeprom"]["tlv"]["Serial Number"]["value"],
+    }
+    facts["fqdn"] = facts["hostname"]
+    facts["interface_list"] = string_parsers.sorted_nicely(interfaces.keys())
+    return facts
+
+
+def parse_date(output):
+    """Parse the switch clock printed by "date '+%Y/%m/%d %H:%M:%S'"."""
+    return datetime.strptime(output.strip(), DATE_FORMAT)
+
+
+# VRFs are Linux interfaces, whose names are at most 15 characters long.
+_VRF_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]{1,15}$")
+
+
+def neighbors_command(family, vrf=""):
+    """
+    Build the 'ip neigh' command listing the IPv`family` neighbors of `vrf` as JSON.
+
+    Raises ValueError if `vrf` isn't a valid interface name, since it ends up in a shell
+    command.
+    """
+    command = "ip -{} -s -j neigh show".format(family)
+    if vrf:
+        if not _VRF_NAME_RE.match(vrf):
+            raise ValueError("Invalid VRF name: {!r}".format(vrf))
+        command += " vrf {}".format(vrf)
+    return command
+
+
+_JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a JSON array received as an iterable of text chunks.
+
+    Every element is decoded as soon as it has been received in full and the text before
+    it is dropped, so memory use doesn't depend on the size of the array.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buf = buf[pos:] + chunk
+        pos = 0
+        while True:
+            pos = _JSON_WHITESPACE_RE.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array, got: {!r}".format(buf[:80]))
+                started = True
+                pos += 1
+            elif buf[pos] == "]":
+                return
+            elif buf[pos] == ",":
+                pos += 1
+            else:
+                try:
+                    element, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    # The element continues in the next chunk.
+                    break
+                if end == len(buf) and buf[-1] not in "}]\"":
+                    # A number or literal could go on in the next chunk.
+                    break
+                yield element
+                pos = end
+    raise ValueError("Truncated JSON array")
+
+
+def iter_neighbors(chunks, with_state=False):
+    """
+    Parse 'ip -s -j neigh show' into ARP or IPv6 neighbor table entries, lazily.
+
+    'ip -s -j neigh show' output example (one line per entry here, for readability):
+    [{"dst":"10.0.2.3","dev":"eth0","lladdr":"52:54:00:12:35:03","used":4,"confirmed":4,
+      "updated":4,"probes":1,"state":["REACHABLE"]},
+     {"dst":"192.168.1.134","dev":"eth1","used":2,"confirmed":2,"updated":2,"probes":3,
+      "state":["FAILED"]}]
+
+    `with_state` adds the neighbor state, as ``get_ipv6_neighbors_table`` reports it.
+    """
+    for neighbor in iter_json_array(chunks):
+        entry = {
+            "interface": neighbor["dev"],
+            "mac": neighbor.get("lladdr", "00:00:00:00:00:00"),
+            "ip": neighbor["dst"],
+            "age": float(neighbor.get("updated", 0)),
+        }
+        if with_state:
+            entry["state"] = ",".join(neighbor.get("state", []))
+        yield entry
+
+
+def parse_arp_table(output):
+    """Parse 'ip -4 -s -j neigh show'."""
+    return list(iter_neighbors([output]))
+
+
+def parse_ipv6_neighbors_table(output):
+    """Parse 'ip -6 -s -j neigh show'."""
+    return list(iter_neighbors([output], with_state=True))
+
+
+MAC_ADDRESS_TABLE_COMMAND = "bridge -s -j fdb show"
+BRIDGE_VLANS_COMMAND = "bridge -j vlan show"
+
+
+def parse_bridge_vlans(output):
+    """
+    Parse 'bridge -j vlan show' into the PVID of every bridge port.
+
+    iproute2 >= 5.x prints a list of ports, older releases an object keyed by port:
+    [{"ifname":"vni10","vlans":[{"vlan":10,"flags":["PVID","Egress Untagged"]}]}]
+    {"vni10":[{"vlan":10,"flags":["PVID","Egress Untagged"]}]}
+    """
+    ports = fastjson.loads(output) if output.strip() else []
+    if isinstance(ports, dict):
+        ports = [{"ifname": name, "vlans": vlans} for name, vlans in ports.items()]
+    pvids = {}
+    for port in ports:
+        for vlan in port.get("vlans", []):
+            if "PVID" in vlan.get("flags", []):
+                pvids[port["ifname"]] = vlan["vlan"]
+    return pvids
+
+
+def iter_mac_address_table(chunks, pvids=None):
+    """
+    Parse 'bridge -s -j fdb show' into MAC address table entries, lazily.
+
+    'bridge -s -j fdb show' output example (one line per entry here, for readability):
+    [{"mac":"44:38:39:00:00:03","ifname":"swp1","vlan":10,"used":3,"updated":3,
+      "flags":[],"master":"bridge","state":""},
+     {"mac":"44:38:39:00:00:17","ifname":"vni10","vlan":10,"used":40,"updated":40,
+      "flags":["extern_learn"],"master":"bridge","state":""},
+     {"mac":"44:38:39:00:00:17","ifname":"vni10","dst":"10.0.0.2","src_vni":10,
+      "flags":["self","extern_learn"],"state":""},
+     {"mac":"00:00:00:00:00:00","ifname":"vni10","dst":"10.0.0.2","flags":["self"],
+      "state":"permanent"}]
+
+    Only the entries of the bridge are kept: the "self" entries of VXLAN devices repeat
+    the MACs of remote VTEPs, or list the VTEPs to flood to. Entries without a VLAN, on
+    ports of a bridge that isn't VLAN-aware, take the PVID of their port from `pvids`.
+    """
+    pvids = pvids or {}
+    for fdb in iter_json_array(chunks):
+        if "master" not in fdb:
+            continue
+        interface = fdb["ifname"]
+        yield {
+            "mac": fdb["mac"],
+            "interface": interface,
+            "vlan": fdb.get("vlan", pvids.get(interface, 0)),
+            "static": fdb.get("state") in ("permanent", "static"),
+            "active": True,
+            "moves": -1,
+            "last_move": -1.0,
+        }
+
+
+def parse_mac_address_table(output, vlans_output=""):
+    """Parse 'bridge -s -j fdb show' and 'bridge -j vlan show'."""
+    return list(iter_mac_address_table([output], parse_bridge_vlans(vlans_output)))
+
+
+def parse_ntp_stats(output):
+    """
+    Parse 'ntpq -np'.
+
+    'ntpq -np' output example
+         remote           refid      st t when poll reach   delay   offset  jitter
+    ==============================================================================
+     116.91.118.97   133.243.238.244  2 u   51   64  377    5.436  987971. 1694.82
+     219.117.210.137 .GPS.            1 u   17   64  377   17.586  988068. 1652.00
+     133.130.120.204 133.243.238.164  2 u   46   64  377    7.717  987996. 1669.77
+    """
+    output = output.split("\n")[2:]
+    ntp_stats = list()
+
+    for ntp_info in output:
+        if len(ntp_info) > 0:
+            remote, refid, st, t, when, hostpoll, reachability, delay, offset, jitter = (
+                ntp_info.split()
+            )
+
+            # 'remote' contains '*' if the machine synchronized with NTP server
+            synchronized = "*" in remote
+
+            match = re.search(r"(\d+\.\d+\.\d+\.\d+)", remote)
+            ip = match.group(1)
+
+            when = when if when != "-" else 0
+
+            ntp_stats.append(
+                {
+                    "remote": ip,
+                    "referenceid": refid,
+                    "synchronized": bool(synchronized),
+                    "stratum": int(st),
+                    "type": t,
+                    "when": when,
+                    "hostpoll": int(hostpoll),
+                    "reachability": int(reachability),
+                    "delay": float(delay),
+                    "offset": float(offset),
+                    "jitter": float(jitter),
+                }
+            )
+    return ntp_stats
+
+
+def ping_command(destination, source, ttl, timeout, size, count):
+    """Build the Linux 'ping' command matching napalm's ping() arguments."""
+    deadline = timeout * count
+
+    command = "ping %s " % destination
+    command += "-t %d " % int(ttl)
+    command += "-w %d " % int(deadline)
+    command += "-s %d " % int(size)
+    command += "-c %d " % int(count)
+    if source != "":
+        command += "interface %s " % source
+    return command
+
+
+def parse_ping(output_ping):
+    """Parse the output of the Linux 'ping' command."""
+    ping_result = dict()
+
+    if "Unknown host" in output_ping:
+        err = "Unknown host"
+    else:
+        err = ""
+
+    if err != "":
+        ping_result["error"] = err
+    else:
+        # 'packet_info' example:
+        # ['5', 'packets', 'transmitted,' '5', 'received,' '0%', 'packet',
+        # 'loss,', 'time', '3997ms']
+        packet_info = output_ping.split("\n")
+
+        if "transmitted" in packet_info[-2]:
+            packet_info = packet_info[-2]
+        else:
+            packet_info = packet_info[-3]
+
+        packet_info = [x.strip() for x in packet_info.split()]
+
+        sent = int(packet_info[0])
+        received = int(packet_info[3])
+        lost = sent - received
+
+        # 'rtt_info' example:
+        # ["0.307/0.396/0.480/0.061"]
+        rtt_info = output_ping.split("\n")
+
+        if len(rtt_info[-1]) > 0:
+            rtt_info = rtt_info[-1]
+        else:
+            rtt_info = rtt_info[-2]
+
+        match = re.search(r"([\d\.]+)/([\d\.]+)/([\d\.]+)/([\d\.]+)", rtt_info)
+
+        if match is not None:
+            rtt_min = float(match.group(1))
+            rtt_avg = float(match.group(2))
+            rtt_max = float(match.group(3))
+            rtt_stddev = float(match.group(4))
+        else:
+            rtt_min = None
+            rtt_avg = None
+            rtt_max = None
+            rtt_stddev = None
+
+        ping_responses = list()
+        response_info = output_ping.split("\n")
+
+        for res in response_info:
+            match_res = re.search(r"from\s([\d\.]+).*time=([\d\.]+)", res)
+            if match_res is not None:
+                ping_responses.append(
+                    {
+                        "ip_address": match_res.group(1),
+                        "rtt": float(match_res.group(2)),
+                    }
+                )
+
+        ping_result["success"] = dict()
+
+        ping_result["success"] = {
+            "probes_sent": sent,
+            "packet_loss": lost,
+            "rtt_min": rtt_min,
+            "rtt_max": rtt_max,
+            "rtt_avg": rtt_avg,
+            "rtt_stddev": rtt_stddev,
+            "results": ping_responses,
+        }
+
+    return ping_result
+
+
+def _get_interface_neighbors(neighbors_list):
+    neighbors = []
+    for neighbor in neighbors_list:
+        temp = {}
+        temp["hostname"] = neighbor["adj_hostname"]
+        temp["port"] = neighbor["adj_port"]
+        neighbors.append(temp)
+    return neighbors
+
+
+def parse_lldp_neighbors(intf_output):
+    """Parse 'net show interface all json'."""
+    lldp = {}
+    for interface in intf_output:
+        if intf_output[interface]["iface_obj"]["lldp"] is not None:
+            lldp[interface] = _get_interface_neighbors(
+                intf_output[interface]["iface_obj"]["lldp"]
+            )
+    return lldp
+
+
+def _convert_speed(speed):
+    if speed.endswith("M") and speed.strip("M").isdigit():
+        return int(speed.strip("M"))
+    elif speed.endswith("G") and speed.strip("G").isdigit():
+        return int(speed.strip("G")) * 1000
+    return -1
+
+
+def vtysh_daemons_running(daemon_check):
+    """Tell from "vtysh -c 'show version'" whether a routing daemon is running."""
+    return "Exiting: failed to connect to any daemons." not in daemon_check
+
+
+def parse_interfaces(output_json, current_time, show_int_output):
+    """
+    Parse 'net show interface all json' along with the vtysh output giving flap times.
+
+    `current_time` is the switch clock as a datetime and `show_int_output` the output of
+    "vtysh -c 'show interface'", or None when no routing daemon is running, in which case
+    flap times are unknown.
+    """
+    interfaces = {}
+    for interface, iface_data in output_json.items():
+        interfaces[interface] = {
+            "description": iface_data["iface_obj"]["description"],
+            "is_enabled": False if iface_data["linkstate"] == "ADMDN" else True,
+            "is_up": True if iface_data["linkstate"] == "UP" else False,
+            "mac_address": iface_data["iface_obj"]["mac"],
+            "mtu": iface_data["iface_obj"]["mtu"],
+            "speed": _convert_speed(iface_data["speed"]),
+        }
+
+    # Calculate last interface flap time. Dependent on router daemon
+    if show_int_output is None:
+        for interface in interfaces.keys():
+            interfaces[interface]["last_flapped"] = -1.0
+        return interfaces
+
+    for iface, last_up, last_down in _iter_vtysh_link_changes(show_int_output):
+        # If we don't have the interface already move on
+        if not interfaces.get(iface):
+            continue
+        # If both interfaces have never flapped return -1
+        if last_up is None and last_down is None:
+            interfaces[iface]["last_flapped"] = -1.0
+        else:
+            # figure out which is the most recent
+            most_recent = max(last_up or _EPOCH, last_down or _EPOCH)
+            last_flap = current_time - most_recent
+            # Whole seconds, as before, but counting the days too.
+            interfaces[iface]["last_flapped"] = float(int(last_flap.total_seconds()))
+    return interfaces
+
+
+_EPOCH = datetime(1970, 1, 1)
+# One pass over "vtysh -c 'show interface'" picks up the interface headers and their
+# "Link ups:"/"Link downs:" lines, e.g.:
+#   Interface swp1 is up, line protocol is down
+#     Link ups:       5    last: 2020/03/05 04:16:00.00
+#     Link downs:     4    last: (never)
+_VTYSH_LINK_RE = re.compile(
+    r"^Interface (?P<iface>\S+) is (?:up|down)"
+    r"|^[ \t]+Link (?P<change>ups|downs):[ \t]+\d+[ \t]+last: (?P<last>[^\r\n]*)",
+    re.M,
+)
+_VTYSH_TIME_RE = re.compile(r"(\d+)/(\d+)/(\d+) (\d+):(\d+):(\d+)(?:\.(\d+))?")
+
+
+def _parse_vtysh_time(value):
+    """Parse a vtysh 'last:' timestamp, returning None for '(never)'."""
+    match = _VTYSH_TIME_RE.match(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        int((fraction or "0")[:6].ljust(6, "0")),
+    )
+
+
+def _iter_vtysh_link_changes(show_int_output):
+    """Yield (interface, last up, last down) for every interface listed by vtysh."""
+    iface = last_up = last_down = None
+    for match in _VTYSH_LINK_RE.finditer(show_int_output):
+        if match.group("iface") is not None:
+            if iface is not None:
+                yield iface, last_up, last_down
+            iface = match.group("iface").lower()
+            last_up = last_down = None
+        elif iface is None:
+            continue
+        elif match.group("change") == "ups":
+            last_up = _parse_vtysh_time(match.group("last"))
+        else:
+            last_down = _parse_vtysh_time(match.group("last"))
+    if iface is not None:
+        yield iface, last_up, last_down
+
+
+# Digest of the interfaces' link state, MTU, MAC address and alias, which changes when
+# their get_interfaces() entry does, leaving aside speed and flap times.
+INTERFACES_FINGERPRINT_COMMAND = "ip -o link show | md5sum"
+
+
+def parse_interfaces_ip(output_json):
+    """Parse 'net show interface all json'."""
+    interfaces_ip = defaultdict(lambda: defaultdict(lambda: defaultdict()))
+    for interface in output_json:
+        if not output_json[interface]["iface_obj"]["ip_address"]["allentries"]:
+            continue
+        for ip_address in output_json[interface]["iface_obj"]["ip_address"][
+            "allentries"
+        ]:
+            ip_ver = ipaddress.ip_interface(ip_address).version
+            ip_ver = "ipv{}".format(ip_ver)
+            ip, prefix = ip_address.split("/")
+            interfaces_ip[interface][ip_ver][ip] = {"prefix_length": int(prefix)}
+
+    return interfaces_ip
+
+
+INTERFACES_COUNTERS_COMMAND = "ip -s -j link show"
+
+
+def interfaces_counters_poll_command(interval):
+    """
+    Build a command printing the device time and the interface counters every `interval`.
+
+    Each sample is a line with the time, then the 'ip -s -j link show' output on one line.
+    """
+    return "while :; do date +%s.%N; {}; echo; sleep {}; done".format(
+        INTERFACES_COUNTERS_COMMAND, interval
+    )
+
+
+def iter_lines(chunks):
+    """Yield the complete lines of an output received as an iterable of text chunks."""
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        if "\n" not in chunk:
+            continue
+        lines = buf.split("\n")
+        buf = lines.pop()
+        for line in lines:
+            yield line
+    if buf:
+        yield buf
+
+
+def _link_counters(link):
+    stats = link.get("stats64") or link.get("stats") or {}
+    rx = stats.get("rx", {})
+    tx = stats.get("tx", {})
+    rx_multicast = rx.get("multicast", -1)
+    rx_packets = rx.get("packets", -1)
+    # The kernel only counts received multicast packets, and no broadcast packets.
+    return {
+        "tx_errors": tx.get("errors", -1),
+        "rx_errors": rx.get("errors", -1),
+        "tx_discards": tx.get("dropped", -1),
+        "rx_discards": rx.get("dropped", -1),
+        "tx_octets": tx.get("bytes", -1),
+        "rx_octets": rx.get("bytes", -1),
+        "tx_unicast_packets": tx.get("packets", -1),
+        "rx_unicast_packets": (
+            rx_packets - rx_multicast if rx_packets >= 0 and rx_multicast >= 0 else rx_packets
+        ),
+        "tx_multicast_packets": -1,
+        "rx_multicast_packets": rx_multicast,
+        "tx_broadcast_packets": -1,
+        "rx_broadcast_packets": -1,
+    }
+
+
+def parse_interfaces_counters(output):
+    """
+    Parse 'ip -s -j link show'.
+
+    'ip -s -j link show' output example (one entry, trimmed):
+    [{"ifindex":3,"ifname":"swp1","flags":["BROADCAST","MULTICAST","UP","LOWER_UP"],
+      "mtu":9216,"operstate":"UP","stats64":{
+        "rx":{"bytes":1203456,"packets":10234,"errors":0,"dropped":2,"over_errors":0,
+              "multicast":34},
+        "tx":{"bytes":2304567,"packets":20345,"errors":0,"dropped":0,"carrier_errors":0,
+              "collisions":0}}}]
+    """
+    return {link["ifname"]: _link_counters(link) for link in fastjson.loads(output)}
+
+
+BGP_SUMMARY_COMMAND = "sudo vtysh -c 'show bgp vrf all summary json'"
+BGP_NEIGHBORS_COMMAND = "sudo vtysh -c 'show bgp vrf all neighbors json'"
+
+_AFI_WORD_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_BGP_AFIS = {}
+
+
+def _bgp_afi(name):
+    """Normalize an address family name, e.g. 'ipv4Unicast' or 'IPv4 Unicast', to 'ipv4 unicast'."""
+    # Looked up for every peer, from a handful of distinct names.
+    afi = _BGP_AFIS.get(name)
+    if afi is None:
+        afi = _BGP_AFIS[name] = _AFI_WORD_RE.sub(" ", name).lower()
+    return afi
+
+
+def _bgp_vrf_name(vrf):
+    return "global" if vrf == "default" else vrf
+
+
+def _iter_bgp_vrfs(dev_bgp_summary, dev_bgp_neighbors):
+    """Yield (vrf, summary, neighbors) for the VRFs of the 'show bgp vrf all' outputs."""
+    for vrf, vrf_summary in dev_bgp_summary.items():
+        summary = {
+            _bgp_afi(afi): afi_summary
+            for afi, afi_summary in vrf_summary.items()
+            if isinstance(afi_summary, dict)
+        }
+        neighbors = {
+            peer: details
+            for peer, details in dev_bgp_neighbors.get(vrf, {}).items()
+            if isinstance(details, dict)
+        }
+        yield vrf, summary, neighbors
+
+
+def bgp_advertised_routes_command(vrf, afi, peer):
+    """Build the vtysh command listing the routes advertised to `peer` in `vrf`."""
+    return "sudo vtysh -c 'show bgp vrf {} {} neighbors {} advertised-routes json'".format(
+        vrf, afi, peer
+    )
+
+
+def bgp_peers_missing_sent_prefixes(dev_bgp_summary, dev_bgp_neighbors):
+    """
+    List the (vrf, afi, peer) tuples whose sent prefix count isn't reported by FRR.
+
+    Those are the peers for which the advertised-routes table has to be counted.
+    """
+    missing = []
+    for vrf, summary, neighbors in _iter_bgp_vrfs(dev_bgp_summary, dev_bgp_neighbors):
+        for afi in summary:
+            if not (afi in SUPPORTED_BGP_AFIS) or not summary[afi]:
+                continue
+            for peer in summary[afi]["peers"]:
+                for af, af_details in neighbors[peer]["addressFamilyInfo"].items():
+                    af = _bgp_afi(af)
+                    if not (af in SUPPORTED_BGP_AFIS):
+                        continue
+                    if _sent_prefixes(summary, af, peer, af_details) is None:
+                        missing.append((vrf, af, peer))
+    return missing
+
+
+def _sent_prefixes(dev_bgp_summary, af, peer, af_details):
+    # FRR reports the sent prefix count as pfxSnt in the summary, or as
+    # sentPrefixCounter in the neighbor output, depending on the version.
+    return dev_bgp_summary[af]["peers"][peer].get(
+        "pfxSnt", af_details.get("sentPrefixCounter")
+    )
+
+
+def bgp_summary_fingerprint(dev_bgp_summary):
+    """
+    Summarize 'show bgp vrf all summary json' into what changes when a peer's results change.
+
+    Message counters and timers are left out, as they change on every keepalive.
+    """
+    fingerprint = []
+    for vrf, vrf_summary in sorted(dev_bgp_summary.items()):
+        for afi, afi_summary in sorted(vrf_summary.items()):
+            if not isinstance(afi_summary, dict):
+                continue
+            fingerprint.append((vrf, afi, afi_summary.get("routerId")))
+            for peer, peer_summary in sorted(afi_summary.get("peers", {}).items()):
+                fingerprint.append(
+                    (
+                        peer,
+                        peer_summary.get("state"),
+                        peer_summary.get("remoteAs"),
+                        peer_summary.get("prefixReceivedCount"),
+                        peer_summary.get("pfxSnt"),
+                    )
+                )
+    return tuple(fingerprint)
+
+
+def parse_bgp_advertised_routes_count(output):
+    """Parse 'show bgp vrf <vrf> <afi> neighbors <peer> advertised-routes json'."""
+    # Drop the stray "n" line endings found in this output, no JSON line ends with one.
+    # Most outputs have none, which spares copying the whole table.
+    if "n\n" in output:
+        output = output.replace("n\n", "")
+    return fastjson.loads(output)["totalPrefixCounter"]
+
+
+def parse_bgp_neighbors(dev_bgp_summary, dev_bgp_neighbors, advertised_routes=None):
+    """
+    Parse 'show bgp vrf all summary json' and 'show bgp vrf all neighbors json'.
+
+    Both outputs are keyed by VRF; the default VRF is reported as "global".
+    `advertised_routes` maps (vrf, afi, peer) tuples to sent prefix counts, for the peers
+    listed by `bgp_peers_missing_sent_prefixes`. Peers missing from it get a count of -1.
+    """
+    advertised_routes = advertised_routes or {}
+    bgp_neighbors = {}
+    for vrf_name, summary, neighbors in _iter_bgp_vrfs(dev_bgp_summary, dev_bgp_neighbors):
+        vrf = _bgp_vrf_name(vrf_name)
+        for afi in summary:
+            if not (afi in SUPPORTED_BGP_AFIS) or not summary[afi]:
+                continue
+            # VRFs without a supported AFI, e.g. EVPN-only tenant VRFs, are left out.
+            bgp_neighbors.setdefault(vrf, {"peers": {}})
+            bgp_neighbors[vrf]["router_id"] = summary[afi]["routerId"]
+            for peer in summary[afi]["peers"]:
+                bgp_neighbors[vrf]["peers"][peer] = _parse_bgp_neighbor(
+                    summary, neighbors[peer], peer, vrf_name, advertised_routes
+                )
+
+    return bgp_neighbors
+
+
+def _parse_bgp_neighbor(summary, neighbor, peer, vrf, advertised_routes):
+    bgp_neighbor = {}
+    bgp_neighbor["local_as"] = neighbor["localAs"]
+    bgp_neighbor["remote_as"] = neighbor["remoteAs"]
+    bgp_neighbor["remote_id"] = neighbor["remoteRouterId"]
+    uptime = neighbor.get("bgpTimerUpMsec", "")
+    bgp_neighbor["description"] = neighbor.get("nbrDesc", "")
+    if neighbor["bgpState"] == "Established":
+        is_up = True
+    else:
+        is_up = False
+        uptime = -1
+    if neighbor.get("adminShutDown", False):
+        is_enabled = False
+    else:
+        is_enabled = True
+    bgp_neighbor["is_up"] = is_up
+    bgp_neighbor["is_enabled"] = is_enabled
+    bgp_neighbor["uptime"] = int(uptime / 1000)
+    bgp_neighbor.setdefault("address_family", {})
+    for af, af_details in neighbor["addressFamilyInfo"].items():
+        af = _bgp_afi(af)
+        if not (af in SUPPORTED_BGP_AFIS):
+            continue
+        route_info = {}
+        peer_advertised_routes = _sent_prefixes(summary, af, peer, af_details)
+        if peer_advertised_routes is None:
+            peer_advertised_routes = advertised_routes.get((vrf, af, peer), -1)
+        if not is_enabled:
+            summary[af]["peers"][peer]["prefixReceivedCount"] = -1
+            peer_advertised_routes = -1
+            af_details["acceptedPrefixCounter"] = -1
+        route_info["received_prefixes"] = summary[af]["peers"][peer]["prefixReceivedCount"]
+        route_info["sent_prefixes"] = int(peer_advertised_routes)
+        route_info["accepted_prefixes"] = af_details["acceptedPrefixCounter"]
+        bgp_neighbor["address_family"][af.split()[0]] = route_info
+    return bgp_neighbor
+
+
+def route_to_command(family, destination="", longer=False):
+    """
+    Build the vtysh command listing the IPv`family` routes to `destination` in every VRF.
+
+    Raises ValueError if `destination` is neither an IP address nor a prefix, since it
+    ends up in a command run with sudo.
+    """
+    command = "show {} route vrf all".format("ip" if family == 4 else "ipv6")
+    if destination:
+        try:
+            if "/" in destination:
+                ipaddress.ip_network(destination, strict=False)
+            else:
+                ipaddress.ip_address(destination)
+        except ValueError:
+            raise ValueError("Invalid route destination: {!r}".format(destination))
+        command += " " + destination
+        if longer:
+            command += " longer-prefixes"
+    return "sudo vtysh -c '{} json'".format(command)
+
+
+def route_to_commands(destination="", longer=False):
+    """
+    Build the route_to_command of each address family `destination` belongs to.
+
+    Without a destination, the routes of both families are listed.
+    """
+    if not destination:
+        families = [4, 6]
+    elif ":" in destination:
+        families = [6]
+    else:
+        families = [4]
+    return [route_to_command(family, destination, longer) for family in families]
+
+
+def parse_route_to_outputs(outputs, protocol=""):
+    """Parse the outputs of route_to_commands, merged into one get_route_to() dict."""
+    routes_to = {}
+    for output in outputs:
+        for prefix, routes in parse_route_to(output, protocol).items():
+            routes_to.setdefault(prefix, []).extend(routes)
+    return routes_to
+
+
+def iter_json_documents(output):
+    """Yield the JSON documents of `output`, which may hold several one after the other."""
+    decoder = json.JSONDecoder()
+    pos = _JSON_WHITESPACE_RE.match(output).end()
+    while pos < len(output):
+        document, pos = decoder.raw_decode(output, pos)
+        yield document
+        pos = _JSON_WHITESPACE_RE.match(output, pos).end()
+
+
+_ROUTE_UPTIME_RE = re.compile(r"(\d+)([wdhms])")
+_ROUTE_UPTIME_SECONDS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+
+
+def _route_age(uptime):
+    """Convert a route uptime, e.g. '00:05:12', '1d02h03m' or '01w2d03h', to seconds."""
+    if ":" in uptime:
+        seconds = 0
+        for part in uptime.split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    return sum(
+        int(value) * _ROUTE_UPTIME_SECONDS[unit]
+        for value, unit in _ROUTE_UPTIME_RE.findall(uptime)
+    )
+
+
+def _iter_vrf_routes(documents):
+    """Yield (vrf, prefix, routes) from vtysh 'show ip route vrf all ... json' documents."""
+    for document in documents:
+        for key, value in document.items():
+            if "/" in key:
+                # One document per VRF, without the VRF name as key, on FRR < 8.
+                yield None, key, value
+            else:
+                for prefix, routes in value.items():
+                    yield key, prefix, routes
+
+
+def parse_route_to(output, protocol=""):
+    """
+    Parse vtysh 'show ip route vrf all ... json', keeping the routes learnt by `protocol`.
+
+    Returns the napalm get_route_to() dict, with one entry per next hop of every route.
+    """
+    try:
+        documents = [fastjson.loads(output)]
+    except ValueError:
+        documents = iter_json_documents(output)
+
+    routes_to = {}
+    for vrf, prefix, routes in _iter_vrf_routes(documents):
+        for route in routes:
+            if protocol and route["protocol"] != protocol:
+                continue
+            attributes = {"metric": route.get("metric", 0), "table": route.get("table", 0)}
+            for nexthop in route.get("nexthops", []):
+                routes_to.setdefault(prefix, []).append(
+                    {
+                        "protocol": route["protocol"],
+                        "current_active": bool(route.get("selected") and nexthop.get("active")),
+                        "last_active": False,
+                        "age": _route_age(route.get("uptime", "00:00:00")),
+                        "next_hop": nexthop.get("ip", ""),
+                        "outgoing_interface": nexthop.get("interfaceName", ""),
+                        "selected_next_hop": bool(nexthop.get("fib")),
+                        "preference": route.get("distance", 0),
+                        "inactive_reason": "",
+                        "routing_table": vrf or route.get("vrfName", "default"),
+                        "protocol_attributes": dict(attributes),
+                    }
+                )
+    return routes_to
+
+
+def parse_snmp_information(snmp_config_output):
+    """Parse 'net show configuration snmp-server'."""
+    contact = system_name = location = ""
+    snmp_information = {}
+    snmp_values = {}
+    community_list = []
+    snmp_values.setdefault("community", {})
+    for parse_snmp_value in snmp_config_output.splitlines():
+        if (
+            "readonly-community" in parse_snmp_value
+            or "readonly-community-v6" in parse_snmp_value
+        ):
+            community_value = parse_snmp_value.strip().split()[1]
+            acl = parse_snmp_value.lstrip().split()[3]
+            if acl == "any":
+                acl = "N/A"
+            if community_value in community_list:
+                """
+                Unlike other routers that use ACL for
+                snmp access-control, Cumulus directly defines
+                authorized hosts as part of SNMP config.
+                E.g:
+                snmp-server
+                   listening-address all
+                   readonly-community private_multi_host access 10.10.10.1
+                   system-contact NOC
+                   system-location LAB
+                   system-name cumulus-rtr-1
+                This creates a problem as NAPALM snmp object
+                shows access-list name as key of community string.
+                To best present the authorized-host info in the SNMP object,
+                we show comma separate string of them as key of SNMP community.
+                """
+                acl = snmp_values["community"][community_value]["acl"] + "," + acl
+                snmp_values["community"][community_value] = {
+                    "acl": acl,
+                    "mode": "ro",
+                }
+            else:
+                community_list.append(community_value)
+                snmp_values["community"][community_value] = {
+                    "acl": acl,
+                    "mode": "ro",
+                }
+        system_contact_parse = re.search(
+            r".*system-contact.(\D.*)", parse_snmp_value.strip()
+        )
+        if system_contact_parse:
+            contact = system_contact_parse.groups()[0]
+        system_location_parse = re.search(
+            r".*system-location.(\D.*)", parse_snmp_value.strip()
+        )
+        if system_location_parse:
+            location = system_location_parse.groups()[0]
+        system_name_parse = re.search(
+            r".*system-name.(\D.*)", parse_snmp_value.strip()
+        )
+        if system_name_parse:
+            system_name = system_name_parse.groups()[0]
+    snmp_information = snmp_values
+    snmp_information["contact"] = contact
+    snmp_information["chassis_id"] = system_name
+    snmp_information["location"] = location
+
+    return snmp_information
+
+
+def parse_environment(smonctl_output, memory_data):
+    """Parse 'sudo smonctl --json' and 'free'."""
+
+    def _psu(psu_data):
+        return {
+            psu_data["name"].lower(): {
+                "status": True if psu_data["state"] == "OK" else False,
+                "output": float(psu_data.get("input", "-1.0")),
+                # Capacity data isn't available yet
+                "capacity": -1.0,
+            }
+        }
+
+    def _fan(fan_data):
+        return {
+            fan_data["name"]: {
+                "status": True if fan_data["state"] == "OK" else False
+            }
+        }
+
+    def _temp(temp_data):
+        return {
+            temp_data["name"]: {
+                "temperature": float(temp_data["input"]),
+                "is_critical": temp_data["input"] > temp_data["crit"],
+                # 90% of the critical threshold
+                "is_alert": temp_data["input"] > (temp_data["crit"] * 0.9),
+            }
+        }
+
+    def _memory(memory_data):
+        memory_data = [i for i in memory_data.splitlines() if i.startswith("Mem:")]
+        if not memory_data:
+            return {"available_ram": -1, "used_ram": -1}
+        memory_data = memory_data[0].split()
+        total = memory_data[1]
+        free = memory_data[3]
+        return {
+            "available_ram": int(total) if total.isdigit() else -1,
+            "used_ram": int(free) if free.isdigit() else -1,
+        }
+
+    env_data = {"fans": {}, "temperature": {}, "power": {}, "cpu": {}, "memory": {}}
+    for data in smonctl_output:
+        if "power" == data["type"]:
+            env_data["power"].update(_psu(data))
+        elif "fan" == data["type"]:
+            env_data["fans"].update(_fan(data))
+        elif "temp" == data["type"]:
+            env_data["temperature"].update(_temp(data))
+
+    env_data["memory"].update(_memory(memory_data))
+
+    return env_data
+
+
+# NVUE REST API resources, see napalm_cumulus.utils.nvue. Interfaces LLDP runs on.
+NVUE_LLDP_INTERFACE_TYPES = ("swp", "eth")
+_NVUE_UPTIME_RE = re.compile(r"^(?:(\d+) days?, )?(\d+):(\d+):(\d+)")
+_NVUE_AFIS = {"ipv4-unicast": "ipv4", "ipv6-unicast": "ipv6"}
+
+
+def nvue_path(*parts):
+    """Build the path of an NVUE resource, e.g. nvue_path("interface", "swp1", "lldp")."""
+    return "/" + "/".join(quote(str(part), safe="") for part in parts)
+
+
+def _nvue_uptime(uptime):
+    """Convert an NVUE uptime, in seconds or e.g. '6 days, 8:37:36', to seconds."""
+    if isinstance(uptime, (int, float)):
+        return int(uptime)
+    match = _NVUE_UPTIME_RE.match(str(uptime))
+    if match is None:
+        return -1
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _nvue_int(value):
+    return value if isinstance(value, int) else -1
+
+
+def parse_nvue_facts(system, hardware, interfaces):
+    """Parse the NVUE /system, /platform/hardware and /interface resources."""
+    facts = {
+        "uptime": _nvue_uptime(system.get("uptime", "")),
+        "vendor": hardware.get("manufacturer", ""),
+        "model": hardware.get("model", ""),
+        "hostname": system["hostname"],
+        "os_version": system.get("build", "").replace("Cumulus Linux ", ""),
+        "serial_number": hardware.get("serial-number", ""),
+    }
+    facts["fqdn"] = facts["hostname"]
+    facts["interface_list"] = string_parsers.sorted_nicely(interfaces.keys())
+    return facts
+
+
+def parse_nvue_interfaces(interfaces):
+    """
+    Parse the NVUE /interface resource.
+
+    NVUE doesn't report when links last changed state: last_flapped is always -1.
+    """
+    result = {}
+    for interface, iface_data in interfaces.items():
+        link = iface_data.get("link", {})
+        result[interface] = {
+            "description": iface_data.get("description", ""),
+            "is_enabled": "down" not in link.get("state", {}),
+            "is_up": link.get("oper-status") == "up",
+            "mac_address": link.get("mac", ""),
+            "mtu": link.get("mtu", -1),
+            "speed": _convert_speed(str(link.get("speed", ""))),
+            "last_flapped": -1.0,
+        }
+    return result
+
+
+def parse_nvue_interfaces_ip(interfaces):
+    """Parse the NVUE /interface resource."""
+    interfaces_ip = {}
+    for interface, iface_data in interfaces.items():
+        for ip_address in iface_data.get("ip", {}).get("address", {}):
+            address = ipaddress.ip_interface(ip_address)
+            interfaces_ip.setdefault(interface, {}).setdefault(
+                "ipv{}".format(address.version), {}
+            )[str(address.ip)] = {"prefix_length": address.network.prefixlen}
+    return interfaces_ip
+
+
+def nvue_lldp_interfaces(interfaces):
+    """Return the interfaces of the NVUE /interface resource LLDP can have neighbors on."""
+    return [
+        interface
+        for interface, iface_data in interfaces.items()
+        if iface_data.get("type") in NVUE_LLDP_INTERFACE_TYPES
+        and iface_data.get("link", {}).get("oper-status") == "up"
+    ]
+
+
+def parse_nvue_lldp_neighbors(lldp_by_interface):
+    """Parse the NVUE /interface/<interface>/lldp resources, keyed by interface."""
+    lldp = {}
+    for interface, interface_lldp in lldp_by_interface.items():
+        neighbors = []
+        for name, neighbor in interface_lldp.get("neighbor", {}).items():
+            port = neighbor.get("port", {})
+            neighbors.append(
+                {
+                    "hostname": neighbor.get("chassis", {}).get("system-name", name),
+                    "port": port.get("name") or port.get("description", ""),
+                }
+            )
+        if neighbors:
+            lldp[interface] = neighbors
+    return lldp
+
+
+def nvue_bgp_vrfs(vrfs):
+    """Return the VRFs of the NVUE /vrf resource BGP is enabled in."""
+    return [
+        vrf
+        for vrf, vrf_data in vrfs.items()
+        if vrf_data.get("router", {}).get("bgp", {}).get("enable") == "on"
+    ]
+
+
+def parse_nvue_bgp_neighbors(vrfs, neighbors_by_vrf):
+    """
+    Parse the NVUE /vrf resource and the /vrf/<vrf>/router/bgp/neighbor resources.
+
+    `neighbors_by_vrf` is keyed by VRF; the default VRF is reported as "global".
+    Counters NVUE doesn't report are -1.
+    """
+    bgp_neighbors = {}
+    for vrf_name, neighbors in neighbors_by_vrf.items():
+        bgp = vrfs[vrf_name]["router"]["bgp"]
+        peers = {}
+        for peer, neighbor in neighbors.items():
+            is_up = neighbor.get("state") == "established"
+            is_enabled = neighbor.get("shutdown", "off") != "on"
+            address_family = {}
+            for afi, af_details in neighbor.get("address-family", {}).items():
+                if afi not in _NVUE_AFIS:
+                    continue
+                address_family[_NVUE_AFIS[afi]] = {
+                    "received_prefixes": _nvue_int(af_details.get("rx-prefix")),
+                    "sent_prefixes": _nvue_int(af_details.get("tx-prefix")),
+                    "accepted_prefixes": _nvue_int(af_details.get("accepted-prefix")),
+                }
+            peers[peer] = {
+                "local_as": _nvue_int(neighbor.get("local-as", bgp.get("autonomous-system"))),
+                "remote_as": _nvue_int(neighbor.get("remote-as")),
+                "remote_id": neighbor.get("remote-router-id", ""),
+                "description": neighbor.get("description", ""),
+                "is_up": is_up,
+                "is_enabled": is_enabled,
+                "uptime": _nvue_int(neighbor.get("uptime")) if is_up else -1,
+                "address_family": address_family,
+            }
+        bgp_neighbors[_bgp_vrf_name(vrf_name)] = {
+            "router_id": bgp.get("router-id", ""),
+            "peers": peers,
+        }
+    return bgp_neighbors
@@ -0,0 +1,175 @@
+"""Process-wide pool of SSH connections shared by driver instances."""
+import atexit
+import threading
+import time
+
+from napalm.base.exceptions import ConnectionException
+
+
+class ConnectionPool(object):
+    """
+    Keep SSH connections open between driver sessions, so ``open()`` can skip the TCP, key
+    exchange, authentication and prompt handshakes.
+
+    Connections are borrowed per key, which identifies the host and the credentials used
+    to log in, and handed back once the session is over. A connection idle for more than
+    `idle_timeout` seconds is closed, and at most `max_connections` connections, idle or in
+    use, are open at any time: when the bound is reached the least recently used idle
+    connection is closed to make room, or ``acquire`` waits for one to be handed back.
+
+    `keepalive` is the interval in seconds of the SSH keepalives drivers enable on the
+    connections they create for the pool, so firewalls don't drop them while idle.
+    """
+
+    def __init__(self, max_connections=64, idle_timeout=300, keepalive=30):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.stats = {"created": 0, "reused": 0, "evicted": 0}
+        # Idle connections as (key, connection, released_at), least recently used first.
+        self._idle = []
+        # Connections counted against max_connections: idle, in use or being created.
+        self._count = 0
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return self._count
+
+    @property
+    def idle(self):
+        with self._cond:
+            return len(self._idle)
+
+    def acquire(self, key, connect, is_alive, timeout=None):
+        """
+        Return a connection for `key`.
+
+        An idle connection for `key` is reused if `is_alive(connection)` says it is still
+        usable, otherwise `connect()` is called to create a new one. Raises
+        ConnectionException if the pool stays full for `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stale = []
+            try:
+                with self._cond:
+                    connection = self._reserve(key, deadline, stale)
+            finally:
+                self._close_all(stale)
+
+            if connection is None:
+                try:
+                    connection = connect()
+                except Exception:
+                    self._forget()
+                    raise
+                with self._cond:
+                    self.stats["created"] += 1
+                return connection
+
+            try:
+                alive = is_alive(connection)
+            except Exception:
+                alive = False
+            if alive:
+                with self._cond:
+                    self.stats["reused"] += 1
+                return connection
+            self.discard(connection)
+
+    def release(self, key, connection):
+        """Hand a connection back to the pool for the next ``acquire`` of `key`."""
+        with self._cond:
+            stale = self._expire()
+            self._idle.append((key, connection, time.monotonic()))
+            self._cond.notify()
+        self._close_all(stale)
+
+    def discard(self, connection):
+        """Close a connection borrowed from the pool instead of handing it back."""
+        self._close_all([connection])
+        self._forget()
+
+    def evict_idle(self):
+        """Close the connections idle for more than `idle_timeout` seconds."""
+        with self._cond:
+            stale = self._expire()
+        self._close_all(stale)
+
+    def clear(self):
+        """Close every idle connection."""
+        with self._cond:
+            stale = [connection for _, connection, _ in self._idle]
+            self._idle = []
+            self._count -= len(stale)
+            self._cond.notify_all()
+        self._close_all(stale)
+
+    def _reserve(self, key, deadline, stale):
+        """
+        Take an idle connection for `key`, or reserve room for a new one and return None.
+
+        Must be called with the lock held. Connections to close are added to `stale`.
+        """
+        while True:
+            stale.extend(self._expire())
+            for index in range(len(self._idle) - 1, -1, -1):
+                if self._idle[index][0] == key:
+                    return self._idle.pop(index)[1]
+            if self._count < self.max_connections:
+                self._count += 1
+                return None
+            if self._idle:
+                # The new connection takes over the slot of the least recently used one.
+                stale.append(self._idle.pop(0)[1])
+                self.stats["evicted"] += 1
+                return None
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise ConnectionException(
+                    "All {} pooled connections are in use".format(self.max_connections)
+                )
+            self._cond.wait(remaining)
+
+    def _expire(self):
+        """Remove and return the idle connections past `idle_timeout`. Needs the lock."""
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic()
+        expired = [c for _, c, released_at in self._idle if now - released_at > self.idle_timeout]
+        if expired:
+            self._idle = [
+                entry for entry in self._idle if now - entry[2] <= self.idle_timeout
+            ]
+            self._count -= len(expired)
+            self.stats["evicted"] += len(expired)
+            self._cond.notify_all()
+        return expired
+
+    def _forget(self):
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_all(connections):
+        for connection in connections:
+            try:
+                connection.disconnect()
+            except Exception:
+                pass
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool():
+    """Return the pool shared by every driver of the process, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+            atexit.register(_default_pool.clear)
+        return _default_pool
@@ -0,0 +1,150 @@
+"""Configuration files replaced as a whole by load_replace_candidate()."""
+import difflib
+import io
+import re
+import shlex
+import tarfile
+from collections import OrderedDict
+
+# The files a replace candidate can hold, with the command validating a staged copy and
+# the command applying the file once swapped in.
+CONFIG_FILES = OrderedDict(
+    [
+        ("/etc/network/interfaces", ("ifup -a -s -i {staged}", "ifreload -a")),
+        ("/etc/frr/frr.conf", ("vtysh -C -f {staged}", "systemctl reload frr")),
+    ]
+)
+BACKUP_SUFFIX = ".napalm-rollback"
+# Exit status of read_command() when the file doesn't exist.
+MISSING_STATUS = 100
+
+_HEADER_RE = re.compile(r"^(/\S+)\n=+\n", re.M)
+
+
+def _content(text):
+    return text.strip("\n") + "\n"
+
+
+def parse_config_files(config):
+    """
+    Split a replace candidate into an OrderedDict of file contents keyed by path.
+
+    `config` is a dict, or text laid out like 'net show configuration files':
+
+    /etc/network/interfaces
+    =======================
+    auto lo
+    iface lo inet loopback
+
+    /etc/frr/frr.conf
+    =================
+    hostname leaf01
+    """
+    if isinstance(config, dict):
+        return OrderedDict((path, _content(text)) for path, text in config.items())
+    files = OrderedDict()
+    headers = list(_HEADER_RE.finditer(config))
+    for header, following in zip(headers, headers[1:] + [None]):
+        end = following.start() if following is not None else len(config)
+        files[header.group(1)] = _content(config[header.end():end])
+    return files
+
+
+def pack(files):
+    """Return a gzipped tar archive of `files`, paths made relative to the root."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+        for path, text in files.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(path.lstrip("/"))
+            info.size = len(data)
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def diff(running, candidate):
+    """Return the unified diff, file by file, from the `running` to the `candidate` files."""
+    lines = []
+    for path, text in candidate.items():
+        lines.extend(
+            difflib.unified_diff(
+                running.get(path, "").splitlines(True),
+                text.splitlines(True),
+                fromfile=path,
+                tofile=path,
+            )
+        )
+    return "".join(lines)
+
+
+def read_command(path):
+    """Build the command printing `path`, exiting with MISSING_STATUS if it doesn't exist."""
+    quoted = shlex.quote(path)
+    return "sudo sh -c {}".format(
+        shlex.quote("[ -e {0} ] || exit {1}; cat {0}".format(quoted, MISSING_STATUS))
+    )
+
+
+# A file that didn't exist is backed up as a missing backup, and restored by deleting it.
+def _backup(path):
+    return "if [ -e {0} ]; then cp -p {0} {1}; else rm -f {1}; fi".format(
+        shlex.quote(path), shlex.quote(path + BACKUP_SUFFIX)
+    )
+
+
+def _restore(path):
+    return "if [ -e {1} ]; then cp -p {1} {0}; else rm -f {0}; fi".format(
+        shlex.quote(path), shlex.quote(path + BACKUP_SUFFIX)
+    )
+
+
+def _reload_commands(paths):
+    return list(OrderedDict((CONFIG_FILES[path][1], None) for path in paths))
+
+
+def check_command(path, staging):
+    """Build the command validating the copy of `path` staged under `staging`."""
+    return "sudo " + CONFIG_FILES[path][0].format(staged=shlex.quote(staging + path))
+
+
+def commit_script(paths, staging, marker):
+    """
+    Build the script swapping the files staged under `staging` in and applying them.
+
+    Each running file is backed up, then replaced by a rename, which is atomic. If a file
+    can't be applied, the backups are restored and applied again, and the script prints
+    "<marker> restored". It prints "<marker> ok" once done.
+    """
+    lines = ["set -e"]
+    for path in paths:
+        lines.append(_backup(path))
+    for path in paths:
+        new = shlex.quote(path + ".napalm-new")
+        lines.append(
+            "if [ -e {0} ]; then cp -p {0} {1}; fi; cat {2} > {1}; mv -f {1} {0}".format(
+                shlex.quote(path), new, shlex.quote(staging + path)
+            )
+        )
+    restore = [_restore(path) for path in paths]
+    restore.extend("{} || true".format(command) for command in _reload_commands(paths))
+    restore.append("printf '%s restored\\n' {}".format(marker))
+    lines.append(
+        "if ! {{ {}; }}; then {}; exit 1; fi".format(
+            " && ".join(_reload_commands(paths)), "; ".join(restore)
+        )
+    )
+    lines.append("rm -rf {}".format(shlex.quote(staging)))
+    # Printed through printf arguments, so the echoed command line never matches.
+    lines.append("printf '%s ok\\n' {}".format(marker))
+    return "; ".join(lines)
+
+
+def rollback_script(paths, marker):
+    """Build the script restoring the backups of `paths` taken by the commit script."""
+    lines = ["set -e"]
+    for path in paths:
+        lines.append(_restore(path))
+    lines.extend(_reload_commands(paths))
+    lines.append("printf '%s ok\\n' {}".format(marker))
+    return "; ".join(lines)
@@ -0,0 +1,115 @@
+"""Routes of every VRF indexed for longest-prefix-match lookups."""
+import ipaddress
+from bisect import bisect_left, bisect_right
+
+
+class _PrefixIndex(object):
+    """
+    Prefixes of one VRF and IP version, in one hash table per prefix length.
+
+    A longest-prefix match probes the lengths present from the longest down, at most 33 or
+    129 dict lookups whatever the table size, and takes far less memory than a trie with a
+    node per bit. More-specific lookups search the sorted networks of each longer length.
+    """
+
+    def __init__(self, max_length):
+        self.max_length = max_length
+        self._networks = {}
+        self._lengths = None
+        self._sorted = {}
+
+    def add(self, network, prefix):
+        self._networks.setdefault(network.prefixlen, {})[int(network.network_address)] = prefix
+        self._lengths = None
+        self._sorted.pop(network.prefixlen, None)
+
+    def _lengths_descending(self):
+        if self._lengths is None:
+            self._lengths = sorted(self._networks, reverse=True)
+        return self._lengths
+
+    def longest_match(self, address):
+        address = int(address)
+        for length in self._lengths_descending():
+            key = address >> (self.max_length - length) << (self.max_length - length)
+            prefix = self._networks[length].get(key)
+            if prefix is not None:
+                return prefix
+        return None
+
+    def exact(self, network):
+        return self._networks.get(network.prefixlen, {}).get(int(network.network_address))
+
+    def within(self, network):
+        first = int(network.network_address)
+        last = int(network.broadcast_address)
+        for length in self._lengths_descending():
+            if length < network.prefixlen:
+                continue
+            keys = self._sorted.get(length)
+            if keys is None:
+                keys = self._sorted[length] = sorted(self._networks[length])
+            for key in keys[bisect_left(keys, first):bisect_right(keys, last)]:
+                yield self._networks[length][key]
+
+
+class RouteTable(object):
+    """
+    Routes in the format of get_route_to(), indexed per VRF for local lookups.
+
+    ``lookup`` answers like the device would: an address gets the longest matching prefix
+    of every VRF, a prefix only matches exactly, or with `longer` also its more specifics.
+    """
+
+    def __init__(self, routes_to=None):
+        self._indexes = {}
+        self._routes = {}
+        for prefix, routes in (routes_to or {}).items():
+            for route in routes:
+                self.add(prefix, route)
+
+    def __len__(self):
+        return len(self._routes)
+
+    def add(self, prefix, route):
+        """Add a route to `prefix`, a dict as returned by get_route_to()."""
+        vrf = route["routing_table"]
+        key = (vrf, prefix)
+        if key not in self._routes:
+            network = ipaddress.ip_network(prefix, strict=False)
+            index = self._indexes.get((vrf, network.version))
+            if index is None:
+                index = self._indexes[(vrf, network.version)] = _PrefixIndex(
+                    network.max_prefixlen
+                )
+            index.add(network, prefix)
+            self._routes[key] = []
+        self._routes[key].append(route)
+
+    def lookup(self, destination="", protocol="", longer=False):
+        """Return the routes to `destination` learnt by `protocol`, as get_route_to() does."""
+        if not destination:
+            keys = list(self._routes)
+        elif "/" in destination:
+            network = ipaddress.ip_network(destination, strict=False)
+            keys = []
+            for (vrf, version), index in self._indexes.items():
+                if version != network.version:
+                    continue
+                prefixes = index.within(network) if longer else [index.exact(network)]
+                keys.extend((vrf, prefix) for prefix in prefixes if prefix is not None)
+        else:
+            address = ipaddress.ip_address(destination)
+            keys = []
+            for (vrf, version), index in self._indexes.items():
+                if version == address.version:
+                    prefix = index.longest_match(address)
+                    if prefix is not None:
+                        keys.append((vrf, prefix))
+
+        routes_to = {}
+        for vrf, prefix in keys:
+            for route in self._routes[(vrf, prefix)]:
+                if not protocol or route["protocol"] == protocol:
+                    routes_to.setdefault(prefix, []).append(route)
+        return routes_to
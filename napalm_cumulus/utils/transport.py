@@ -0,0 +1,235 @@
+"""SSH exec channel transport, an alternative to netmiko's interactive shell."""
+import codecs
+import re
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import paramiko
+from napalm.base.exceptions import CommandErrorException, CommandTimeoutException
+
+# What sudo prints before running anything when it refuses to, e.g. a wrong password.
+_SUDO_FAILURE_RE = re.compile(
+    rb"^sudo: (?:\d+ incorrect password attempts?|a password is required"
+    rb"|no password was provided|.* is not in the sudoers file)",
+    re.M,
+)
+_SUDO_FAILURE_HEAD = 4096
+# How much of the output of a failed streamed command its error message shows.
+_ERROR_HEAD = 4096
+
+
+def sudo_command(command, sudo_pwd):
+    """
+    Make a 'sudo' command read its password from stdin.
+
+    Exec channels have no terminal for sudo to prompt on. Without a password, e.g. with
+    key-based authentication, the command runs with 'sudo -n' instead, which fails rather
+    than prompting unless a NOPASSWD rule allows it. Returns the command to run and the
+    data to send on its stdin.
+    """
+    if not command.startswith("sudo"):
+        return command, None
+    if sudo_pwd is None:
+        return "sudo -n " + command[len("sudo"):].lstrip(), None
+    return "sudo -S -p '' " + command[len("sudo"):].lstrip(), sudo_pwd + "\n"
+
+
+def command_error(command, status, output):
+    """Build the exception reporting that `command` exited with a nonzero `status`."""
+    if isinstance(output, bytes):
+        output = output.decode("utf-8", "replace")
+    return CommandErrorException(
+        "Command '{}' failed with exit status {}: {}".format(command, status, output.strip())
+    )
+
+
+def check_exit_status(command, chunks):
+    """
+    Yield the output `chunks` of `iter_exec_command`.
+
+    Once they're all read, raises CommandErrorException if `command` exited with a nonzero
+    status.
+    """
+    head = ""
+    chunks = iter(chunks)
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration as stop:
+            status = stop.value
+            break
+        if len(head) < _ERROR_HEAD:
+            head += chunk
+        yield chunk
+    if status:
+        raise command_error(command, status, head)
+
+
+def iter_exec_command(transport, command, sudo_pwd=None, timeout=None, decode=True):
+    """
+    Run `command` on a new exec channel of `transport`, yielding its output as it arrives.
+
+    Output is decoded chunk by chunk unless `decode` is false, with stderr merged into it
+    as an interactive shell would show it. The exit status of the command is the return
+    value of the generator. Stdin is closed once the sudo password is sent, so a command
+    reading it gets EOF; raises CommandErrorException when sudo refuses to run the command.
+    """
+    stdin = None
+    if sudo_pwd is not None:
+        command, stdin = sudo_command(command, sudo_pwd)
+    privileged = command.startswith("sudo")
+    head = b""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    channel = transport.open_session(timeout=timeout)
+    try:
+        channel.settimeout(timeout)
+        channel.set_combine_stderr(True)
+        channel.exec_command(command)
+        if stdin is not None:
+            channel.sendall(stdin.encode())
+        channel.shutdown_write()
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                break
+            if privileged and len(head) < _SUDO_FAILURE_HEAD:
+                head += data
+            if not decode:
+                yield data
+                continue
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+        status = channel.recv_exit_status()
+        if privileged and status != 0 and _SUDO_FAILURE_RE.search(head):
+            raise CommandErrorException("Unable to sudo")
+        return status
+    except socket.timeout:
+        raise CommandTimeoutException("Command '{}' timed out".format(command))
+    finally:
+        channel.close()
+
+
+def exec_command(transport, command, sudo_pwd=None, timeout=None, decode=True):
+    """
+    Run `command` on a new exec channel of `transport`.
+
+    Output is read until EOF. Returns the output, as bytes if `decode` is false, and the
+    exit status of the command.
+    """
+    chunks = []
+    reader = iter_exec_command(
+        transport, command, sudo_pwd=sudo_pwd, timeout=timeout, decode=decode
+    )
+    while True:
+        try:
+            chunks.append(next(reader))
+        except StopIteration as stop:
+            empty = "" if decode else b""
+            return empty.join(chunks), stop.value
+
+
+def exec_commands(transport, commands, max_channels, sudo_pwd=None, timeout=None, decode=True):
+    """
+    Run independent `commands` concurrently, each on its own exec channel of `transport`.
+
+    At most `max_channels` channels are open at a time. Returns the output, exit status
+    and run time in seconds of every command, in the order of `commands`.
+    """
+
+    def _run(command):
+        start = time.perf_counter()
+        output, status = exec_command(
+            transport, command, sudo_pwd=sudo_pwd, timeout=timeout, decode=decode
+        )
+        return output, status, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=min(max_channels, len(commands))) as executor:
+        return list(executor.map(_run, commands))
+
+
+class ExecChannelConnection(object):
+    """
+    Persistent SSH connection running each command on its own exec channel.
+
+    Offers the subset of netmiko's connection API used by the driver, so it can replace
+    ``ConnectHandler`` without prompt detection or read delays. When `sudo_pwd` is set,
+    commands starting with 'sudo' get it on stdin, which makes ``enable()`` a no-op.
+    """
+
+    def __init__(
+        self,
+        host,
+        username,
+        password,
+        port=None,
+        sudo_pwd=None,
+        timeout=60,
+        use_keys=False,
+        key_file=None,
+        allow_agent=False,
+        ssh_strict=False,
+        system_host_keys=False,
+        alt_host_keys=False,
+        alt_key_file="",
+        **kwargs
+    ):
+        self.host = host
+        self.timeout = timeout
+        self.sudo_pwd = sudo_pwd
+
+        self.client = paramiko.SSHClient()
+        if system_host_keys:
+            self.client.load_system_host_keys()
+        if alt_host_keys and alt_key_file:
+            self.client.load_host_keys(alt_key_file)
+        if ssh_strict:
+            self.client.set_missing_host_key_policy(paramiko.RejectPolicy())
+        else:
+            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        self.client.connect(
+            hostname=host,
+            port=port or 22,
+            username=username,
+            password=password,
+            look_for_keys=use_keys,
+            allow_agent=allow_agent,
+            key_filename=key_file,
+            timeout=timeout,
+        )
+        self.transport = self.client.get_transport()
+
+    def run(self, command, decode=True):
+        """Run `command`, returning its output, as bytes if `decode` is false, and status."""
+        output, status = exec_command(
+            self.transport, command, sudo_pwd=self.sudo_pwd, timeout=self.timeout, decode=decode
+        )
+        return output.rstrip("\n" if decode else b"\n"), status
+
+    def iter_command(self, command):
+        """Run `command`, yielding its output in chunks as it is read, and returning its status."""
+        return iter_exec_command(
+            self.transport, command, sudo_pwd=self.sudo_pwd, timeout=self.timeout
+        )
+
+    # Like netmiko's, these only return the output; the driver calls run() to check the
+    # exit status.
+    def send_command(self, command, *args, **kwargs):
+        return self.run(command)[0]
+
+    def send_command_timing(self, command, *args, **kwargs):
+        return self.run(command)[0]
+
+    def enable(self):
+        pass
+
+    def exit_enable_mode(self):
+        pass
+
+    def disconnect(self):
+        self.client.close()
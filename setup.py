@@ -34,4 +34,5 @@ setup(
     url="https://source.vivint.com/projects/POPS/repos/napalm-cumulus/browse",
     include_package_data=True,
     install_requires=reqs,
+    extras_require={"async": ["asyncssh"], "fast": ["orjson"]},
 )
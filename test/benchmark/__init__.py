@@ -0,0 +1,7 @@
+"""
+Scale benchmarks for the getters.
+
+Synthetic outputs at production scale are generated into a temporary directory laid out
+like ``test/unit/mocked_data``, then every getter runs against them through
+``PatchedCumulusDriver``. Run with ``python -m test.benchmark --help``.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from test.benchmark.bench import main
+
+sys.exit(main())
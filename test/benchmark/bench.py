@@ -0,0 +1,171 @@
+"""Run the getters against synthetic outputs and compare the results with stored baselines."""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from test.benchmark import fixtures, imports
+from test.unit.conftest import FakeCumulusDevice, PatchedCumulusDriver
+
+GETTERS = [
+    "get_interfaces",
+    "get_interfaces_ip",
+    "get_lldp_neighbors",
+    "get_bgp_neighbors",
+    "get_arp_table",
+]
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+class PreloadedDevice(FakeCumulusDevice):
+    """Fake device keeping the outputs in memory, so reading files doesn't count."""
+
+    def __init__(self, mocked_data_dir):
+        super(PreloadedDevice, self).__init__(mocked_data_dir)
+        self._outputs = {}
+
+    def _read_output(self, command):
+        key = (self.current_test, command)
+        if key not in self._outputs:
+            self._outputs[key] = super(PreloadedDevice, self)._read_output(command)
+        return self._outputs[key]
+
+
+def measure(directory, getter, repeat=3):
+    """
+    Time `getter` against the outputs in `directory` and trace its peak memory use.
+
+    Returns the best wall time of `repeat` runs in seconds, and the peak of the memory
+    allocated during one more run, in bytes.
+    """
+    driver = PatchedCumulusDriver("localhost", "user", "pass")
+    driver.device = PreloadedDevice(directory)
+    driver.device.current_test = "test_{}".format(getter)
+    driver.device.current_test_case = "normal"
+    method = getattr(driver, getter)
+
+    # Warm up, so outputs are loaded and per-session probes are done.
+    method()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        method()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        method()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "peak_bytes": peak}
+
+
+def run(getters=None, scale=1.0, repeat=3):
+    """Generate the synthetic outputs at `scale` and measure every getter."""
+    directory = tempfile.mkdtemp(prefix="napalm-cumulus-benchmark-")
+    try:
+        fixtures.write_fixtures(directory, scale)
+        return {getter: measure(directory, getter, repeat) for getter in getters or GETTERS}
+    finally:
+        shutil.rmtree(directory)
+
+
+def compare(results, baselines, tolerance=0.25):
+    """Return a description of every measure more than `tolerance` above its baseline."""
+    regressions = []
+    for getter, result in sorted(results.items()):
+        baseline = baselines.get(getter)
+        if baseline is None:
+            continue
+        for measure_name in ("seconds", "peak_bytes"):
+            if measure_name not in result or measure_name not in baseline:
+                continue
+            if result[measure_name] > baseline[measure_name] * (1 + tolerance):
+                regressions.append(
+                    "{} {}: {:.4g} against a baseline of {:.4g}".format(
+                        getter, measure_name, result[measure_name], baseline[measure_name]
+                    )
+                )
+    return regressions
+
+
+def _report(results, baselines):
+    header = ("benchmark", "time (ms)", "baseline", "peak (MiB)", "baseline")
+    print("{:<36}{:>12}{:>12}{:>12}{:>12}".format(*header))
+    for name, result in sorted(results.items()):
+        baseline = baselines.get(name, {})
+        row = [name]
+        for measure_name, unit in (("seconds", 1000), ("peak_bytes", 2.0 ** -20)):
+            for values in (result, baseline):
+                if measure_name in values:
+                    row.append("{:.1f}".format(values[measure_name] * unit))
+                else:
+                    row.append("-")
+        print("{:<36}{:>12}{:>12}{:>12}{:>12}".format(*row))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m test.benchmark",
+        description="Benchmark the getters against synthetic outputs at production scale.",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier of the fixture sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per getter")
+    parser.add_argument(
+        "--getter", action="append", choices=GETTERS, help="getter to run, all by default"
+    )
+    parser.add_argument(
+        "--imports",
+        action="store_true",
+        help="also time importing the package and building a driver",
+    )
+    parser.add_argument("--baselines", default=BASELINES, help="baselines file")
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the new baselines"
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="exit with status 1 if a result regressed beyond the tolerance",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed regression, 0.25 is 25%%"
+    )
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            stored = json.load(f)
+        if stored.get("scale") == args.scale:
+            baselines = stored["results"]
+        else:
+            print("Baselines were taken at scale {}, not comparing".format(stored.get("scale")))
+
+    results = run(args.getter, args.scale, args.repeat)
+    if args.imports:
+        results.update(imports.run(args.repeat))
+    _report(results, baselines)
+
+    if args.save:
+        saved = {"scale": args.scale, "results": dict(baselines, **results)}
+        with open(args.baselines, "w") as f:
+            json.dump(saved, f, indent=4, sort_keys=True)
+            f.write("\n")
+    if args.compare:
+        regressions = compare(results, baselines, args.tolerance)
+        for regression in regressions:
+            print("Regression: {}".format(regression))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
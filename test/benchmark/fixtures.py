@@ -0,0 +1,277 @@
+"""Generators of synthetic Cumulus command outputs at production scale."""
+import json
+import os
+from datetime import datetime, timedelta
+
+from napalm.base.test.double import BaseTestDouble
+
+from napalm_cumulus.utils import parsers
+
+# Number of objects generated for every getter at scale 1.
+SIZES = {
+    "interfaces": 1000,
+    "bgp_peers": 5000,
+    "bgp_vrfs": 50,
+    "arp_entries": 200000,
+}
+NOW = datetime(2020, 3, 5, 4, 17, 0)
+
+
+def _interface_names(count):
+    names = ["eth0", "lo", "bridge"]
+    port = 1
+    while len(names) < count:
+        names.append("swp{}".format(port))
+        port += 1
+    return names[:count]
+
+
+def _mac(index):
+    return "44:38:39:{:02x}:{:02x}:{:02x}".format(
+        (index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF
+    )
+
+
+def _ipv4(index, first_octet=10):
+    return "{}.{}.{}.{}".format(
+        first_octet, (index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF
+    )
+
+
+def net_show_interface_all(count):
+    """'net show interface all json' for `count` interfaces."""
+    output = {}
+    for index, name in enumerate(_interface_names(count)):
+        linkstate = ("UP", "DN", "ADMDN")[index % 3]
+        output[name] = {
+            "iface_obj": {
+                "counters": None,
+                "description": "uplink {}".format(index) if index % 2 else "",
+                "ip_addr_assign": 0,
+                "ip_address": {"allentries": ["{}/31".format(_ipv4(index * 2))]},
+                "ip_neighbor": {"allentries": {}},
+                "linkstate": 2,
+                "lldp": [
+                    {
+                        "adj_hostname": "spine{:02d}".format(index % 16),
+                        "adj_mgmt_ip4": _ipv4(index, 192),
+                        "adj_port": "swp{}".format(index % 64 + 1),
+                        "adj_ttl": 120,
+                        "system_descr": "Cumulus Linux version 3.7.12",
+                    }
+                ]
+                if index % 4 == 0
+                else None,
+                "mac": _mac(index),
+                "mtu": 9216,
+                "name": name,
+                "native_vlan": [],
+                "speed": None,
+                "vlan": None,
+                "vlan_filtering": False,
+                "vlan_list": {},
+                "vlan_tag": [],
+            },
+            "linkstate": linkstate,
+            "name": name,
+            "port_category": "NetworkPort",
+            "speed": "25G" if name.startswith("swp") else "1G",
+            "summary": ["Master: bond{}(UP)".format(index % 32)],
+            "type": "swp",
+        }
+    return output
+
+
+def vtysh_show_interface(count):
+    """"vtysh -c 'show interface'" for `count` interfaces."""
+    lines = []
+    for index, name in enumerate(_interface_names(count)):
+        last_up = NOW - timedelta(seconds=index * 37 + 5)
+        if index % 5 == 0:
+            up = "(never)"
+        else:
+            up = last_up.strftime("%Y/%m/%d %H:%M:%S.") + "{:02d}".format(index % 100)
+        down = (last_up - timedelta(hours=1)).strftime("%Y/%m/%d %H:%M:%S.00")
+        lines.extend(
+            [
+                "Interface {} is up, line protocol is up".format(name),
+                "  Link ups:       {}    last: {}".format(index % 7, up),
+                "  Link downs:     {}    last: {}".format(index % 5, down),
+                "  PTM status: disabled",
+                "  vrf: default",
+                "  index {} metric 0 mtu 9216 speed 25000 ".format(index + 2),
+                "  flags: <UP,BROADCAST,RUNNING,MULTICAST>",
+                "  Type: Ethernet",
+                "  HWaddr: {}".format(_mac(index)),
+                "  inet {}/31".format(_ipv4(index * 2)),
+                "  inet6 fe80::4638:39ff:fe{:02x}:{:02x}/64".format(
+                    (index >> 8) & 0xFF, index & 0xFF
+                ),
+                "  Interface Type Other",
+                "  protodown: off ",
+                "  Parent ifindex: 0",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def _vrf(index):
+    return "default" if index == 0 else "vrf{}".format(index)
+
+
+def bgp_summary(peers, vrfs=1):
+    """'show bgp vrf all summary json' for `peers` IPv4 unicast peers spread over `vrfs`."""
+    summary = {}
+    for vrf_index in range(vrfs):
+        vrf_peers = range(vrf_index, peers, vrfs)
+        summary[_vrf(vrf_index)] = {
+            "ipv4Unicast": {
+                "routerId": "10.255.255.1",
+                "as": 65000,
+                "vrfId": vrf_index,
+                "vrfName": _vrf(vrf_index),
+                "peerCount": len(vrf_peers),
+                "peers": {
+                    _ipv4(index, 172): {
+                        "hostname": "peer{}".format(index),
+                        "remoteAs": 64512 + index % 1000,
+                        "version": 4,
+                        "msgRcvd": 1000 + index,
+                        "msgSent": 2000 + index,
+                        "outq": 0,
+                        "inq": 0,
+                        "peerUptime": "01w2d03h",
+                        "peerUptimeMsec": 788400000,
+                        "prefixReceivedCount": index % 500,
+                        "pfxRcd": index % 500,
+                        "pfxSnt": index % 300,
+                        "state": "Established" if index % 10 else "Active",
+                        "idType": "ipv4",
+                    }
+                    for index in vrf_peers
+                },
+                "totalPeers": len(vrf_peers),
+                "dynamicPeers": 0,
+            }
+        }
+    return summary
+
+
+def _bgp_neighbor(index):
+    return {
+        "remoteAs": 64512 + index % 1000,
+        "localAs": 65000,
+        "nbrExternalLink": True,
+        "nbrDesc": "peer{}".format(index),
+        "hostname": "peer{}".format(index),
+        "bgpVersion": 4,
+        "remoteRouterId": _ipv4(index, 10),
+        "bgpState": "Established" if index % 10 else "Active",
+        "bgpTimerUpMsec": 788400000 + index,
+        "bgpTimerUpString": "01w2d03h",
+        "adminShutDown": index % 97 == 0,
+        "messageStats": {
+            "opensSent": 1,
+            "opensRecv": 1,
+            "updatesSent": index,
+            "updatesRecv": index,
+            "keepalivesSent": 26000,
+            "keepalivesRecv": 26000,
+        },
+        "addressFamilyInfo": {
+            "ipv4Unicast": {
+                "updateGroupId": index % 8,
+                "subGroupId": index % 8,
+                "packetQueueLength": 0,
+                "acceptedPrefixCounter": index % 500,
+            }
+        },
+        "connectionsEstablished": 1,
+        "connectionsDropped": 0,
+        "hostLocal": "172.31.255.254",
+        "hostForeign": _ipv4(index, 172),
+    }
+
+
+def bgp_neighbors(peers, vrfs=1):
+    """'show bgp vrf all neighbors json' for `peers` IPv4 unicast peers spread over `vrfs`."""
+    neighbors = {}
+    for vrf_index in range(vrfs):
+        vrf_neighbors = {"vrfId": vrf_index, "vrfName": _vrf(vrf_index)}
+        for index in range(vrf_index, peers, vrfs):
+            vrf_neighbors[_ipv4(index, 172)] = _bgp_neighbor(index)
+        neighbors[_vrf(vrf_index)] = vrf_neighbors
+    return neighbors
+
+
+def ip_neigh(entries):
+    """'ip -4 -s -j neigh show' for `entries` neighbors, one per line."""
+    lines = []
+    for index in range(entries):
+        neighbor = {
+            "dst": _ipv4(index),
+            "dev": "vlan{}".format(index % 4000 + 1),
+            "used": index % 300,
+            "confirmed": index % 200,
+            "updated": index % 100,
+            "probes": 1,
+            "state": ["REACHABLE"],
+        }
+        if index % 50:
+            neighbor["lladdr"] = _mac(index)
+        else:
+            neighbor["state"] = ["FAILED"]
+        lines.append(json.dumps(neighbor, separators=(",", ":")))
+    return "[" + ",\n".join(lines) + "]"
+
+
+def _write(directory, test, command, output):
+    path = os.path.join(directory, test, "normal")
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    filename = "{}.json".format(BaseTestDouble.sanitize_text(command))
+    with open(os.path.join(path, filename), "w") as f:
+        if isinstance(output, str):
+            f.write(output)
+        else:
+            json.dump(output, f)
+
+
+def write_fixtures(directory, scale=1.0):
+    """
+    Write the synthetic outputs to `directory`, laid out like ``test/unit/mocked_data``.
+
+    `scale` multiplies the sizes in SIZES. Returns the sizes used.
+    """
+    sizes = {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+
+    interfaces = net_show_interface_all(sizes["interfaces"])
+    for test in ("test_get_interfaces", "test_get_interfaces_ip", "test_get_lldp_neighbors"):
+        _write(directory, test, "net show interface all json", interfaces)
+    date_command = "date '+{}'".format(parsers.DATE_FORMAT)
+    _write(directory, "test_get_interfaces", date_command, NOW.strftime(parsers.DATE_FORMAT))
+    _write(directory, "test_get_interfaces", "sudo vtysh -c 'show version'", "FRRouting 7.0+cl4u1")
+    _write(
+        directory,
+        "test_get_interfaces",
+        "sudo vtysh -c 'show interface'",
+        vtysh_show_interface(sizes["interfaces"]),
+    )
+
+    peers, vrfs = sizes["bgp_peers"], sizes["bgp_vrfs"]
+    _write(
+        directory,
+        "test_get_bgp_neighbors",
+        parsers.BGP_SUMMARY_COMMAND,
+        bgp_summary(peers, vrfs),
+    )
+    _write(
+        directory,
+        "test_get_bgp_neighbors",
+        parsers.BGP_NEIGHBORS_COMMAND,
+        bgp_neighbors(peers, vrfs),
+    )
+
+    entries = sizes["arp_entries"]
+    _write(directory, "test_get_arp_table", "ip -4 -s -j neigh show", ip_neigh(entries))
+    return sizes
@@ -0,0 +1,35 @@
+"""Import time of the package, measured in fresh interpreters."""
+import subprocess
+import sys
+
+STATEMENTS = {
+    "import napalm_cumulus": "import napalm_cumulus",
+    "import napalm_cumulus.utils.parsers": "import napalm_cumulus.utils.parsers",
+    "import CumulusDriver": "from napalm_cumulus import CumulusDriver",
+    "construct CumulusDriver": (
+        "from napalm_cumulus import CumulusDriver\n"
+        "CumulusDriver('leaf01', 'cumulus', 'CumulusLinux!')"
+    ),
+}
+_TIMER = """\
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(statement, repeat=5):
+    """Return the best wall time of `statement` over `repeat` fresh interpreters."""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", _TIMER.format(statement)])
+        timings.append(float(output.decode().strip().splitlines()[-1]))
+    return min(timings)
+
+
+def run(repeat=5):
+    """Measure every statement of STATEMENTS, in the format of the getter benchmarks."""
+    return {
+        name: {"seconds": measure(statement, repeat)} for name, statement in STATEMENTS.items()
+    }
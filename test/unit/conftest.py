@@ -1,14 +1,16 @@
 """Test fixtures."""
+import os
 from builtins import super
 
 import pytest
-import json
 from napalm.base.test import conftest as parent_conftest
 
-from napalm.base.test.double import BaseTestDouble
-
 from napalm_cumulus import cumulus
 
+from test.unit.mock import MockedCumulusDevice
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
 
 @pytest.fixture(scope="class")
 def set_device_parameters(request):
@@ -25,6 +27,29 @@ def set_device_parameters(request):
     parent_conftest.set_device_parameters(request)
 
 
+@pytest.fixture
+def mocked_data():
+    """Return a function joining its arguments to the mocked data directory."""
+
+    def _path(*parts):
+        return os.path.join(MOCKED_DATA, *parts)
+
+    return _path
+
+
+@pytest.fixture
+def mocked_driver():
+    """Return a function building a patched driver answering from one test case."""
+
+    def _driver(test=None, test_case="normal", optional_args=None):
+        driver = PatchedCumulusDriver("localhost", "user", "pass", optional_args=optional_args)
+        driver.device.current_test = test
+        driver.device.current_test_case = test_case
+        return driver
+
+    return _driver
+
+
 def pytest_generate_tests(metafunc):
     """Generate test cases dynamically."""
     parent_conftest.pytest_generate_tests(metafunc, __file__)
@@ -50,38 +75,5 @@ class PatchedCumulusDriver(cumulus.CumulusDriver):
         pass
 
 
-class FakeCumulusDevice(BaseTestDouble):
+class FakeCumulusDevice(MockedCumulusDevice):
     """Cumulus device test double."""
-
-    # The following three functions are not needed for testing, but are still called
-    # so override them so tests pass
-    def disconnect(self):
-        pass
-
-    def enable(self):
-        pass
-
-    def exit_enable_mode(self):
-        pass
-
-    def send_command(self, command):
-        """Fake send_command."""
-        filename = "{}.json".format(self.sanitize_text(command))
-        full_path = self.find_file(filename)
-
-        if "json" in command:
-            result = json.dumps(self.read_json_file(full_path))
-        else:
-            result = self.read_txt_file(full_path)
-        return result
-
-    def send_command_timing(self, command):
-        """Fake send_command."""
-        filename = "{}.json".format(self.sanitize_text(command))
-        full_path = self.find_file(filename)
-
-        if "json" in command:
-            result = json.dumps(self.read_json_file(full_path))
-        else:
-            result = self.read_txt_file(full_path)
-        return result
@@ -0,0 +1,107 @@
+"""In-process HTTP stand-in for the NVUE REST API, answering from mocked data."""
+import base64
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from test.unit.mock import MockedCumulusDevice
+
+USERNAME = "cumulus"
+PASSWORD = "cumulus"
+API_ROOT = "/nvue_v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        credentials = base64.b64encode("{}:{}".format(USERNAME, PASSWORD).encode()).decode()
+        if self.headers.get("Authorization") != "Basic " + credentials:
+            self._reply(401)
+            return
+        url = urlsplit(self.path)
+        if not url.path.startswith(API_ROOT):
+            self._reply(404)
+            return
+        resource = url.path[len(API_ROOT):]
+        with stand_in.lock:
+            stand_in.requests.append((resource, parse_qs(url.query)))
+            stand_in.connections.add(self.client_address)
+            stand_in.in_flight += 1
+            stand_in.max_in_flight = max(stand_in.max_in_flight, stand_in.in_flight)
+        try:
+            if stand_in.delay:
+                time.sleep(stand_in.delay)
+            try:
+                path = stand_in.device.find_file(
+                    "{}.json".format(stand_in.device.sanitize_text(resource))
+                )
+            except IOError:
+                self._reply(404)
+                return
+            with open(path, "rb") as f:
+                self._reply(200, f.read())
+        finally:
+            with stand_in.lock:
+                stand_in.in_flight -= 1
+
+
+class StandInNvueServer(object):
+    """
+    HTTP/1.1 keep-alive server run in a background thread.
+
+    Every resource is answered with the file named after it, as `MockedCumulusDevice`
+    names command outputs, in `mocked_data_dir/<test>/<test_case>`. `requests` lists the
+    (resource, query) pairs received, `connections` the client addresses they came from
+    and `max_in_flight` the most requests ever handled at once, each taking `delay`
+    seconds.
+    """
+
+    def __init__(self, mocked_data_dir, test, test_case="normal", delay=0):
+        self.device = MockedCumulusDevice(os.path.abspath(mocked_data_dir))
+        self.device.current_test = test
+        self.device.current_test_case = test_case
+        self.delay = delay
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.port = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
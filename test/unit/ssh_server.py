@@ -0,0 +1,117 @@
+"""In-process SSH stand-in server answering exec requests from mocked data."""
+import asyncio
+import shlex
+import threading
+
+import asyncssh
+
+from test.unit.mock import MockedCumulusDevice
+
+USERNAME = "cumulus"
+PASSWORD = "cumulus"
+SUDO_PREFIX = "sudo -S -p '' "
+SUDO_NONINTERACTIVE_PREFIX = "sudo -n "
+
+
+class _Server(asyncssh.SSHServer):
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return (username, password) == (USERNAME, PASSWORD)
+
+
+class StandInSSHServer(object):
+    """
+    SSH server run on its own event loop in a background thread.
+
+    Exec requests are answered by a `MockedCumulusDevice` reading `mocked_data_dir`, and
+    every command received is appended to `commands`. Commands run through 'sudo -S' and
+    scripts run through 'sh -c' are unwrapped first, as the switch would; 'sudo -n' fails
+    as it would without a NOPASSWD rule. Each answer
+    takes `delay` seconds; `max_in_flight` is the most commands ever run at once.
+    """
+
+    def __init__(self, mocked_data_dir, delay=0):
+        self.device = MockedCumulusDevice(mocked_data_dir)
+        self.commands = []
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.port = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    def start(self):
+        started = threading.Event()
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncssh.create_server(
+                    _Server,
+                    "127.0.0.1",
+                    0,
+                    server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+                    process_factory=self._handle,
+                )
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self):
+        async def _close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _handle(self, process):
+        command = process.command
+        self.commands.append(command)
+        if command.startswith(SUDO_NONINTERACTIVE_PREFIX):
+            process.stdout.write("sudo: a password is required\n")
+            process.exit(1)
+            return
+        if command.startswith(SUDO_PREFIX):
+            # Like sudo, read up to three passwords from stdin before running the command.
+            for attempt in range(3):
+                password = await process.stdin.readline()
+                if password.rstrip("\n") == PASSWORD or not password:
+                    break
+            if password.rstrip("\n") != PASSWORD:
+                process.stdout.write("sudo: {} incorrect password attempt\n".format(attempt + 1))
+                process.exit(1)
+                return
+            command = "sudo " + command[len(SUDO_PREFIX):]
+        if command.startswith("sudo sh -c "):
+            command = shlex.split(command)[3]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            process.stdout.write(self.device.send_command(command) + "\n")
+            process.exit(0)
+        except IOError:
+            process.stdout.write("{}: command not found\n".format(command))
+            process.exit(127)
+        finally:
+            self.in_flight -= 1
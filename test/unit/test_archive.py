@@ -0,0 +1,127 @@
+"""Tests for session recording and replay."""
+import json
+import os
+import shlex
+import zipfile
+
+import pytest
+
+from napalm_cumulus import cumulus
+from napalm_cumulus.utils import batch
+from napalm_cumulus.utils.archive import ArchiveDevice, RecordingDevice, SessionRecorder
+
+from test.unit.conftest import FakeCumulusDevice
+
+GETTERS = ["get_facts", "get_environment", "get_bgp_neighbors", "get_mac_address_table"]
+
+
+class RecordedCumulusDriver(cumulus.CumulusDriver):
+    """Driver connecting to the mocked outputs of one getter test."""
+
+    def __init__(self, test, *args, **kwargs):
+        super(RecordedCumulusDriver, self).__init__(*args, **kwargs)
+        self.test = test
+
+    def _connect(self):
+        device = FakeCumulusDevice()
+        device.current_test = "test_" + self.test
+        device.current_test_case = "normal"
+        return device
+
+
+@pytest.mark.parametrize("getter", GETTERS)
+def test_replay_recorded_session(tmp_path, getter, mocked_data):
+    path = str(tmp_path / "leaf01.zip")
+    recording = RecordedCumulusDriver(
+        getter, "leaf01", "user", "pass", optional_args={"record_archive": path}
+    )
+    recording.open()
+    recorded = getattr(recording, getter)()
+    recording.close()
+    assert not isinstance(recording.device, RecordingDevice)
+    assert zipfile.ZipFile(path).testzip() is None
+
+    replay = cumulus.CumulusDriver(
+        "leaf01", "user", "pass", optional_args={"transport": "replay", "replay_archive": path}
+    )
+    replay.open()
+    assert replay.is_alive() == {"is_alive": True}
+    result = getattr(replay, getter)()
+    replay.close()
+    assert result == recorded
+    with open(mocked_data("test_" + getter, "normal", "expected_result.json")) as f:
+        assert result == json.load(f)
+
+
+def test_replay_privileged_commands_as_recorded(tmp_path):
+    path = str(tmp_path / "leaf01.zip")
+    recording = RecordedCumulusDriver(
+        "get_environment", "leaf01", "user", "pass", optional_args={"record_archive": path}
+    )
+    recording.open()
+    recorded = recording.get_environment()
+    recording.close()
+
+    replay = cumulus.CumulusDriver(
+        "leaf01",
+        "user",
+        "pass",
+        optional_args={
+            "transport": "replay",
+            "replay_archive": path,
+            "privilege_mode": "sudo_noninteractive",
+        },
+    )
+    replay.open()
+    assert replay.get_environment() == recorded
+    replay.close()
+
+    device = ArchiveDevice(path)
+    marker = batch.new_marker()
+    script = batch.build_batch_script(["sudo smonctl --json"], marker)
+    output = device.send_command("sudo sh -c " + shlex.quote(script))
+    result = batch.parse_batch_output(output, ["sudo smonctl --json"], marker)
+    assert json.loads(result["sudo smonctl --json"]["output"])
+    device.disconnect()
+
+
+def test_batch_commands_recorded_one_by_one(tmp_path):
+    path = str(tmp_path / "leaf01.zip")
+    recording = RecordedCumulusDriver(
+        "get_environment", "leaf01", "user", "pass", optional_args={"record_archive": path}
+    )
+    recording.open()
+    recording.get_environment()
+    recording.close()
+
+    device = ArchiveDevice(path)
+    assert device.archive.host == "leaf01"
+    assert sorted(device.archive.commands) == ["free", "sudo smonctl --json"]
+    marker = batch.new_marker()
+    output = device.send_command(batch.build_batch_script(["free"], marker))
+    assert batch.parse_batch_output(output, ["free"], marker)["free"]["status"] == 0
+    device.disconnect()
+
+
+def test_runs_replayed_in_order(tmp_path):
+    path = str(tmp_path / "leaf01.zip")
+    recorder = SessionRecorder(path, "leaf01")
+    recorder.record("date", "first")
+    recorder.record("date", "second")
+    recorder.record("false", "", 1)
+    recorder.close()
+    assert os.listdir(str(tmp_path)) == ["leaf01.zip"]
+
+    device = ArchiveDevice(path)
+    assert [device.send_command("date") for _ in range(3)] == ["first", "second", "second"]
+    marker = batch.new_marker()
+    output = device.send_command(batch.build_batch_script(["false"], marker))
+    assert batch.parse_batch_output(output, ["false"], marker)["false"]["status"] == 1
+    with pytest.raises(IOError):
+        device.send_command("uptime")
+    device.disconnect()
+
+
+def test_replay_needs_an_archive():
+    with pytest.raises(ValueError):
+        cumulus.CumulusDriver("leaf01", "user", "pass", optional_args={"transport": "replay"})
@@ -0,0 +1,113 @@
+"""Tests for the asyncio driver, run against an in-process SSH stand-in server."""
+import asyncio
+import json
+import os
+
+import pytest
+from napalm.base.exceptions import CommandErrorException
+from napalm.base.test.getters import dict_diff, list_dicts_diff
+
+from napalm_cumulus.async_cumulus import AsyncCumulusDriver
+from napalm_cumulus.utils import parsers
+
+pytest.importorskip("asyncssh")
+from test.unit.ssh_server import PASSWORD, USERNAME, StandInSSHServer  # noqa: E402
+
+
+async def _run_getter(port, getter):
+    driver = AsyncCumulusDriver("127.0.0.1", USERNAME, PASSWORD, optional_args={"port": port})
+    async with driver:
+        assert (await driver.is_alive())["is_alive"]
+        return await getattr(driver, getter)()
+
+
+@pytest.mark.parametrize(
+    "getter,test_case",
+    [
+        ("get_facts", "normal"),
+        ("get_interfaces", "normal"),
+        ("get_interfaces_ip", "normal"),
+        ("get_lldp_neighbors", "normal"),
+        ("get_bgp_neighbors", "pfx_snt"),
+        ("get_environment", "normal"),
+        ("get_environment", "failed_psu"),
+        ("get_snmp_information", "normal"),
+        ("get_ntp_stats", "normal"),
+        ("get_arp_table", "normal"),
+        ("get_ipv6_neighbors_table", "normal"),
+        ("get_mac_address_table", "normal"),
+        ("get_interfaces_counters", "normal"),
+    ],
+)
+def test_async_getters_match_sync_results(getter, test_case, mocked_data):
+    capture = mocked_data("test_{}".format(getter), test_case)
+    with StandInSSHServer(capture) as server:
+        result = asyncio.run(_run_getter(server.port, getter))
+
+    with open(os.path.join(capture, "expected_result.json")) as f:
+        expected = json.load(f)
+    result = json.loads(json.dumps(result))
+    if isinstance(result, list):
+        assert not list_dicts_diff(result, expected)
+    else:
+        assert not dict_diff(result, expected)
+
+
+def test_async_get_route_to(mocked_data):
+    async def _get_route_to(port):
+        driver = AsyncCumulusDriver("127.0.0.1", USERNAME, PASSWORD, optional_args={"port": port})
+        async with driver:
+            return await driver.get_route_to("1.0.4.0/24", protocol="bgp")
+
+    capture = mocked_data("test_get_route_to", "normal")
+    with StandInSSHServer(capture) as server:
+        result = asyncio.run(_get_route_to(server.port))
+
+    with open(os.path.join(capture, "expected_result.json")) as f:
+        assert not dict_diff(json.loads(json.dumps(result)), json.load(f))
+
+
+def test_async_command_failure_raises(mocked_data):
+    async def _get_bgp_neighbors(port):
+        driver = AsyncCumulusDriver(
+            "127.0.0.1", USERNAME, PASSWORD, optional_args={"port": port, "command_cache": True}
+        )
+        async with driver:
+            with pytest.raises(CommandErrorException, match="exit status 127"):
+                await driver.get_bgp_neighbors()
+            return driver.command_cache
+
+    # The BGP outputs are missing from the get_facts capture.
+    capture = mocked_data("test_get_facts", "normal")
+    with StandInSSHServer(capture) as server:
+        command_cache = asyncio.run(_get_bgp_neighbors(server.port))
+    assert command_cache.get(parsers.BGP_SUMMARY_COMMAND) is None
+
+
+def test_async_wrong_sudo_password_raises(mocked_data):
+    async def _get_environment(port):
+        driver = AsyncCumulusDriver(
+            "127.0.0.1", USERNAME, PASSWORD, optional_args={"port": port, "sudo_pwd": "wrong"}
+        )
+        async with driver:
+            await driver.get_environment()
+
+    capture = mocked_data("test_get_environment", "normal")
+    with StandInSSHServer(capture) as server:
+        with pytest.raises(CommandErrorException, match="incorrect password"):
+            asyncio.run(_get_environment(server.port))
+
+
+def test_async_sudo_without_password_runs_noninteractive(mocked_data):
+    async def _get_environment(port):
+        driver = AsyncCumulusDriver(
+            "127.0.0.1", USERNAME, PASSWORD, optional_args={"port": port, "sudo_pwd": None}
+        )
+        async with driver:
+            await driver.get_environment()
+
+    capture = mocked_data("test_get_environment", "normal")
+    with StandInSSHServer(capture) as server:
+        with pytest.raises(CommandErrorException, match="a password is required"):
+            asyncio.run(_get_environment(server.port))
+    assert "sudo -n smonctl --json" in server.commands
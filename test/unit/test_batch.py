@@ -0,0 +1,65 @@
+"""Tests for batched command execution."""
+import subprocess
+
+from napalm_cumulus.utils import batch
+
+
+def test_batch_script_round_trip_through_shell():
+    marker = batch.new_marker()
+    commands = ["echo one", "printf two", "false", "echo three; echo four"]
+    script = batch.build_batch_script(commands, marker)
+    # Interactive shells echo the command line before its output.
+    output = script + "\n" + subprocess.check_output(["sh", "-c", script]).decode()
+
+    results = batch.parse_batch_output(output, commands, marker)
+    assert results == {
+        "echo one": {"output": "one", "status": 0},
+        "printf two": {"output": "two", "status": 0},
+        "false": {"output": "", "status": 1},
+        "echo three; echo four": {"output": "three\nfour", "status": 0},
+    }
+
+
+def test_batch_commands_isolated_from_each_other():
+    marker = batch.new_marker()
+    commands = [
+        "echo one # comment",
+        "echo 'unbalanced",
+        "true &",
+        "cat <<EOF\nheredoc\nEOF",
+        "echo two",
+    ]
+    script = batch.build_batch_script(commands, marker)
+    output = subprocess.run(["sh", "-c", script], stdout=subprocess.PIPE).stdout.decode()
+
+    results = batch.parse_batch_output(output, commands, marker)
+    assert list(results) == commands
+    assert results["echo one # comment"] == {"output": "one", "status": 0}
+    assert results["echo 'unbalanced"]["status"] != 0
+    assert results["cat <<EOF\nheredoc\nEOF"] == {"output": "heredoc", "status": 0}
+    assert results["echo two"] == {"output": "two", "status": 0}
+    assert batch.split_batch_script(script) == (marker, commands)
+
+
+def test_split_batch_script():
+    commands = ["net show system json", "sudo vtysh -c 'show version'"]
+    script = batch.build_batch_script(commands, "MARKER")
+    assert batch.split_batch_script(script) == ("MARKER", commands)
+    assert batch.split_batch_script("net show system json") is None
+
+
+def test_cli_uses_a_single_round_trip(mocked_driver):
+    driver = mocked_driver("test_get_environment")
+    sent = []
+    send_command = driver.device.send_command
+
+    def _send_command(command):
+        sent.append(command)
+        return send_command(command)
+
+    driver.device.send_command = _send_command
+    output = driver.cli(["free", "sudo smonctl --json"])
+    assert list(output) == ["free", "sudo smonctl --json"]
+    assert output["free"].startswith("              total")
+    assert len(sent) == 1
+    assert batch.split_batch_script(sent[0])[1] == ["free", "sudo smonctl --json"]
@@ -0,0 +1,32 @@
+"""Smoke tests keeping the benchmark fixtures in line with the getters."""
+from test.benchmark import bench, fixtures
+
+
+def test_synthetic_outputs_parse(tmpdir, mocked_driver):
+    sizes = fixtures.write_fixtures(str(tmpdir), scale=0.005)
+    driver = mocked_driver()
+    driver.device = bench.PreloadedDevice(str(tmpdir))
+    driver.device.current_test_case = "normal"
+
+    driver.device.current_test = "test_get_interfaces"
+    interfaces = driver.get_interfaces()
+    assert len(interfaces) == sizes["interfaces"]
+    assert interfaces["swp1"]["last_flapped"] == float(3 * 37 + 5 - 1)
+
+    driver.device.current_test = "test_get_bgp_neighbors"
+    bgp_neighbors = driver.get_bgp_neighbors()
+    assert len(bgp_neighbors) == sizes["bgp_vrfs"]
+    assert sum(len(vrf["peers"]) for vrf in bgp_neighbors.values()) == sizes["bgp_peers"]
+
+    driver.device.current_test = "test_get_arp_table"
+    arp_table = driver.get_arp_table()
+    assert len(arp_table) == sizes["arp_entries"]
+    assert arp_table[0]["mac"] == "00:00:00:00:00:00"
+
+
+def test_compare_reports_regressions():
+    baselines = {"get_facts": {"seconds": 1.0, "peak_bytes": 1000}}
+    results = {"get_facts": {"seconds": 1.2, "peak_bytes": 2000}}
+    assert bench.compare(results, baselines, tolerance=0.25) == [
+        "get_facts peak_bytes: 2000 against a baseline of 1000"
+    ]
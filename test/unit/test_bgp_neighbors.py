@@ -0,0 +1,64 @@
+"""Tests for the get_bgp_neighbors VRFs and sent prefix lookups."""
+from napalm_cumulus.utils import parsers
+
+
+def _sent_prefixes(bgp_neighbors):
+    peers = bgp_neighbors["global"]["peers"]
+    return {
+        peer: [af["sent_prefixes"] for af in data["address_family"].values()]
+        for peer, data in peers.items()
+    }
+
+
+def test_sent_prefixes_from_summary(mocked_driver):
+    bgp_neighbors = mocked_driver("test_get_bgp_neighbors", "pfx_snt").get_bgp_neighbors()
+    assert _sent_prefixes(bgp_neighbors) == {"1.1.1.2": [3], "2012:1:1:1::2": [4]}
+
+
+def test_sent_prefixes_missing_without_fallback(mocked_driver):
+    bgp_neighbors = mocked_driver("test_get_bgp_neighbors").get_bgp_neighbors()
+    assert _sent_prefixes(bgp_neighbors) == {"1.1.1.2": [-1], "2012:1:1:1::2": [-1]}
+
+
+def test_sent_prefixes_advertised_routes_fallback(mocked_driver):
+    driver = mocked_driver(
+        "test_get_bgp_neighbors", optional_args={"bgp_advertised_routes_fallback": True}
+    )
+    bgp_neighbors = driver.get_bgp_neighbors()
+    assert _sent_prefixes(bgp_neighbors) == {"1.1.1.2": [3], "2012:1:1:1::2": [4]}
+
+
+def test_vrfs_from_all_vrf_outputs(mocked_driver):
+    driver = mocked_driver("test_get_bgp_neighbors", "pfx_snt")
+    commands = []
+    send_command = driver.device.send_command
+
+    def _send_command(command):
+        commands.append(command)
+        return send_command(command)
+
+    driver.device.send_command = _send_command
+    bgp_neighbors = driver.get_bgp_neighbors()
+    assert sorted(bgp_neighbors) == ["BLUE", "global"]
+    assert bgp_neighbors["BLUE"]["router_id"] == "10.10.20.1"
+    assert bgp_neighbors["BLUE"]["peers"]["swp10"]["address_family"]["ipv4"] == {
+        "received_prefixes": 5,
+        "sent_prefixes": 7,
+        "accepted_prefixes": 5,
+    }
+    assert len([c for c in commands if "vtysh" in c]) == 2
+
+
+def test_address_family_names():
+    assert parsers._bgp_afi("ipv4Unicast") == "ipv4 unicast"
+    assert parsers._bgp_afi("IPv6 Unicast") == "ipv6 unicast"
+    assert parsers._bgp_afi("ipv4 unicast") == "ipv4 unicast"
+
+
+def test_vrfs_without_supported_afi_left_out():
+    summary = {
+        "default": {"ipv4Unicast": {"routerId": "10.0.0.1", "as": 65001, "peers": {}}},
+        "TENANT": {"l2VpnEvpn": {"routerId": "10.0.0.1", "as": 65001, "peers": {}}},
+    }
+    bgp_neighbors = parsers.parse_bgp_neighbors(summary, {"default": {}, "TENANT": {}})
+    assert bgp_neighbors == {"global": {"router_id": "10.0.0.1", "peers": {}}}
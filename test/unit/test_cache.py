@@ -0,0 +1,57 @@
+"""Tests for the command output cache."""
+import time
+
+from napalm_cumulus.utils.cache import CommandCache
+
+
+class CountingDevice(object):
+    """Device stub counting the commands it receives."""
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.sent = []
+
+    def send_command(self, command):
+        self.sent.append(command)
+        return self.outputs[command]
+
+
+def test_cache_lru_eviction():
+    cache = CommandCache(ttl=None, maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_cache_ttl_expiry():
+    cache = CommandCache(ttl=0.01, maxsize=2)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_cache_disabled_by_default(mocked_driver):
+    driver = mocked_driver()
+    driver.device = CountingDevice({"net show system json": "{}"})
+    driver._send_json_command("net show system json")
+    driver._send_json_command("net show system json")
+    assert len(driver.device.sent) == 2
+
+
+def test_cache_shared_and_invalidated_on_config_change(mocked_driver):
+    driver = mocked_driver(optional_args={"command_cache": True})
+    driver.device = CountingDevice(
+        {"net show interface all json": "{}", "net add hostname leaf01": "", "net abort": ""}
+    )
+    driver.get_interfaces_ip()
+    driver.get_lldp_neighbors()
+    assert driver.device.sent == ["net show interface all json"]
+
+    driver.load_merge_candidate(config="net add hostname leaf01")
+    driver.discard_config()
+    driver.get_interfaces_ip()
+    assert driver.device.sent.count("net show interface all json") == 2
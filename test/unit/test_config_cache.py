@@ -0,0 +1,136 @@
+"""Tests for the change-aware get_config."""
+import base64
+import gzip
+import os
+
+import pytest
+from napalm.base.exceptions import CommandErrorException
+
+from napalm_cumulus.utils import config_cache
+from napalm_cumulus.utils.config_cache import ConfigCache
+
+from test.unit.mock import MockedCumulusDevice
+
+FINGERPRINT = config_cache.fingerprint_command()
+COMPRESSED = config_cache.compressed_command("net show configuration")
+
+
+class ScriptedDevice(MockedCumulusDevice):
+    """
+    Device double answering from a dict, logging the commands it runs.
+
+    Outputs are strings, or (output, status) pairs for failing commands.
+    """
+
+    def __init__(self, outputs):
+        super(ScriptedDevice, self).__init__()
+        self.outputs = outputs
+        self.commands = []
+
+    def _read_result(self, command):
+        self.commands.append(command)
+        result = self.outputs[command]
+        return result if isinstance(result, tuple) else (result, 0)
+
+
+@pytest.fixture
+def running(mocked_data):
+    with open(mocked_data("test_get_config", "normal", "net_show_configuration.json")) as f:
+        return f.read()
+
+
+def _compressed(text):
+    return base64.b64encode(gzip.compress(text.encode("utf-8"))).decode("ascii")
+
+
+def _scripted(driver, outputs):
+    driver.device = ScriptedDevice(outputs)
+    return driver
+
+
+def test_unchanged_config_served_from_cache(tmp_path, running, mocked_driver):
+    outputs = {
+        FINGERPRINT: "0123456789abcdef0123456789abcdef  -",
+        COMPRESSED: _compressed(running + "\n"),
+    }
+    driver = _scripted(mocked_driver(optional_args={"config_cache": str(tmp_path)}), outputs)
+    assert driver.get_config(retrieve="running")["running"] == running.rstrip("\n")
+    assert driver.device.commands == [FINGERPRINT, COMPRESSED]
+
+    # Another driver, e.g. the next backup run, shares the directory.
+    driver = _scripted(mocked_driver(optional_args={"config_cache": str(tmp_path)}), outputs)
+    assert driver.get_config(retrieve="running")["running"] == running.rstrip("\n")
+    assert driver.device.commands == [FINGERPRINT]
+
+    outputs[FINGERPRINT] = "fedcba9876543210fedcba9876543210  -"
+    outputs[COMPRESSED] = _compressed("hostname leaf02\n")
+    assert driver.get_config(retrieve="running")["running"] == "hostname leaf02"
+    assert driver.device.commands == [FINGERPRINT, FINGERPRINT, COMPRESSED]
+
+
+def test_fallbacks(tmp_path, mocked_driver):
+    outputs = {
+        FINGERPRINT: "md5sum: command not found",
+        COMPRESSED: ("bash: gzip: command not found", 127),
+        "net show configuration": "hostname leaf01",
+    }
+    cache = ConfigCache(str(tmp_path))
+    driver = _scripted(mocked_driver(optional_args={"config_cache": cache}), outputs)
+    for _ in range(2):
+        assert driver.get_config(retrieve="running")["running"] == "hostname leaf01"
+    assert len(driver.config_cache) == 0
+    assert driver.device.commands == [FINGERPRINT, COMPRESSED, "net show configuration"] * 2
+
+
+def test_failed_config_not_cached(tmp_path, mocked_driver):
+    outputs = {
+        FINGERPRINT: "0123456789abcdef0123456789abcdef  -",
+        COMPRESSED: (_compressed("ERROR: netd is not running\n"), 1),
+        "net show configuration": ("ERROR: netd is not running", 1),
+    }
+    cache = ConfigCache(str(tmp_path))
+    driver = _scripted(mocked_driver(optional_args={"config_cache": cache}), outputs)
+    with pytest.raises(CommandErrorException, match="netd is not running"):
+        driver.get_config(retrieve="running")
+    assert len(cache) == 0
+
+
+def test_cache_bounded_least_recently_used_first(tmp_path):
+    cache = ConfigCache(str(tmp_path), max_bytes=1)
+    cache.set("leaf01", "a" * 32, "hostname leaf01")
+    cache.set("leaf02", "b" * 32, "hostname leaf02")
+    assert len(cache) == 0
+
+    cache.max_bytes = 10 ** 6
+    for i, host in enumerate(["leaf01", "leaf02", "leaf03"]):
+        cache.set(host, "a" * 32, "hostname " + host)
+        os.utime(cache._path(host), (i, i))
+    assert cache.get("leaf01", "a" * 32) == "hostname leaf01"
+    sizes = sorted(os.path.getsize(cache._path(h)) for h in ("leaf01", "leaf02", "leaf03"))
+    cache.max_bytes = sizes[-1] + sizes[-2]
+    cache._evict()
+    assert cache.get("leaf02", "a" * 32) is None
+    assert cache.get("leaf01", "a" * 32) == "hostname leaf01"
+    assert cache.get("leaf01", "b" * 32) is None
+    cache.invalidate("leaf01")
+    assert cache.get("leaf01", "a" * 32) is None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        ("d41d8cd98f00b204e9800998ecf8427e  -\n", "d41d8cd98f00b204e9800998ecf8427e"),
+        ("sudo: a password is required", None),
+    ],
+)
+def test_parse_fingerprint(output, expected):
+    assert config_cache.parse_fingerprint(output) == expected
+
+
+def test_decompress_line_wrapped_output():
+    output = _compressed("hostname leaf01\n")
+    wrapped = "\r\n".join(output[i:i + 10] for i in range(0, len(output), 10))
+    assert config_cache.decompress(wrapped) == "hostname leaf01\n"
+    assert config_cache.decompress("not base64!") is None
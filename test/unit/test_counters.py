@@ -0,0 +1,94 @@
+"""Tests for the interface counters getter and polling mode."""
+import json
+
+import pytest
+
+from napalm_cumulus import cumulus
+from napalm_cumulus.utils import parsers
+from napalm_cumulus.utils.counters import COUNTERS, CounterHistory
+
+
+def _counters(**values):
+    counters = dict.fromkeys(COUNTERS, 0)
+    counters.update(values)
+    return counters
+
+
+def _link(name, rx_bytes, tx_bytes):
+    return {
+        "ifname": name,
+        "stats64": {
+            "rx": {"bytes": rx_bytes, "packets": 10, "errors": 0, "dropped": 0, "multicast": 1},
+            "tx": {"bytes": tx_bytes, "packets": 20, "errors": 0, "dropped": 0},
+        },
+    }
+
+
+def test_history_rates_and_ring_buffer():
+    history = CounterHistory(size=3)
+    for second in range(5):
+        history.append(float(second), {"swp1": _counters(rx_octets=second * 1000)})
+    assert len(history) == 3
+    rates = history.rates("swp1")
+    assert [timestamp for timestamp, _ in rates] == [3.0, 4.0]
+    assert all(rate["rx_octets"] == 1000.0 for _, rate in rates)
+    assert history.rates("swp1", samples=1) == rates[1:]
+
+
+def test_history_marks_resets_and_missing_interfaces():
+    history = CounterHistory(size=4)
+    history.append(0.0, {"swp1": _counters(rx_octets=5000), "swp2": _counters()})
+    history.append(2.0, {"swp1": _counters(rx_octets=100)})
+    latest = history.latest_rates()
+    assert latest["swp1"]["rx_octets"] == -1.0
+    assert latest["swp1"]["tx_octets"] == 0.0
+    assert set(latest["swp2"].values()) == {-1.0}
+    assert sorted(history.interfaces()) == ["swp1", "swp2"]
+
+
+def test_history_size():
+    with pytest.raises(ValueError):
+        CounterHistory(size=1)
+
+
+def test_poll_counters_over_exec_channel(mocked_driver):
+    driver = mocked_driver()
+    driver.transport = "exec"
+    samples = [
+        "1700000000.000000000\n",
+        json.dumps([_link("swp1", 1000, 0)]) + "\n",
+        "\n1700000000.500000000\n" + json.dumps([_link("swp1", 6000, 250)])[:40],
+        json.dumps([_link("swp1", 6000, 250)])[40:] + "\n\n",
+    ]
+    commands = []
+
+    def _iter_command(command):
+        commands.append(command)
+        return iter(samples)
+
+    driver._iter_command = _iter_command
+    poller = driver.poll_interfaces_counters(interval=0.5, history=10)
+    rates = next(poller)
+    assert commands == [parsers.interfaces_counters_poll_command(0.5)]
+    assert rates["swp1"]["rx_octets"] == 10000.0
+    assert rates["swp1"]["tx_octets"] == 500.0
+    assert len(poller.history) == 2
+    with pytest.raises(StopIteration):
+        next(poller)
+
+
+def test_poll_counters_over_shell(monkeypatch, mocked_driver):
+    driver = mocked_driver()
+    outputs = iter(
+        [json.dumps([_link("swp1", 0, 0)]), json.dumps([_link("swp1", 2000, 0)])]
+    )
+    driver.device.send_command = lambda command: next(outputs)
+    clock = iter([10.0, 10.1, 12.0, 12.1])
+    sleeps = []
+    monkeypatch.setattr(cumulus.time, "monotonic", lambda: next(clock))
+    monkeypatch.setattr(cumulus.time, "sleep", sleeps.append)
+
+    poller = driver.poll_interfaces_counters(interval=2)
+    assert next(poller)["swp1"]["rx_octets"] == 1000.0
+    assert sleeps == [pytest.approx(1.9)]
+    poller.close()
@@ -0,0 +1,86 @@
+"""Tests for the delta getters."""
+from napalm_cumulus.utils import batch, delta, parsers
+
+
+def _recording(driver):
+    """Answer the interfaces fingerprint with driver.link_digest and log every command."""
+    driver.link_digest = "d41d8cd98f00b204e9800998ecf8427e  -"
+    driver.commands = []
+    send_command = driver.device.send_command
+
+    def _send_command(command):
+        script = batch.split_batch_script(command)
+        driver.commands.extend(script[1] if script else [command])
+        if command == parsers.INTERFACES_FINGERPRINT_COMMAND:
+            return driver.link_digest
+        return send_command(command)
+
+    driver.device.send_command = _send_command
+    return driver
+
+
+def test_tracker_reports_added_removed_and_changed_items():
+    tracker = delta.DeltaTracker(delta.interface_items, ignore=("last_flapped",))
+    first = tracker.update(
+        {"swp1": {"is_up": True, "last_flapped": 1.0}, "swp2": {"is_up": True}}
+    )
+    assert first["full"]
+    assert first["sequence"] == 1
+    assert sorted(first["added"]) == ["swp1", "swp2"]
+
+    second = tracker.update(
+        {"swp1": {"is_up": True, "last_flapped": 31.0}, "swp3": {"is_up": False}}
+    )
+    assert second == {
+        "sequence": 2,
+        "full": False,
+        "added": {"swp3": {"is_up": False}},
+        "removed": {"swp2": {"is_up": True}},
+        "changed": {},
+    }
+
+    third = tracker.update(
+        {"swp1": {"is_up": False, "last_flapped": 0.0}, "swp3": {"is_up": False}}
+    )
+    assert third["changed"] == {"swp1": {"is_up": False, "last_flapped": 0.0}}
+
+
+def test_bgp_items_keep_the_result_layout():
+    tracker = delta.DeltaTracker(delta.bgp_neighbor_items, ignore=("uptime",))
+    peer = {"is_up": True, "uptime": 10}
+    tracker.update({"global": {"router_id": "10.0.0.1", "peers": {"10.0.0.2": peer}}})
+    result = tracker.update(
+        {"global": {"router_id": "10.0.0.1", "peers": {"10.0.0.2": dict(peer, is_up=False)}}}
+    )
+    assert result["changed"] == {
+        "global": {"peers": {"10.0.0.2": {"is_up": False, "uptime": 10}}}
+    }
+
+
+def test_interfaces_delta_skips_fetch_when_links_unchanged(mocked_driver):
+    driver = _recording(mocked_driver("test_get_interfaces"))
+    first = driver.get_interfaces_delta()
+    assert first["full"]
+    assert first["added"] == driver.get_interfaces()
+
+    driver.commands = []
+    second = driver.get_interfaces_delta()
+    assert driver.commands == [parsers.INTERFACES_FINGERPRINT_COMMAND]
+    assert second == {"sequence": 2, "full": False, "added": {}, "removed": {}, "changed": {}}
+
+    driver.link_digest = "9e107d9d372bb6826bd81d3542a419d6  -"
+    third = driver.get_interfaces_delta()
+    assert "net show interface all json" in driver.commands
+    assert third["sequence"] == 3
+    assert third["changed"] == {}
+
+
+def test_bgp_neighbors_delta_skips_neighbors_when_summary_unchanged(mocked_driver):
+    driver = _recording(mocked_driver("test_get_bgp_neighbors", "pfx_snt"))
+    first = driver.get_bgp_neighbors_delta()
+    assert first["added"] == driver.get_bgp_neighbors()
+
+    driver.commands = []
+    second = driver.get_bgp_neighbors_delta()
+    assert driver.commands == [parsers.BGP_SUMMARY_COMMAND]
+    assert not second["added"] and not second["changed"] and not second["removed"]
@@ -0,0 +1,64 @@
+"""Tests for the JSON decoding layer."""
+import json
+
+import pytest
+
+from napalm_cumulus.utils import fastjson, parsers
+
+BACKENDS = ["json"]
+if fastjson.orjson is not None:
+    BACKENDS.append("orjson")
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = fastjson.backend()
+    fastjson.set_backend(request.param)
+    yield request.param
+    fastjson.set_backend(previous)
+
+
+def test_loads_text_and_bytes(backend):
+    document = {"swp1": {"mtu": 9216, "alias": "uplink é"}}
+    text = json.dumps(document, ensure_ascii=False)
+    assert fastjson.loads(text) == document
+    assert fastjson.loads(text.encode("utf-8")) == document
+
+
+@pytest.mark.parametrize("data", ["{truncated", b"", "ERROR: vtysh failed"])
+def test_invalid_documents_raise_value_error(backend, data):
+    with pytest.raises(ValueError):
+        fastjson.loads(data)
+
+
+def test_unavailable_backend():
+    with pytest.raises(ValueError):
+        fastjson.set_backend("simdjson")
+
+
+def test_custom_backend():
+    calls = []
+
+    def decoder(data):
+        calls.append(data)
+        return json.loads(data)
+
+    previous = fastjson.backend()
+    fastjson.set_backend("counting", decoder)
+    try:
+        assert fastjson.loads("[1]") == [1]
+    finally:
+        fastjson.set_backend(previous)
+    assert calls == ["[1]"]
+
+
+def test_get_facts_matches_across_backends(backend, mocked_data, mocked_driver):
+    driver = mocked_driver("test_get_facts")
+    with open(mocked_data("test_get_facts", "normal", "expected_result.json")) as f:
+        assert json.loads(json.dumps(driver.get_facts())) == json.load(f)
+
+
+def test_advertised_routes_count_skips_stray_line_endings(backend):
+    output = '{\n  "totalPrefixCounter": 3\n}'
+    assert parsers.parse_bgp_advertised_routes_count(output) == 3
+    assert parsers.parse_bgp_advertised_routes_count(output.replace("{", "{n")) == 3
@@ -0,0 +1,103 @@
+"""Tests for the fleet collector."""
+import time
+
+import pytest
+from napalm.base.exceptions import CommandTimeoutException
+
+from napalm_cumulus.fleet import FleetCollector
+
+from test.unit.mock import MockedCumulusDriver
+
+
+@pytest.fixture
+def device(mocked_data):
+    """Return a function building the inventory entry of a device answering get_facts."""
+
+    def _device(hostname, test_case="normal", latency=0):
+        return {
+            "hostname": hostname,
+            "username": "cumulus",
+            "password": "cumulus",
+            "optional_args": {
+                "mocked_data_dir": mocked_data("test_get_facts", test_case),
+                "mocked_latency": latency,
+            },
+        }
+
+    return _device
+
+
+def test_fleet_collects_results_and_errors(device):
+    inventory = [device("leaf{:02d}".format(i)) for i in range(8)]
+    inventory.append(device("broken", "missing"))
+    collector = FleetCollector(
+        inventory, ["get_facts"], max_workers=4, driver=MockedCumulusDriver
+    )
+
+    results = collector.collect()
+    assert len(results) == 9
+    assert results["leaf03"].results["get_facts"]["hostname"] == "cumulus"
+    assert results["leaf03"].exception is None
+    assert isinstance(results["broken"].errors["get_facts"], IOError)
+
+
+def test_fleet_runs_devices_concurrently(device):
+    inventory = [
+        device("leaf{:02d}".format(i), latency=0.1) for i in range(8)
+    ]
+    collector = FleetCollector(
+        inventory, ["get_facts"], max_workers=8, driver=MockedCumulusDriver
+    )
+
+    start = time.monotonic()
+    results = list(collector.run(poll_interval=0.05))
+    # Two commands per device: sequential polling would take 1.6s.
+    assert time.monotonic() - start < 1
+    assert all(result.exception is None for result in results)
+
+
+def test_fleet_device_timeout(device):
+    inventory = [
+        device("slow", latency=1),
+        device("fast"),
+    ]
+    collector = FleetCollector(
+        inventory, ["get_facts"], max_workers=2, timeout=0.2, driver=MockedCumulusDriver
+    )
+
+    results = list(collector.run(poll_interval=0.05))
+    assert [result.hostname for result in results] == ["fast", "slow"]
+    assert isinstance(results[1].exception, CommandTimeoutException)
+
+
+def test_fleet_reports_invalid_entries(device):
+    broken = device("broken")
+    broken["optional_args"]["transport"] = "telnet"
+    inventory = [broken, {"hostname": "anonymous"}, device("leaf01")]
+    collector = FleetCollector(inventory, ["get_facts"], max_workers=2, driver=MockedCumulusDriver)
+
+    results = collector.collect()
+    assert isinstance(results["broken"].exception, ValueError)
+    assert isinstance(results["anonymous"].exception, KeyError)
+    assert results["leaf01"].exception is None
+
+
+def test_fleet_rejects_entries_without_hostname(device):
+    inventory = [device("leaf01"), {"username": "cumulus"}]
+    collector = FleetCollector(inventory, ["get_facts"], driver=MockedCumulusDriver)
+
+    with pytest.raises(ValueError, match="1"):
+        collector.collect()
+
+
+def test_fleet_stops_when_closed(device):
+    inventory = [
+        device("leaf{:02d}".format(i), latency=0.1) for i in range(20)
+    ]
+    collector = FleetCollector(inventory, ["get_facts"], max_workers=2, driver=MockedCumulusDriver)
+
+    start = time.monotonic()
+    for result in collector.run(poll_interval=0.05):
+        break
+    # Polling the 20 devices would take 2s.
+    assert time.monotonic() - start < 0.6
@@ -9,3 +9,16 @@ import pytest
 @pytest.mark.usefixtures("set_device_parameters")
 class TestGetter(BaseTestGetters):
     """Test get_* methods."""
+
+    def test_method_signatures(self):
+        """Test the signatures of napalm's methods, leaving out the driver extensions."""
+        driver = self.driver
+        self.driver = type(
+            driver.__name__,
+            (driver,),
+            {name: None for name in driver.DRIVER_EXTENSIONS},
+        )
+        try:
+            super().test_method_signatures()
+        finally:
+            self.driver = driver
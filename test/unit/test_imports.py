@@ -0,0 +1,23 @@
+"""Tests for the package attributes."""
+import importlib
+import importlib.metadata
+
+import napalm_cumulus
+from napalm_cumulus.cumulus import CumulusDriver
+
+
+def test_package_attributes():
+    assert napalm_cumulus.CumulusDriver is CumulusDriver
+    assert isinstance(napalm_cumulus.__version__, str)
+
+
+def test_version_when_not_installed(monkeypatch):
+    def _version(name):
+        raise importlib.metadata.PackageNotFoundError(name)
+
+    monkeypatch.setattr(importlib.metadata, "version", _version)
+    try:
+        assert importlib.reload(napalm_cumulus).__version__ == "Not installed"
+    finally:
+        monkeypatch.undo()
+        importlib.reload(napalm_cumulus)
@@ -0,0 +1,95 @@
+"""Tests for the command and getter instrumentation."""
+import json
+
+from napalm_cumulus.utils.instrumentation import Instrumentation
+
+
+def test_disabled_by_default(mocked_driver):
+    driver = mocked_driver("test_get_facts")
+    assert driver.instrumentation is None
+    assert "get_facts" not in vars(driver)
+
+
+def test_records_commands_and_getters(mocked_driver):
+    events = []
+    instrumentation = Instrumentation(callbacks=[events.append])
+    driver = mocked_driver(
+        "test_get_facts",
+        optional_args={"instrumentation": instrumentation, "command_cache": True},
+    )
+    driver.get_facts()
+    driver.get_facts()
+
+    totals = instrumentation.to_dict()
+    commands = {entry["command"]: entry for entry in totals["commands"]}
+    system = commands["net show system json"]
+    assert system["runs"] == 2
+    assert system["cache_hits"] == 1
+    assert system["received_bytes"] > 0
+    assert system["host"] == "localhost"
+
+    (getter,) = totals["getters"]
+    assert getter["getter"] == "get_facts"
+    assert getter["calls"] == 2
+    assert getter["seconds"] >= getter["command_seconds"]
+    assert getter["parse_seconds"] > 0
+
+    assert [event["type"] for event in events] == ["command"] * 2 + ["getter"] + [
+        "command"
+    ] * 2 + ["getter"]
+
+
+def test_batches_are_recorded_as_a_whole(mocked_driver):
+    driver = mocked_driver("test_get_environment", optional_args={"instrumentation": True})
+    driver.get_environment()
+    (command,) = driver.instrumentation.to_dict()["commands"]
+    assert command["command"] == "sudo smonctl --json; free"
+
+
+def test_records_retries(mocked_driver):
+    driver = mocked_driver("test_get_facts", optional_args={"instrumentation": True})
+    send_command = driver.device.send_command
+    outputs = ["{truncated"]
+
+    def _send_command(command):
+        if command == "net show system json" and outputs:
+            return outputs.pop()
+        return send_command(command)
+
+    driver.device.send_command = _send_command
+    driver.get_facts()
+    commands = {e["command"]: e for e in driver.instrumentation.to_dict()["commands"]}
+    assert commands["net show system json"]["retries"] == 1
+    assert commands["net show system json"]["runs"] == 2
+
+
+def test_exporters():
+    instrumentation = Instrumentation()
+    instrumentation.record_command("leaf01", 'echo "a"', 0.5, "a\n")
+    instrumentation.record_getter("leaf01", "get_facts", 2.0, 0.5)
+
+    assert json.loads(instrumentation.to_json())["getters"][0]["parse_seconds"] == 1.5
+    text = instrumentation.to_prometheus()
+    assert "# TYPE napalm_cumulus_command_seconds_total counter" in text
+    assert (
+        'napalm_cumulus_command_received_bytes_total{host="leaf01",command="echo \\"a\\""} 2'
+        in text
+    )
+    assert 'napalm_cumulus_getter_parse_seconds_total{host="leaf01",getter="get_facts"} 1.5' in text
+
+
+def test_concurrent_commands_charge_wall_time():
+    instrumentation = Instrumentation()
+
+    def get_facts():
+        instrumentation.record_concurrent_commands(
+            "leaf01", [("a", 1.0, "x"), ("b", 1.5, b"yy")], 1.5
+        )
+
+    instrumentation.wrap_getter("leaf01", "get_facts", get_facts)()
+    totals = instrumentation.to_dict()
+    assert [(c["command"], c["seconds"], c["received_bytes"]) for c in totals["commands"]] == [
+        ("a", 1.0, 1),
+        ("b", 1.5, 2),
+    ]
+    assert totals["getters"][0]["command_seconds"] == 1.5
@@ -0,0 +1,45 @@
+"""Tests for get_interfaces."""
+import json
+from datetime import timedelta
+
+from napalm_cumulus.utils import batch, parsers
+
+
+def test_vtysh_probe_runs_once_per_session(mocked_driver):
+    driver = mocked_driver("test_get_interfaces")
+    batches = []
+    send_command = driver.device.send_command
+
+    def _send_command(command):
+        script = batch.split_batch_script(command)
+        if script is not None:
+            batches.append(script[1])
+        return send_command(command)
+
+    driver.device.send_command = _send_command
+    first = driver.get_interfaces()
+    second = driver.get_interfaces()
+
+    assert first == second
+    assert "sudo vtysh -c 'show version'" in batches[0]
+    assert "sudo vtysh -c 'show version'" not in batches[1]
+    assert "sudo vtysh -c 'show interface'" in batches[1]
+
+
+def test_no_routing_daemon(mocked_driver):
+    driver = mocked_driver("test_interfaces_no_routing_daemon")
+    assert driver.get_interfaces() == driver.device.expected_result
+
+
+def test_last_flapped_counts_days(mocked_data):
+    def _read(name):
+        with open(mocked_data("test_get_interfaces", "normal", name)) as f:
+            return f.read()
+
+    interfaces = parsers.parse_interfaces(
+        json.loads(_read("net_show_interface_all_json.json")),
+        parsers.parse_date(_read("date____Y__m__d__H__M__S_.json")) + timedelta(days=2),
+        _read("sudo_vtysh__c__show_interface_.json"),
+    )
+    assert interfaces["bridge"]["last_flapped"] == 2 * 86400 + 19906.0
+    assert interfaces["lo"]["last_flapped"] == -1.0
@@ -0,0 +1,62 @@
+"""Tests for the MAC address table getters."""
+import sys
+
+import pytest
+
+from napalm_cumulus.utils import parsers
+from napalm_cumulus.utils.mac_table import MacAddressTable
+
+
+@pytest.mark.parametrize("size", [1, 13, 100000])
+def test_streaming_parse_across_chunks(size, mocked_data):
+    fdb = mocked_data("test_get_mac_address_table", "normal", "bridge__s__j_fdb_show.json")
+    with open(fdb) as f:
+        text = f.read()
+    chunks = (text[i:i + size] for i in range(0, len(text), size))
+    entries = list(parsers.iter_mac_address_table(chunks, {"vni20": 20}))
+    assert [(e["mac"], e["interface"], e["vlan"]) for e in entries] == [
+        ("44:38:39:00:00:03", "swp1", 10),
+        ("44:38:39:00:00:05", "swp2", 20),
+        ("44:38:39:00:00:17", "vni10", 10),
+        ("44:38:39:00:00:19", "vni20", 20),
+        ("44:38:39:00:00:01", "bridge", 10),
+    ]
+
+
+def test_bridge_vlans_both_formats():
+    expected = {"vni10": 10}
+    assert parsers.parse_bridge_vlans(
+        '[{"ifname":"vni10","vlans":[{"vlan":10,"flags":["PVID","Egress Untagged"]}]}]'
+    ) == expected
+    assert parsers.parse_bridge_vlans(
+        '{"vni10":[{"vlan":10,"flags":["PVID","Egress Untagged"]},{"vlan":20}]}'
+    ) == expected
+    assert parsers.parse_bridge_vlans("") == {}
+
+
+def test_compact_table_matches_getter(mocked_driver):
+    driver = mocked_driver("test_get_mac_address_table")
+    table = driver.get_mac_address_table_compact()
+    assert len(table) == 5
+    assert table.to_list() == driver.get_mac_address_table()
+    assert table[4]["static"]
+    assert table.interfaces() == ["swp1", "swp2", "vni10", "vni20", "bridge"]
+
+
+def test_compact_table_size():
+    entries = [
+        {
+            "mac": "02:00:{:02x}:{:02x}:{:02x}:01".format(i >> 16, (i >> 8) & 0xFF, i & 0xFF),
+            "interface": "vni{}".format(i % 100),
+            "vlan": i % 4094 + 1,
+            "static": False,
+            "active": True,
+            "moves": -1,
+            "last_move": -1.0,
+        }
+        for i in range(10000)
+    ]
+    table = MacAddressTable(entries)
+    assert table.nbytes == 15 * 10000
+    assert sys.getsizeof(entries[0]) > table.nbytes / len(table)
+    assert list(table) == entries
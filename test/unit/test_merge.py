@@ -0,0 +1,100 @@
+"""Tests for bulk load_merge_candidate."""
+import os
+import stat
+import subprocess
+
+import pytest
+from napalm.base.exceptions import MergeConfigException
+
+FAKE_NET = """#!/bin/sh
+echo "$*" >> "$NET_LOG"
+case "$*" in
+    *typo*) echo "ERROR: Command not found."; exit 1;;
+    *bogus*) echo "error: bogus is not a valid interface";;
+esac
+"""
+
+
+class LocalShellDevice(object):
+    """Runs commands in a local shell where 'net' is a stand-in logging its arguments."""
+
+    def __init__(self, tmpdir):
+        net = tmpdir.join("net")
+        net.write(FAKE_NET)
+        os.chmod(str(net), os.stat(str(net)).st_mode | stat.S_IEXEC)
+        self.log = tmpdir.join("net.log")
+        self.env = dict(os.environ, PATH="{}:{}".format(tmpdir, os.environ["PATH"]))
+        self.env["NET_LOG"] = str(self.log)
+        self.sent = []
+
+    def send_command(self, command, **kwargs):
+        self.sent.append(command)
+        self.kwargs = kwargs
+        return subprocess.check_output(["sh", "-c", command], env=self.env).decode()
+
+    def applied(self):
+        return self.log.read().splitlines() if self.log.exists() else []
+
+
+@pytest.fixture
+def driver(tmpdir, mocked_driver):
+    driver = mocked_driver(optional_args={"bulk_merge": True})
+    driver.device = LocalShellDevice(tmpdir)
+
+    def _upload(content, path):
+        with open(path, "w") as f:
+            f.write(content)
+
+    driver._upload = _upload
+    return driver
+
+
+def test_bulk_merge_single_round_trip(driver):
+    candidate = ["net add hostname leaf01\n", "\n", "net add interface swp1 mtu 9000\n"]
+    driver.load_merge_candidate(config=candidate)
+
+    assert len(driver.device.sent) == 1
+    assert driver.device.applied() == [
+        "add hostname leaf01",
+        "add interface swp1 mtu 9000",
+    ]
+
+
+def test_bulk_merge_reports_failing_line(driver):
+    candidate = [
+        "net add hostname leaf01",
+        "",
+        "net add interface swp1 typo 9000",
+        "net add interface swp2 mtu 9000",
+    ]
+    with pytest.raises(MergeConfigException) as e:
+        driver.load_merge_candidate(config=candidate)
+
+    assert "'net add interface swp1 typo 9000' on line 3" in str(e.value)
+    # The script stops at the failing command.
+    assert driver.device.applied() == [
+        "add hostname leaf01",
+        "add interface swp1 typo 9000",
+    ]
+
+
+def test_bulk_merge_stops_at_error_output(driver):
+    # NCLU reports some errors with a zero exit status.
+    candidate = [
+        "net add interface bogus mtu 9000",
+        "net add interface swp2 mtu 9000",
+    ]
+    with pytest.raises(MergeConfigException) as e:
+        driver.load_merge_candidate(config=candidate)
+
+    assert "'net add interface bogus mtu 9000' on line 1" in str(e.value)
+    assert driver.device.applied() == ["add interface bogus mtu 9000"]
+
+
+def test_bulk_merge_read_timeout_scales_with_candidate(driver):
+    driver.load_merge_candidate(
+        config=["net add interface swp{} mtu 9000".format(i) for i in range(1000)]
+    )
+
+    kwargs = driver.device.kwargs
+    assert kwargs.get("read_timeout", kwargs.get("delay_factor", 0) * 100) >= 2000
@@ -0,0 +1,95 @@
+"""Tests for the neighbor table getters."""
+import json
+import os
+
+import pytest
+from napalm.base.exceptions import CommandErrorException
+
+from napalm_cumulus.cumulus import CumulusDriver
+from napalm_cumulus.utils import parsers
+
+
+def _chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 100000])
+def test_iter_json_array_across_chunks(size):
+    elements = [{"dst": "10.0.0.{}".format(i), "n": [i, -i, 1.5], "s": "]},["} for i in range(50)]
+    text = "  " + json.dumps(elements, indent=1) + "\n"
+    assert list(parsers.iter_json_array(_chunked(text, size))) == elements
+
+
+def test_iter_json_array_numbers_split_across_chunks():
+    assert list(parsers.iter_json_array(["[12", "34, 5", "6]"])) == [1234, 56]
+
+
+def test_iter_json_array_is_lazy():
+    def chunks():
+        yield '[{"a": 1}, '
+        raise AssertionError("read past the first element")
+
+    assert next(parsers.iter_json_array(chunks())) == {"a": 1}
+
+
+@pytest.mark.parametrize("text", ["", "[{}, ", 'Cannot find device "TEST"'])
+def test_iter_json_array_invalid(text):
+    with pytest.raises(ValueError):
+        list(parsers.iter_json_array([text]))
+
+
+def test_neighbors_command():
+    assert parsers.neighbors_command(4) == "ip -4 -s -j neigh show"
+    assert parsers.neighbors_command(4, "mgmt") == "ip -4 -s -j neigh show vrf mgmt"
+    assert parsers.neighbors_command(6) == "ip -6 -s -j neigh show"
+
+
+@pytest.mark.parametrize("vrf", ["x; reboot", "$(id)", "mgmt vrf", "a" * 16])
+def test_neighbors_command_rejects_invalid_vrfs(vrf):
+    with pytest.raises(ValueError):
+        parsers.neighbors_command(4, vrf)
+
+
+def test_exec_transport_streams_arp_table(mocked_data):
+    pytest.importorskip("asyncssh")
+    from test.unit.ssh_server import PASSWORD, USERNAME, StandInSSHServer
+
+    capture = mocked_data("test_get_arp_table", "normal")
+    with StandInSSHServer(capture) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={"transport": "exec", "port": server.port},
+        )
+        driver.open()
+        try:
+            entries = driver.iter_arp_table()
+            first = next(entries)
+            result = [first] + list(entries)
+        finally:
+            driver.close()
+
+    with open(os.path.join(capture, "expected_result.json")) as f:
+        assert result == json.load(f)
+
+
+def test_exec_transport_streamed_command_failure_raises(mocked_data):
+    pytest.importorskip("asyncssh")
+    from test.unit.ssh_server import PASSWORD, USERNAME, StandInSSHServer
+
+    # The capture has no output for the VRF, so the stand-in answers "command not found".
+    capture = mocked_data("test_get_arp_table", "normal")
+    with StandInSSHServer(capture) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={"transport": "exec", "port": server.port},
+        )
+        driver.open()
+        try:
+            with pytest.raises(CommandErrorException, match="exit status 127"):
+                driver.get_arp_table(vrf="blue")
+        finally:
+            driver.close()
@@ -0,0 +1,151 @@
+"""Tests for the NVUE REST API backend."""
+import json
+import socket
+
+import pytest
+from napalm.base.exceptions import CommandErrorException
+
+from napalm_cumulus import cumulus
+from napalm_cumulus.utils import parsers
+from napalm_cumulus.utils.nvue import NvueClient
+
+from test.unit.conftest import FakeCumulusDevice
+from test.unit.nvue_server import PASSWORD, USERNAME, StandInNvueServer
+
+GETTERS = [
+    "get_facts",
+    "get_interfaces",
+    "get_interfaces_ip",
+    "get_lldp_neighbors",
+    "get_bgp_neighbors",
+]
+
+
+class NvueCumulusDriver(cumulus.CumulusDriver):
+    """Driver whose SSH session is a device double, for the getters NVUE doesn't serve."""
+
+    connections = 0
+
+    def _connect(self):
+        self.connections += 1
+        device = FakeCumulusDevice()
+        device.current_test = "test_get_environment"
+        device.current_test_case = "normal"
+        return device
+
+
+def _driver(server, password=PASSWORD, **optional_args):
+    optional_args.update({"backend": "nvue", "nvue_scheme": "http", "nvue_port": server.port})
+    driver = NvueCumulusDriver("127.0.0.1", USERNAME, password, optional_args=optional_args)
+    driver.open()
+    return driver
+
+
+@pytest.fixture
+def server(mocked_data):
+    with StandInNvueServer(mocked_data(), "test_nvue") as server:
+        yield server
+
+
+@pytest.mark.parametrize("getter", GETTERS)
+def test_getters(server, getter, mocked_data):
+    driver = _driver(server)
+    with open(mocked_data("test_nvue", "normal", "expected_{}.json".format(getter))) as f:
+        assert json.loads(json.dumps(getattr(driver, getter)())) == json.load(f)
+    driver.close()
+    assert all(query == {"rev": ["operational"]} for _, query in server.requests)
+
+
+def test_ssh_opened_only_when_needed(server):
+    driver = _driver(server)
+    for getter in GETTERS:
+        getattr(driver, getter)()
+    assert driver.connections == 0
+    assert driver.is_alive() == {"is_alive": True}
+    driver.get_environment()
+    driver.get_environment()
+    assert driver.connections == 1
+    driver.close()
+
+    driver = _driver(server)
+    driver.close()
+    assert driver.connections == 0
+    assert driver.is_alive() == {"is_alive": False}
+
+
+def test_is_alive_probes_the_api(server):
+    driver = _driver(server)
+    assert driver.is_alive() == {"is_alive": True}
+    assert server.requests[-1][0] == "/system"
+    driver.close()
+    driver = _driver(server, password="wrong")
+    assert driver.is_alive() == {"is_alive": False}
+    driver.close()
+
+    # Nothing listens on the port of a closed socket.
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    client = NvueClient("127.0.0.1", USERNAME, PASSWORD, port=port, scheme="http")
+    assert not client.is_alive()
+    client.close()
+
+
+def test_requests_instrumented(server):
+    driver = _driver(server, instrumentation=True)
+    driver.get_lldp_neighbors()
+    driver.close()
+    totals = driver.instrumentation.to_dict()
+    commands = {entry["command"]: entry for entry in totals["commands"]}
+    assert len(commands) == 4
+    assert commands["GET /interface"]["runs"] == 1
+    assert commands["GET /interface"]["received_bytes"] > 0
+    assert all(command.startswith("GET /interface") for command in commands)
+    (getter,) = totals["getters"]
+    assert 0 < getter["command_seconds"] <= getter["seconds"]
+
+
+def test_connections_kept_alive(server):
+    driver = _driver(server)
+    for getter in GETTERS:
+        getattr(driver, getter)()
+    stats = driver.nvue.stats
+    driver.close()
+    assert stats["requests"] == len(server.requests) == 12
+    assert stats["connections"] == len(server.connections) <= 3
+
+
+def test_requests_sent_concurrently(mocked_data):
+    with StandInNvueServer(mocked_data(), "test_nvue", delay=0.2) as server:
+        driver = _driver(server)
+        driver.get_lldp_neighbors()
+        driver.close()
+    assert server.max_in_flight == 3
+
+
+def test_stale_connection_reopened(server):
+    client = NvueClient("127.0.0.1", USERNAME, PASSWORD, port=server.port, scheme="http")
+    assert client.get("/system")["hostname"] == "leaf01"
+    # The server closing an idle connection leaves the client a dead socket.
+    client._idle[0].sock.shutdown(socket.SHUT_RDWR)
+    assert client.get("/system")["hostname"] == "leaf01"
+    assert client.stats == {"requests": 2, "connections": 2}
+    client.close()
+
+
+def test_errors(server):
+    driver = _driver(server, password="wrong")
+    with pytest.raises(CommandErrorException):
+        driver.get_facts()
+    driver.close()
+    client = NvueClient("127.0.0.1", USERNAME, PASSWORD, port=server.port, scheme="http")
+    with pytest.raises(CommandErrorException):
+        client.get("/evpn")
+    client.close()
+    with pytest.raises(ValueError):
+        cumulus.CumulusDriver("leaf01", "user", "pass", optional_args={"backend": "nvue4"})
+
+
+def test_nvue_path_quotes_names():
+    assert parsers.nvue_path("vrf", "RED/1", "router") == "/vrf/RED%2F1/router"
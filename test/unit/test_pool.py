@@ -0,0 +1,131 @@
+"""Tests for the SSH connection pool."""
+import threading
+
+import pytest
+from napalm.base.exceptions import ConnectionException
+
+from napalm_cumulus.cumulus import CumulusDriver
+from napalm_cumulus.utils.pool import ConnectionPool
+
+
+class FakeConnection(object):
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+        self.closed = False
+
+    def disconnect(self):
+        self.closed = True
+
+
+class Factory(object):
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        connection = FakeConnection(len(self.created))
+        self.created.append(connection)
+        return connection
+
+
+def _is_alive(connection):
+    return connection.alive
+
+
+def test_reuses_released_connection_per_key():
+    pool = ConnectionPool()
+    connect = Factory()
+    first = pool.acquire("leaf01", connect, _is_alive)
+    pool.release("leaf01", first)
+
+    assert pool.acquire("leaf01", connect, _is_alive) is first
+    assert pool.acquire("leaf02", connect, _is_alive) is not first
+    assert len(connect.created) == 2
+    assert pool.stats == {"created": 2, "reused": 1, "evicted": 0}
+
+
+def test_dead_connection_is_replaced():
+    pool = ConnectionPool()
+    connect = Factory()
+    first = pool.acquire("leaf01", connect, _is_alive)
+    pool.release("leaf01", first)
+    first.alive = False
+
+    second = pool.acquire("leaf01", connect, _is_alive)
+    assert second is not first
+    assert first.closed
+    assert len(pool) == 1
+
+
+def test_idle_connections_are_evicted():
+    pool = ConnectionPool(idle_timeout=0)
+    connect = Factory()
+    first = pool.acquire("leaf01", connect, _is_alive)
+    pool.release("leaf01", first)
+    pool.evict_idle()
+
+    assert first.closed
+    assert len(pool) == 0
+    assert pool.stats["evicted"] == 1
+
+
+def test_full_pool_evicts_least_recently_used_idle_connection():
+    pool = ConnectionPool(max_connections=2)
+    connect = Factory()
+    first = pool.acquire("leaf01", connect, _is_alive)
+    second = pool.acquire("leaf02", connect, _is_alive)
+    pool.release("leaf01", first)
+    pool.release("leaf02", second)
+
+    pool.acquire("leaf03", connect, _is_alive)
+    assert first.closed
+    assert not second.closed
+    assert len(pool) == 2
+
+
+def test_full_pool_waits_for_a_release():
+    pool = ConnectionPool(max_connections=1)
+    connect = Factory()
+    first = pool.acquire("leaf01", connect, _is_alive)
+
+    with pytest.raises(ConnectionException):
+        pool.acquire("leaf01", connect, _is_alive, timeout=0.05)
+
+    timer = threading.Timer(0.05, pool.release, ("leaf01", first))
+    timer.start()
+    assert pool.acquire("leaf01", connect, _is_alive, timeout=5) is first
+    timer.join()
+
+
+def test_failed_connect_frees_its_slot():
+    pool = ConnectionPool(max_connections=1)
+
+    def connect():
+        raise ConnectionException("Cannot connect to leaf01")
+
+    with pytest.raises(ConnectionException):
+        pool.acquire("leaf01", connect, _is_alive)
+    assert len(pool) == 0
+
+
+def test_drivers_share_pooled_exec_connection(mocked_data):
+    pytest.importorskip("asyncssh")
+    from test.unit.ssh_server import PASSWORD, USERNAME, StandInSSHServer
+
+    pool = ConnectionPool()
+    capture = mocked_data("test_get_facts", "normal")
+    with StandInSSHServer(capture) as server:
+        optional_args = {"transport": "exec", "port": server.port, "connection_pool": pool}
+        devices = []
+        for _ in range(2):
+            driver = CumulusDriver("127.0.0.1", USERNAME, PASSWORD, optional_args=optional_args)
+            driver.open()
+            devices.append(driver.device)
+            driver.get_facts()
+            driver.close()
+            assert not driver.is_alive()["is_alive"]
+        pool.clear()
+
+    assert devices[0] is devices[1]
+    assert pool.stats["created"] == 1
+    assert pool.stats["reused"] == 1
@@ -0,0 +1,79 @@
+"""Tests for the privileged session modes."""
+from napalm_cumulus.utils.instrumentation import Instrumentation
+
+from test.unit.conftest import FakeCumulusDevice
+
+
+class SpyDevice(FakeCumulusDevice):
+    """Test double recording privilege changes and commands."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def enable(self):
+        self.calls.append("enable")
+
+    def exit_enable_mode(self):
+        self.calls.append("exit")
+
+    def send_command(self, command):
+        self.calls.append(command)
+        return super().send_command(command)
+
+
+def _poll(driver):
+    driver.device = SpyDevice()
+    driver.device.current_test_case = "normal"
+    for getter in ("get_environment", "get_interfaces"):
+        driver.device.current_test = "test_{}".format(getter)
+        getattr(driver, getter)()
+    return driver
+
+
+def test_per_command_elevates_every_time(mocked_driver):
+    driver = _poll(mocked_driver(optional_args={"privilege_mode": "per_command"}))
+    assert driver.device.calls.count("enable") == 2
+    assert driver.device.calls.count("exit") == 2
+    assert driver.privilege_round_trips_saved == 0
+
+
+def test_persistent_elevates_once(mocked_driver):
+    driver = _poll(mocked_driver(optional_args={"privilege_mode": "persistent"}))
+    assert driver.device.calls.count("enable") == 1
+    assert driver.device.calls.count("exit") == 0
+    assert driver.privilege_stats == {"privileged_commands": 2, "elevations": 1}
+    assert driver.privilege_round_trips_saved == 2
+
+
+def test_round_trips_saved_instrumented_per_getter(mocked_driver):
+    events = []
+    instrumentation = Instrumentation(callbacks=[events.append])
+    _poll(
+        mocked_driver(
+            optional_args={"privilege_mode": "persistent", "instrumentation": instrumentation}
+        )
+    )
+    assert [
+        (e["privileged_commands"], e["elevations"], e["round_trips_saved"])
+        for e in events
+        if e["type"] == "privilege"
+    ] == [(1, 1, 0), (1, 0, 2)]
+    getters = {g["getter"]: g for g in instrumentation.to_dict()["getters"]}
+    assert getters["get_environment"]["elevations"] == 1
+    assert getters["get_environment"]["privilege_round_trips_saved"] == 0
+    assert getters["get_interfaces"]["privileged_commands"] == 1
+    assert getters["get_interfaces"]["privilege_round_trips_saved"] == 2
+    assert (
+        'napalm_cumulus_getter_privilege_round_trips_saved_total'
+        '{host="localhost",getter="get_interfaces"} 2' in instrumentation.to_prometheus()
+    )
+
+
+def test_sudo_noninteractive_never_elevates(mocked_driver):
+    driver = mocked_driver(optional_args={"privilege_mode": "sudo_noninteractive"})
+    driver.device = SpyDevice()
+    driver.device.send_command = lambda command: driver.device.calls.append(command) or ""
+
+    driver._send_command("sudo smonctl --json")
+    assert driver.device.calls == ["sudo -n smonctl --json"]
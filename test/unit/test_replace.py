@@ -0,0 +1,183 @@
+"""Tests for load_replace_candidate."""
+import io
+import os
+import re
+import stat
+import subprocess
+import tarfile
+
+import pytest
+from napalm.base.exceptions import CommitError, ReplaceConfigException
+
+from napalm_cumulus.utils import replace
+
+# Stand-ins for the switch commands, logging their arguments. vtysh and ifreload reject
+# files holding "typo".
+FAKE_COMMANDS = {
+    "sudo": 'exec "$@"\n',
+    "ifup": 'echo "ifup $*" >> "$LOG"\n',
+    "vtysh": (
+        'echo "vtysh $*" >> "$LOG"\n'
+        'if grep -q typo "$3"; then echo "% Unknown command: typo"; exit 1; fi\n'
+    ),
+    "ifreload": (
+        'echo "ifreload $*" >> "$LOG"\n'
+        'if grep -q typo "$ROOT/etc/network/interfaces"; then exit 1; fi\n'
+    ),
+    "systemctl": 'echo "systemctl $*" >> "$LOG"\n',
+}
+RUNNING = {
+    "/etc/network/interfaces": "auto lo\niface lo inet loopback\n",
+    "/etc/frr/frr.conf": "hostname leaf01\n",
+}
+CANDIDATE = """/etc/network/interfaces
+=======================
+
+auto lo
+iface lo inet loopback
+
+auto swp1
+iface swp1
+
+/etc/frr/frr.conf
+=================
+
+hostname leaf02
+"""
+# Absolute paths of the switch, not those of the staging directory.
+_ETC_RE = re.compile(r"(?<![\w-])/etc/")
+
+
+class LocalRootDevice(object):
+    """Runs commands in a local shell, with /etc moved under a temporary directory."""
+
+    def __init__(self, tmpdir):
+        self.root = tmpdir.mkdir("root")
+        bin_dir = tmpdir.mkdir("bin")
+        for name, script in FAKE_COMMANDS.items():
+            command = bin_dir.join(name)
+            command.write("#!/bin/sh\n" + script)
+            os.chmod(str(command), os.stat(str(command)).st_mode | stat.S_IEXEC)
+        for path, text in RUNNING.items():
+            self.file(path).write(text, ensure=True)
+        self.log = tmpdir.join("commands.log")
+        self.env = dict(os.environ, PATH="{}:{}".format(bin_dir, os.environ["PATH"]))
+        self.env.update(LOG=str(self.log), ROOT=str(self.root))
+        self.sent = []
+
+    def file(self, path):
+        return self.root.join(path)
+
+    def send_command(self, command):
+        self.sent.append(command)
+        command = _ETC_RE.sub(str(self.root) + "/etc/", command)
+        return subprocess.run(
+            ["sh", "-c", command], env=self.env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        ).stdout.decode()
+
+    def enable(self):
+        pass
+
+    def exit_enable_mode(self):
+        pass
+
+    def commands(self):
+        return self.log.read().splitlines() if self.log.exists() else []
+
+
+@pytest.fixture
+def driver(tmpdir, mocked_driver):
+    driver = mocked_driver()
+    driver.device = LocalRootDevice(tmpdir)
+    driver.uploads = []
+
+    def _upload(content, path):
+        driver.uploads.append(path)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    driver._upload = _upload
+    return driver
+
+
+def test_parse_config_files():
+    files = replace.parse_config_files(CANDIDATE)
+    assert list(files) == ["/etc/network/interfaces", "/etc/frr/frr.conf"]
+    assert files["/etc/frr/frr.conf"] == "hostname leaf02\n"
+    assert files["/etc/network/interfaces"].endswith("iface swp1\n")
+    assert replace.parse_config_files({"/etc/frr/frr.conf": "x"}) == {"/etc/frr/frr.conf": "x\n"}
+
+
+def test_pack():
+    files = replace.parse_config_files(CANDIDATE)
+    with tarfile.open(fileobj=io.BytesIO(replace.pack(files))) as archive:
+        assert archive.getnames() == ["etc/network/interfaces", "etc/frr/frr.conf"]
+        assert archive.extractfile("etc/frr/frr.conf").read() == b"hostname leaf02\n"
+
+
+def test_replace_commit_and_rollback(driver):
+    driver.load_replace_candidate(config=CANDIDATE)
+    # One transfer, then one round-trip to unpack, validate and read the running files.
+    assert len(driver.uploads) == 1
+    assert len(driver.device.sent) == 1
+    assert not os.path.exists(driver.uploads[0])
+
+    diff = driver.compare_config()
+    assert "+auto swp1\n" in diff
+    assert "-hostname leaf01\n+hostname leaf02\n" in diff
+    assert len(driver.device.sent) == 1
+
+    driver.commit_config()
+    assert driver.device.file("/etc/frr/frr.conf").read() == "hostname leaf02\n"
+    assert driver.device.commands()[-2:] == ["ifreload -a", "systemctl reload frr"]
+    assert not os.path.exists(driver.uploads[0][: -len(".tar.gz")])
+    assert driver.compare_config() == ""
+
+    driver.rollback()
+    assert driver.device.file("/etc/frr/frr.conf").read() == RUNNING["/etc/frr/frr.conf"]
+    assert driver.device.commands()[-2:] == ["ifreload -a", "systemctl reload frr"]
+
+
+def test_replace_rejects_invalid_candidate(driver):
+    with pytest.raises(ReplaceConfigException) as e:
+        driver.load_replace_candidate(config=CANDIDATE.replace("hostname", "typo"))
+    assert "/etc/frr/frr.conf is invalid: % Unknown command: typo" in str(e.value)
+    assert not driver.loaded
+    assert driver.device.file("/etc/frr/frr.conf").read() == RUNNING["/etc/frr/frr.conf"]
+
+
+def test_replace_rejects_unsupported_files(driver):
+    with pytest.raises(ReplaceConfigException):
+        driver.load_replace_candidate(config={"/etc/passwd": "root::0:0::/root:/bin/sh"})
+    assert driver.device.sent == []
+
+
+def test_replace_restores_running_files_when_apply_fails(driver):
+    driver.load_replace_candidate(config=CANDIDATE.replace("auto swp1", "auto typo"))
+    with pytest.raises(CommitError) as e:
+        driver.commit_config()
+    assert "running files restored" in str(e.value)
+    for path, text in RUNNING.items():
+        assert driver.device.file(path).read() == text
+    assert not driver.loaded
+
+
+def test_replace_creates_missing_running_file(driver):
+    driver.device.file("/etc/frr/frr.conf").remove()
+    driver.load_replace_candidate(config={"/etc/frr/frr.conf": "hostname leaf02"})
+    assert driver.compare_config().endswith("@@ -0,0 +1 @@\n+hostname leaf02\n")
+
+    driver.commit_config()
+    assert driver.device.file("/etc/frr/frr.conf").read() == "hostname leaf02\n"
+    driver.rollback()
+    assert not driver.device.file("/etc/frr/frr.conf").exists()
+
+
+def test_replace_diffs_against_current_running_files(driver):
+    candidate = {"/etc/frr/frr.conf": "hostname leaf02"}
+    driver.load_replace_candidate(config=candidate)
+    driver.discard_config()
+    # Changed on the switch outside of the session.
+    driver.device.file("/etc/frr/frr.conf").write("hostname leaf03\n")
+    driver.load_replace_candidate(config=candidate)
+    assert "-hostname leaf03\n+hostname leaf02\n" in driver.compare_config()
@@ -0,0 +1,162 @@
+"""Tests for get_route_to and the indexed route table."""
+import json
+
+import pytest
+
+from napalm_cumulus.utils import parsers
+from napalm_cumulus.utils.route_table import RouteTable
+
+
+def _route(vrf, protocol="bgp", next_hop="10.0.0.1"):
+    return {
+        "protocol": protocol,
+        "current_active": True,
+        "last_active": False,
+        "age": 0,
+        "next_hop": next_hop,
+        "outgoing_interface": "swp1",
+        "selected_next_hop": True,
+        "preference": 20,
+        "inactive_reason": "",
+        "routing_table": vrf,
+        "protocol_attributes": {"metric": 0, "table": 254},
+    }
+
+
+@pytest.fixture
+def table():
+    return RouteTable(
+        {
+            "0.0.0.0/0": [_route("default", "static"), _route("BLUE", "static")],
+            "10.0.0.0/8": [_route("default", "ospf")],
+            "10.1.0.0/16": [_route("default"), _route("BLUE")],
+            "10.1.2.0/24": [_route("default")],
+            "2001:db8::/32": [_route("default")],
+        }
+    )
+
+
+def _vrfs(routes_to):
+    return {
+        prefix: sorted(route["routing_table"] for route in routes)
+        for prefix, routes in routes_to.items()
+    }
+
+
+def test_lookup_address_matches_longest_prefix_per_vrf(table):
+    assert _vrfs(table.lookup("10.1.2.3")) == {
+        "10.1.2.0/24": ["default"],
+        "10.1.0.0/16": ["BLUE"],
+    }
+    assert _vrfs(table.lookup("192.0.2.1")) == {"0.0.0.0/0": ["BLUE", "default"]}
+    assert _vrfs(table.lookup("2001:db8::1")) == {"2001:db8::/32": ["default"]}
+    assert table.lookup("2001:db9::1") == {}
+
+
+def test_lookup_prefix_matches_exactly_or_longer(table):
+    assert _vrfs(table.lookup("10.1.0.0/16")) == {"10.1.0.0/16": ["BLUE", "default"]}
+    assert table.lookup("10.1.2.0/23") == {}
+    assert _vrfs(table.lookup("10.0.0.0/8", longer=True)) == {
+        "10.0.0.0/8": ["default"],
+        "10.1.0.0/16": ["BLUE", "default"],
+        "10.1.2.0/24": ["default"],
+    }
+
+
+def test_lookup_filters_protocol(table):
+    assert sorted(table.lookup("10.0.0.0/8", protocol="bgp", longer=True)) == [
+        "10.1.0.0/16",
+        "10.1.2.0/24",
+    ]
+    assert len(table.lookup(protocol="static")["0.0.0.0/0"]) == 2
+    assert len(table) == 7
+
+
+@pytest.mark.parametrize(
+    "uptime,seconds",
+    [("00:05:12", 312), ("1d02h03m", 93780), ("01w2d03h", 788400), ("", 0)],
+)
+def test_route_age(uptime, seconds):
+    assert parsers._route_age(uptime) == seconds
+
+
+def test_parse_route_to_one_document_per_vrf():
+    # FRR before 8 prints the JSON of each VRF one after the other, without VRF names.
+    route = {
+        "protocol": "connected",
+        "vrfName": "BLUE",
+        "selected": True,
+        "uptime": "00:00:10",
+        "nexthops": [{"fib": True, "active": True, "interfaceName": "swp10"}],
+    }
+    output = json.dumps({}) + "\n" + json.dumps({"192.168.12.0/24": [route]}) + "\n"
+    (parsed,) = parsers.parse_route_to(output)["192.168.12.0/24"]
+    assert parsed["routing_table"] == "BLUE"
+    assert parsed["outgoing_interface"] == "swp10"
+    assert parsed["age"] == 10
+    assert parsed["current_active"]
+
+
+def test_route_to_command():
+    assert parsers.route_to_command(6) == "sudo vtysh -c 'show ipv6 route vrf all json'"
+    assert parsers.route_to_command(4, "10.0.0.0/8", longer=True) == (
+        "sudo vtysh -c 'show ip route vrf all 10.0.0.0/8 longer-prefixes json'"
+    )
+    assert parsers.route_to_command(6, "2001:db8::1") == (
+        "sudo vtysh -c 'show ipv6 route vrf all 2001:db8::1 json'"
+    )
+
+
+def test_route_to_commands_select_families():
+    assert parsers.route_to_commands() == [
+        parsers.route_to_command(4),
+        parsers.route_to_command(6),
+    ]
+    assert parsers.route_to_commands("10.0.0.0/8", longer=True) == [
+        parsers.route_to_command(4, "10.0.0.0/8", longer=True)
+    ]
+    assert parsers.route_to_commands("2001:db8::1") == [
+        parsers.route_to_command(6, "2001:db8::1")
+    ]
+
+
+@pytest.mark.parametrize(
+    "destination", ["10.0.0.1'; reboot; '", "10.0.0.0/8 json", "leaf01", "10.0.0.0/33"]
+)
+def test_route_to_command_rejects_invalid_destinations(destination):
+    with pytest.raises(ValueError):
+        parsers.route_to_command(4, destination)
+
+
+def test_cached_route_table_is_fetched_once(mocked_data, mocked_driver):
+    driver = mocked_driver("test_get_route_to", optional_args={"route_table_cache": True})
+    commands = []
+    tables = {
+        4: open(
+            mocked_data(
+                "test_get_route_to",
+                "normal",
+                "sudo_vtysh__c__show_ip_route_vrf_all_1_0_4_0_24_json_.json",
+            )
+        ).read(),
+        6: "{}",
+    }
+
+    def _send_commands_batch(batch_commands):
+        commands.extend(batch_commands)
+        return {
+            command: {"output": tables[4 if " ip " in command else 6]}
+            for command in batch_commands
+        }
+
+    driver._send_commands_batch = _send_commands_batch
+    assert _vrfs(driver.get_route_to("1.0.4.1")) == {
+        "1.0.4.0/24": ["BLUE", "default", "default"]
+    }
+    assert list(driver.get_route_to("1.0.4.0/24", protocol="static")) == ["1.0.4.0/24"]
+    assert driver.get_route_to("1.0.5.0/24") == {}
+    assert commands == [parsers.route_to_command(4), parsers.route_to_command(6)]
+
+    driver._route_table_time -= driver.route_table_ttl + 1
+    driver.get_route_to("1.0.4.1")
+    assert len(commands) == 4
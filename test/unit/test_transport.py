@@ -0,0 +1,155 @@
+"""Tests for the exec channel transport."""
+import json
+import os
+import time
+
+import pytest
+from napalm.base.exceptions import CommandErrorException
+from napalm.base.test.getters import dict_diff
+
+from napalm_cumulus.cumulus import CumulusDriver
+
+pytest.importorskip("asyncssh")
+from test.unit.ssh_server import PASSWORD, USERNAME, StandInSSHServer  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "getter,test_case",
+    [
+        ("get_facts", "normal"),
+        ("get_interfaces", "normal"),
+        ("get_environment", "failed_psu"),
+        ("get_bgp_neighbors", "pfx_snt"),
+    ],
+)
+def test_exec_transport_getters(getter, test_case, mocked_data):
+    capture = mocked_data("test_{}".format(getter), test_case)
+    with StandInSSHServer(capture) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={"transport": "exec", "port": server.port},
+        )
+        driver.open()
+        try:
+            assert driver.is_alive()["is_alive"]
+            result = getattr(driver, getter)()
+        finally:
+            driver.close()
+
+    with open(os.path.join(capture, "expected_result.json")) as f:
+        expected = json.load(f)
+    assert not dict_diff(json.loads(json.dumps(result)), expected)
+
+
+def test_exec_transport_runs_privileged_batch_once(mocked_data):
+    capture = mocked_data("test_get_environment", "normal")
+    with StandInSSHServer(capture) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={"transport": "exec", "port": server.port},
+        )
+        driver.open()
+        try:
+            driver.get_environment()
+        finally:
+            driver.close()
+
+    assert len(server.commands) == 1
+    assert server.commands[0].startswith("sudo -S -p '' sh -c ")
+
+
+@pytest.mark.parametrize("max_channels,in_flight", [(4, 2), (1, 1)])
+def test_exec_transport_runs_independent_commands_concurrently(
+    max_channels, in_flight, mocked_data
+):
+    capture = mocked_data("test_get_bgp_neighbors", "normal")
+    with StandInSSHServer(capture, delay=0.2) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={
+                "transport": "exec",
+                "port": server.port,
+                "max_channels": max_channels,
+                "bgp_advertised_routes_fallback": True,
+            },
+        )
+        driver.open()
+        try:
+            bgp_neighbors = driver.get_bgp_neighbors()
+        finally:
+            driver.close()
+
+    # Summary and neighbors, then the advertised routes of the two peers.
+    assert server.max_in_flight == in_flight
+    assert len(server.commands) == 4
+    peers = bgp_neighbors["global"]["peers"]
+    assert peers["1.1.1.2"]["address_family"]["ipv4"]["sent_prefixes"] == 3
+    assert peers["2012:1:1:1::2"]["address_family"]["ipv6"]["sent_prefixes"] == 4
+
+
+def test_concurrent_commands_disabled_by_default(mocked_data):
+    capture = mocked_data("test_get_bgp_neighbors", "normal")
+    with StandInSSHServer(capture, delay=0.1) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={"transport": "exec", "port": server.port},
+        )
+        driver.open()
+        try:
+            driver.get_bgp_neighbors()
+        finally:
+            driver.close()
+    assert server.max_in_flight == 1
+
+
+@pytest.mark.parametrize("max_channels", [1, 2])
+def test_exec_command_failure_raises(max_channels, mocked_data):
+    # The BGP outputs are missing from the get_facts capture.
+    capture = mocked_data("test_get_facts", "normal")
+    with StandInSSHServer(capture) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            optional_args={
+                "transport": "exec",
+                "port": server.port,
+                "max_channels": max_channels,
+            },
+        )
+        driver.open()
+        try:
+            with pytest.raises(CommandErrorException) as e:
+                driver.get_bgp_neighbors()
+        finally:
+            driver.close()
+    assert "exit status 127" in str(e.value)
+
+
+def test_exec_transport_wrong_sudo_password_fails_fast(mocked_data):
+    capture = mocked_data("test_get_environment", "normal")
+    with StandInSSHServer(capture) as server:
+        driver = CumulusDriver(
+            "127.0.0.1",
+            USERNAME,
+            PASSWORD,
+            timeout=10,
+            optional_args={"transport": "exec", "port": server.port, "sudo_pwd": "wrong"},
+        )
+        driver.open()
+        start = time.monotonic()
+        try:
+            with pytest.raises(CommandErrorException, match="Unable to sudo"):
+                driver.get_environment()
+        finally:
+            driver.close()
+    # The server reads stdin for another attempt until the transport closes it.
+    assert time.monotonic() - start < 5